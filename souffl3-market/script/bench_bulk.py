@@ -0,0 +1,133 @@
+"""Bulk listing, repricing and delisting vs one call per item on a local stub fullnode.
+
+    python bench_bulk.py [items] [exec_latency]
+
+Lists, reprices and delists `items` NFTs through MarketClient's bulk calls
+and prints the time and transactions taken next to a plain `list` loop.
+First checks that a batch with an aborting call is split down to that call
+while every other item goes through, and that a batch whose reply is lost
+is reported unknown instead of being split and sent again.
+"""
+import sys
+import time
+
+from rpc import RpcClient, RpcTransportError
+from gas_pool import GasPool
+from market import MarketClient, MAX_CALLS_PER_BATCH
+from stub_node import StubNode, StubSuiClient, StubResult
+
+COLLECTION = "0xc::nft::Nft<0xc::c1::C>"
+SUI = "0x2::sui::SUI"
+
+
+def make_client(node, coins=4):
+    for i in range(coins):
+        node.add_gas_coin("0x%040x" % (i + 1), 10 ** 9)
+    rpc = RpcClient(node.url, pool_size=coins)
+    sui = StubSuiClient(rpc)
+    return MarketClient(sui, rpc=rpc, gas_pool=GasPool(sui, auto_replenish=False))
+
+
+def count_batches(node):
+    """Counts stub_batchTransaction requests, executed or not."""
+    sent = []
+    handler = node.handlers["stub_batchTransaction"]
+
+    def counting(params):
+        sent.append(len(params[0]["single_transaction_params"]))
+        return handler(params)
+
+    node.handlers["stub_batchTransaction"] = counting
+    return sent
+
+
+def check_failing_calls(node, market, sent):
+    items = 2 * MAX_CALLS_PER_BATCH + 20
+    nft_ids = ["0xn%d" % i for i in range(items)]
+    failing = {7, 64, 65}
+    node.failing_objects.update(nft_ids[i] for i in failing)
+    del sent[:]
+    results = market.bulk_list(COLLECTION, SUI, nft_ids, range(1, items + 1), "0xm", generic=True)
+    assert [r.index for r in results] == list(range(items))
+    assert {r.index for r in results if not r.ok} == failing, results
+    assert all(r.ok is False and "MoveAbort" in r.error for r in results if r.index in failing)
+    # the clean last chunk went out whole, in one transaction
+    assert len({r.digest for r in results[2 * MAX_CALLS_PER_BATCH:]}) == 1
+    # each failing call costs about two sends per halving, not one per item
+    assert len(sent) < items // 3, sent
+
+    listings = ["0xl%d" % i for i in range(items)]
+    node.failing_objects.add(listings[30])
+    results = market.bulk_change_price(SUI, listings, range(items))
+    assert [r.index for r in results if not r.ok] == [30], results
+    results = market.bulk_delist(COLLECTION, SUI, [(l, "0xs" + l[3:]) for l in listings])
+    assert [r.index for r in results if not r.ok] == [30], results
+    node.failing_objects.clear()
+
+
+class _LostReplySui:
+    """Executes batches, but loses the reply of the first few as a flaky link would.
+
+    `replies` are applied in order: "raise" raises RpcTransportError, "timeout"
+    returns the failed result pysui builds from an HTTP timeout.
+    """
+
+    def __init__(self, sui, replies):
+        self.sui = sui
+        self.replies = list(replies)
+
+    def execute(self, builder):
+        result = self.sui.execute(builder)
+        if not self.replies:
+            return result
+        reply = self.replies.pop(0)
+        if reply == "raise":
+            raise RpcTransportError("connection reset")
+        return StubResult(False, TimeoutError("timed out"), "HTTPX timeout")
+
+    def __getattr__(self, name):
+        return getattr(self.sui, name)
+
+
+def check_lost_reply(node, market, sent):
+    items = 2 * MAX_CALLS_PER_BATCH + 20
+    lossy = MarketClient(_LostReplySui(market.client, ["raise", "timeout"]), rpc=market.rpc,
+                         gas_pool=market.gas_pool)
+    del sent[:]
+    results = lossy.bulk_list(COLLECTION, SUI, ["0xu%d" % i for i in range(items)], range(items), "0xm")
+    # each chunk went out exactly once: nothing that may have executed is sent again
+    assert sent == [MAX_CALLS_PER_BATCH, MAX_CALLS_PER_BATCH, 20], sent
+    assert all(r.ok is None for r in results[:2 * MAX_CALLS_PER_BATCH]), results[:2]
+    assert "connection reset" in results[0].error and results[MAX_CALLS_PER_BATCH].error == "HTTPX timeout"
+    assert all(r.ok for r in results[2 * MAX_CALLS_PER_BATCH:])
+
+
+if __name__ == "__main__":
+    items = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    exec_latency = float(sys.argv[2]) if len(sys.argv) > 2 else 0.01
+    nft_ids = ["0x%040x" % (0x1000 + i) for i in range(items)]
+    listings = ["0xl%d" % i for i in range(items)]
+
+    with StubNode(exec_latency=exec_latency) as node:
+        market = make_client(node)
+        sent = count_batches(node)
+        check_failing_calls(node, market, sent)
+        check_lost_reply(node, market, sent)
+
+        start = time.perf_counter()
+        for nft_id in nft_ids:
+            market.list(COLLECTION, SUI, nft_id, "1000", "0xm")
+        elapsed = time.perf_counter() - start
+        print("list loop          %6d items in %6d tx  %.2fs  %8.1f items/s" % (items, items, elapsed, items / elapsed))
+
+        for name, bulk in (
+                ("bulk_list", lambda: market.bulk_list(COLLECTION, SUI, nft_ids, [1000] * items, "0xm")),
+                ("bulk_change_price", lambda: market.bulk_change_price(SUI, listings, [2000] * items)),
+                ("bulk_delist", lambda: market.bulk_delist(COLLECTION, SUI, [(l, "0xs") for l in listings]))):
+            del sent[:]
+            start = time.perf_counter()
+            results = bulk()
+            elapsed = time.perf_counter() - start
+            assert all(r.ok for r in results)
+            print("%-18s %6d items in %6d tx  %.2fs  %8.1f items/s" % (
+                name, items, len(sent), elapsed, items / elapsed))
@@ -0,0 +1,93 @@
+"""Cold vs warm latency of cli.py commands against a local stub fullnode.
+
+    python bench_cli.py [runs]
+
+`cold` starts a fresh `cli.py --local` process per command: interpreter,
+imports, config, a new connection and a gas coin lookup every time. `warm`
+starts the same process but the command is forwarded to a running
+`cli.py daemon`; `socket` is the daemon round trip alone, as seen by a tool
+that keeps its own connection to it. `pysui import` is what importing the
+pysui client modules on this machine adds to every cold command; it is
+measured separately because the stub path does not need pysui to run.
+First checks that the daemon applies a forwarded `--gas-budget` and refuses
+a `--stub-node` that is not its own.
+"""
+import os
+import sys
+import time
+import tempfile
+import subprocess
+
+from cli import ask_daemon
+from stub_node import StubNode
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SIGNER = "0x7374756273656e646572"
+COMMAND = ["market", "reprice", "0x%040x" % 0x11, "2000"]
+PYSUI = ("from pysui.sui.sui_clients.sync_client import SuiClient; "
+         "from pysui.sui.sui_config import SuiConfig; "
+         "from pysui.sui.sui_types.scalars import SuiString")
+
+
+def timed(argv, runs):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(argv, check=True, stdout=subprocess.DEVNULL, cwd=HERE)
+        samples.append(time.perf_counter() - start)
+    return sorted(samples)[len(samples) // 2] * 1000
+
+
+def wait_for(path, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while not os.path.exists(path):
+        assert time.monotonic() < deadline, "daemon did not come up"
+        time.sleep(0.01)
+
+
+def check_forwarded_flags(cli, path, node_url):
+    starved = subprocess.run(cli + ["--socket", path, "--gas-budget", "1"] + COMMAND, capture_output=True,
+                             text=True, cwd=HERE)
+    assert starved.returncode == 1 and "InsufficientGas" in starved.stderr, starved.stderr
+    other = subprocess.run(cli + ["--socket", path, "--stub-node", node_url + "/other"] + COMMAND,
+                           capture_output=True, text=True, cwd=HERE)
+    assert other.returncode == 1 and "restart it or use --local" in other.stderr, other.stderr
+    assert subprocess.run(cli + ["--socket", path, "--stub-node", node_url] + COMMAND,
+                          stdout=subprocess.DEVNULL, cwd=HERE).returncode == 0
+
+
+if __name__ == "__main__":
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    cli = [sys.executable, os.path.join(HERE, "cli.py")]
+    with StubNode() as node, tempfile.TemporaryDirectory() as tmp:
+        for c in range(4):
+            node.add_gas_coin("0x%040x" % (0x1000 + c), 10 ** 12, owner=SIGNER)
+        path = os.path.join(tmp, "cli.sock")
+        cold = timed(cli + ["--local", "--stub-node", node.url] + COMMAND, runs)
+        daemon = subprocess.Popen(cli + ["--socket", path, "--stub-node", node.url, "daemon"],
+                                  stderr=subprocess.DEVNULL, cwd=HERE)
+        try:
+            wait_for(path)
+            check_forwarded_flags(cli, path, node.url)
+            warm = timed(cli + ["--socket", path] + COMMAND, runs)
+            request = {"group": "market", "action": "reprice", "listing": COMMAND[2], "price": COMMAND[3],
+                       "coin_type": "0x2::sui::SUI"}
+            samples = []
+            for _ in range(runs * 10):
+                start = time.perf_counter()
+                assert ask_daemon(path, request)["ok"]
+                samples.append(time.perf_counter() - start)
+            socket_ms = sorted(samples)[len(samples) // 2] * 1000
+        finally:
+            daemon.terminate()
+            daemon.wait()
+    python_ms = timed([sys.executable, "-c", "pass"], runs)
+    try:
+        pysui_ms = timed([sys.executable, "-c", PYSUI], runs) - python_ms
+    except subprocess.CalledProcessError:
+        pysui_ms = None
+    print("cold    %7.1f ms   (python startup alone %.1f ms)" % (cold, python_ms))
+    print("warm    %7.1f ms" % warm)
+    print("socket  %7.1f ms" % socket_ms)
+    if pysui_ms is not None:
+        print("pysui import  %.1f ms more per cold command" % max(0.0, pysui_ms))
@@ -0,0 +1,132 @@
+"""Confirming a burst of list transactions against a local stub fullnode.
+
+    python bench_finality.py [transactions] [max_delay]
+
+Each transaction creates a Listing, a Safe and an OwnerCap and becomes
+visible to sui_getTransaction after a random delay of up to `max_delay`
+seconds. `per-digest` is what the scripts did: poll `get_list_obj(digest)`
+until it answers, from 16 threads. `tracker` hands every digest to a
+FinalityTracker and reads `get_list_obj` afterwards. Prints HTTP requests,
+JSON-RPC calls and wall time of each. First checks that an unexpected
+error fails the digests of its round and leaves the poller running, and
+that one reply without effects fails only its own digest.
+"""
+import sys
+import time
+import random
+from concurrent.futures import ThreadPoolExecutor
+
+from rpc import RpcClient, RpcError
+from cache import default_cache
+from finality import FinalityTracker
+from stub_node import StubNode
+from util import get_list_obj
+
+LISTING = "0x5f1fceec62555a2caee9173902c38429ca45182b::Market::Listing<0x1::m::M, 0x2::sui::SUI>"
+SAFE = "0xc9b28c7117bfff98529fda12e0bff405afcf69cc::safe::Safe"
+OWNER_CAP = "0xc9b28c7117bfff98529fda12e0bff405afcf69cc::safe::OwnerCap"
+
+
+def setup(node, transactions, max_delay, seed=1):
+    rand = random.Random(seed)
+    digests = []
+    for t in range(transactions):
+        ids = ["0x%040x" % (0x100000 + t * 3 + k) for k in range(3)]
+        for obj_id, obj_type in zip(ids, (LISTING, SAFE, OWNER_CAP)):
+            node.add_object(obj_id, obj_type)
+        digest = "list%d" % t
+        node.add_transaction(digest, [(ids[0], "Shared"), (ids[1], "Shared"), (ids[2], {"AddressOwner": "0x1"})],
+                             delay=rand.uniform(0, max_delay))
+        digests.append(digest)
+    return digests
+
+
+def per_digest(rpc, digests):
+    def confirm(digest):
+        while True:
+            try:
+                return get_list_obj(digest, rpc)
+            except RpcError:
+                time.sleep(0.1)
+
+    with ThreadPoolExecutor(16) as pool:
+        return list(pool.map(confirm, digests))
+
+
+def tracked(rpc, digests):
+    with FinalityTracker(rpc) as tracker:
+        tracker.confirm_all(digests)
+    return [get_list_obj(digest, rpc) for digest in digests]
+
+
+class _BrokenRpc:
+    def batch(self, calls):
+        raise ValueError("unparseable reply")
+
+
+def check_poller_survives():
+    with FinalityTracker(_BrokenRpc(), min_interval=0.01, timeout=1.0) as tracker:
+        assert isinstance(tracker.track("broken").exception(2.0), ValueError)
+        assert tracker._thread.is_alive()
+        # a later round still runs
+        assert isinstance(tracker.track("broken-again").exception(2.0), ValueError)
+
+
+class _OneBadReply:
+    """Passes batches through to the node, dropping the effects of one digest."""
+
+    def __init__(self, rpc, bad):
+        self.rpc = rpc
+        self.bad = bad
+
+    def batch(self, calls):
+        replies = self.rpc.batch(calls)
+        for (method, params), envelope in zip(calls, replies):
+            if params[0] == self.bad and "result" in envelope:
+                envelope["result"] = {"certificate": envelope["result"].get("certificate")}
+        return replies
+
+    def __getattr__(self, name):
+        return getattr(self.rpc, name)
+
+
+def check_bad_reply(node):
+    digests = setup(node, 20, 0.0, seed=3)
+    default_cache().clear()
+    with RpcClient(node.url) as rpc, FinalityTracker(_OneBadReply(rpc, digests[7]), min_interval=0.01) as tracker:
+        futures = tracker.track_all(digests)
+        assert isinstance(futures[7].exception(5.0), KeyError)
+        assert all(f.result(5.0).find("Market", "Listing") for i, f in enumerate(futures) if i != 7)
+    for digest in digests:
+        del node.transactions[digest]
+
+
+def measure(node, fn, digests, max_delay):
+    # every digest becomes unknown again, with the same delays as before
+    now = time.monotonic()
+    delays = random.Random(2)
+    for digest in digests:
+        node.transactions[digest]["visible_at"] = now + delays.uniform(0, max_delay)
+    default_cache().clear()
+    posts, calls = node.posts, node.calls
+    with RpcClient(node.url, pool_size=16) as rpc:
+        start = time.perf_counter()
+        results = fn(rpc, digests)
+        elapsed = time.perf_counter() - start
+    return results, node.posts - posts, node.calls - calls, elapsed
+
+
+if __name__ == "__main__":
+    transactions = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    max_delay = float(sys.argv[2]) if len(sys.argv) > 2 else 1.0
+    check_poller_survives()
+    with StubNode(latency=0.002) as node:
+        check_bad_reply(node)
+        digests = setup(node, transactions, max_delay)
+        reference = None
+        for name, fn in (("per-digest", per_digest), ("tracker", tracked)):
+            results, posts, calls, elapsed = measure(node, fn, digests, max_delay)
+            assert all(r.keys() == {"listing", "safe", "owner_cap"} for r in results)
+            assert reference is None or results == reference
+            reference = results
+            print("%-10s %6d requests %7d calls %6.2fs" % (name, posts, calls, elapsed))
@@ -0,0 +1,126 @@
+"""Backfill rate of the event indexer over a synthetic Market event stream.
+
+    python bench_indexer.py [events] [collections]
+
+Serves the stream from a local stub fullnode, indexes it into a temporary
+SQLite file, checks that listings are found by the type argument they
+were listed with (`C` for list, the object type for list_generic, Nft<C>
+included), and times a floor-price query against the result. The same
+stream is then loaded into OrderBooks through the default client, written
+to a snapshot and restored; the restored books must match the index.
+"""
+import os
+import sys
+import time
+import random
+import tempfile
+
+from rpc import RpcClient, set_default_client
+from stub_node import StubNode
+from indexer import EventIndexer
+from orderbook import OrderBooks
+
+PACKAGE = "0x5f1fceec62555a2caee9173902c38429ca45182b"
+SUI = "0x2::sui::SUI"
+
+
+def synthetic_stream(node, events, collections, seed=7):
+    """Returns `{nft_id: type argument it was listed with}` for the listings still active."""
+    rng = random.Random(seed)
+    listed = {}
+    listed_as = {}
+    next_nft = 0
+    for _ in range(events):
+        if not listed or rng.random() < 0.5:
+            nft_id = "0x%040x" % next_nft
+            next_nft = next_nft + 1
+            collection = rng.randrange(collections)
+            nft_type = "0xc::nft::Nft<0xc::c%d::C>" % collection
+            if collection % 10 == 9:
+                # a plain object, listed with list_generic
+                node.add_object(nft_id, "0xc::c%d::C" % collection)
+                function, type_arg = "list_generic", "0xc::c%d::C" % collection
+            elif collection % 10 == 4:
+                # an Nft listed with list_generic, as the suimarines example does
+                node.add_object(nft_id, nft_type)
+                function, type_arg = "list_generic", nft_type
+            else:
+                node.add_object(nft_id, nft_type)
+                function, type_arg = "list", "0xc::c%d::C" % collection
+            price = rng.randrange(1, 10 ** 6)
+            listed[nft_id] = price
+            # four listings to a batch transaction
+            digest = "listtx%d" % (next_nft // 4)
+            if collection % 10 == 7:
+                # a transaction the node no longer serves: keyed by the object type
+                digest, type_arg = "prunedtx%d" % next_nft, nft_type
+            else:
+                if digest not in node.transactions:
+                    node.add_transaction(digest, [])
+                node.transactions[digest]["calls"].append({
+                    "package": {"objectId": PACKAGE}, "module": "Market", "function": function,
+                    "typeArguments": [type_arg, SUI], "arguments": [nft_id, str(price), "0xm"]})
+            listed_as[nft_id] = type_arg
+            node.add_event(PACKAGE + "::Market::ListEvent<%s>" % SUI, {
+                "seller": "0xs%d" % rng.randrange(100), "listing_id": "0xl" + nft_id[2:], "nft_id": nft_id,
+                "safe_id": "0xs" + nft_id[2:], "price": price, "marketplace": "0xm"}, tx_digest=digest)
+            continue
+        nft_id = rng.choice(list(listed))
+        roll = rng.random()
+        if roll < 0.5:
+            price = rng.randrange(1, 10 ** 6)
+            node.add_event(PACKAGE + "::Market::ChangePriceEvent<%s>" % SUI, {
+                "seller": "0xs", "nft_id": nft_id, "safe_id": "0xs", "marketplace": "0xm",
+                "old_price": listed[nft_id], "new_price": price})
+            listed[nft_id] = price
+        else:
+            kind = "BuyEvent" if roll < 0.8 else "DelistEvent"
+            node.add_event(PACKAGE + "::Market::%s<%s>" % (kind, SUI), {
+                "seller": "0xs", "buyer": "0xb", "nft_id": nft_id, "safe_id": "0xs", "marketplace": "0xm",
+                "price": listed.pop(nft_id)})
+    return {nft_id: listed_as[nft_id] for nft_id in listed}
+
+
+def check_order_books(indexer, path):
+    books = OrderBooks()
+    books.sync()
+    books.snapshot(path)
+    restored = OrderBooks().restore(path)
+    assert restored.cursor == books.cursor
+    assert restored.sync() == 0
+    for (collection_type, coin_type), book in books.books.items():
+        listings = indexer.active_listings(collection_type=collection_type, coin_type=coin_type, limit=1)
+        floor = restored.floor(collection_type, coin_type)
+        assert len(restored.books[(collection_type, coin_type)]) == len(book)
+        assert (floor.price if floor else None) == (listings[0]["price"] if listings else None)
+    return sum(len(book) for book in restored.books.values())
+
+
+if __name__ == "__main__":
+    events = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    collections = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    with StubNode() as node, tempfile.TemporaryDirectory() as tmp:
+        active = synthetic_stream(node, events, collections)
+        indexer = EventIndexer(os.path.join(tmp, "events.db"), rpc=RpcClient(node.url))
+        start = time.perf_counter()
+        applied = indexer.sync()
+        elapsed = time.perf_counter() - start
+        print("backfill  %d events in %.2fs (%.0f events/s), %d active listings (expected %d)" % (
+            applied, elapsed, applied / elapsed,
+            indexer.conn.execute("SELECT COUNT(*) FROM active_listings").fetchone()[0], len(active)))
+        for type_arg in set(active.values()):
+            # queried by the type argument MarketClient.list / list_generic took
+            expected = {nft_id for nft_id, listed_as in active.items() if listed_as == type_arg}
+            found = {l["nft_id"] for l in indexer.active_listings(collection_type=type_arg, coin_type=SUI, limit=events)}
+            assert found == expected, type_arg
+        assert any(t.startswith("0xc::nft::Nft<") for t in active.values())
+        start = time.perf_counter()
+        for _ in range(1000):
+            indexer.active_listings(collection_type="0xc::c3::C", coin_type=SUI, max_price=5000, limit=10)
+        print("query     %.3f ms per floor query" % ((time.perf_counter() - start) * 1000 / 1000))
+        set_default_client(indexer.rpc)
+        start = time.perf_counter()
+        orders = check_order_books(indexer, os.path.join(tmp, "books.json"))
+        print("books     sync + snapshot + restore in %.2fs, %d orders match the index" % (
+            time.perf_counter() - start, orders))
+        indexer.close()
@@ -0,0 +1,81 @@
+"""Cost of the instrumentation hooks against a local stub fullnode.
+
+    python bench_metrics.py [calls] [--show]
+
+Runs the same sui_getObject loop and MarketClient.list loop with metrics
+off, with metrics on, and with metrics plus a JSON log sink, and prints the
+time per call of each (the stub's round trip is noisy at this scale), then
+the in-process cost of one record. `--show` also prints the Prometheus text
+of the metered run.
+"""
+import io
+import sys
+import time
+
+import metrics
+from rpc import RpcClient
+from market import MarketClient
+from gas_pool import GasPool
+from stub_node import StubNode, StubSuiClient
+
+OBJ_ID = "0x5f1fceec62555a2caee9173902c38429ca45182b"
+SIGNER = "0x7374756273656e646572"
+
+
+def per_call(fn, calls):
+    start = time.perf_counter()
+    for i in range(calls):
+        fn(i)
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def record_cost(recorder, calls=100000):
+    """Microseconds spent inside Metrics per recorded RPC and per recorded move call."""
+    effects = {"status": {"status": "success"}, "gasUsed": {"computationCost": 120, "storageCost": 90}}
+    result = _Result({"EffectsCert": {"effects": {"effects": effects}}})
+    rpc_us = per_call(lambda i: recorder.rpc("sui_getObject", 0.001, 90, 400, 0, ()), calls)
+    move_us = per_call(lambda i: recorder.move_call("Market", "list", 0.002, result, 1000), calls)
+    return rpc_us, move_us
+
+
+class _Result:
+
+    def __init__(self, data):
+        self.result_data = data
+
+    def is_ok(self):
+        return True
+
+
+def run(url, calls, recorder):
+    rpc = RpcClient(url, metrics=recorder)
+    sui = StubSuiClient(rpc, SIGNER)
+    market = MarketClient(sui, rpc=rpc, gas_pool=GasPool(sui, auto_replenish=False), metrics=recorder)
+    market.gas_pool.refresh()
+    rpc_us = per_call(lambda i: rpc.call("sui_getObject", [OBJ_ID]), calls)
+    list_us = per_call(lambda i: market.list("0x1::m::M", "0x2::sui::SUI", "0x%040x" % (0x100 + i), "1000",
+                                             OBJ_ID), calls)
+    rpc.close()
+    return rpc_us, list_us
+
+
+if __name__ == "__main__":
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 and sys.argv[1].isdigit() else 2000
+    with StubNode() as node:
+        node.add_object(OBJ_ID, "0x2::collection::Collection<0x1::m::M>")
+        for c in range(4):
+            node.add_gas_coin("0x%040x" % (0x1000 + c), 10 ** 12, owner=SIGNER)
+        # warm up the server threads and the connection pool
+        run(node.url, 100, None)
+        results = [("off", run(node.url, calls, None))]
+        metered = metrics.Metrics()
+        results.append(("metrics", run(node.url, calls, metered)))
+        log = io.StringIO()
+        results.append(("metrics+log", run(node.url, calls, metrics.Metrics([metrics.JsonLogSink(log)]))))
+    for name, (rpc_us, list_us) in results:
+        print("%-12s sui_getObject %7.1f us/call   Market::list %7.1f us/call" % (name, rpc_us, list_us))
+    print("json log: %d records, %d bytes" % (log.getvalue().count("\n"), len(log.getvalue())))
+    print("record cost: rpc %.2f us, move_call %.2f us; with JSON log: rpc %.2f us, move_call %.2f us" % (
+        record_cost(metrics.Metrics()) + record_cost(metrics.Metrics([metrics.JsonLogSink(io.StringIO())]))))
+    if "--show" in sys.argv:
+        print(metered.prometheus())
@@ -0,0 +1,62 @@
+"""Requests/sec of sui_getObject lookups against a local stub fullnode.
+
+    python bench_rpc.py [calls] [concurrency]
+
+`before` is the old one-shot `requests.request` per call, `pooled` is the
+shared RpcClient, `async` is AsyncRpcClient with `concurrency` tasks in
+flight. Every run goes to the node: the util helpers would answer repeat
+lookups from the object type cache and time that instead. The stub speaks plain HTTP, so TLS handshake savings against a real
+fullnode come on top of these numbers.
+"""
+import sys
+import json
+import time
+import asyncio
+
+import requests
+
+from rpc import RpcClient, AsyncRpcClient
+from stub_node import StubNode
+
+OBJ_ID = "0x5f1fceec62555a2caee9173902c38429ca45182b"
+
+
+def bench_before(url, calls):
+    headers = {'Content-Type': 'application/json'}
+    payload = json.dumps({"jsonrpc": "2.0", "id": 1, "method": "sui_getObject", "params": [OBJ_ID]})
+    start = time.perf_counter()
+    for _ in range(calls):
+        response = requests.request("POST", url, headers=headers, data=payload)
+        json.loads(response.text)["result"]["details"]["data"]["type"]
+    return calls / (time.perf_counter() - start)
+
+
+def bench_pooled(url, calls):
+    with RpcClient(url) as client:
+        start = time.perf_counter()
+        for _ in range(calls):
+            client.call("sui_getObject", [OBJ_ID])["details"]["data"]["type"]
+        return calls / (time.perf_counter() - start)
+
+
+async def bench_async(url, calls, concurrency):
+    async with AsyncRpcClient(url, pool_size=concurrency) as client:
+        remaining = iter(range(calls))
+
+        async def worker():
+            for _ in remaining:
+                await client.call("sui_getObject", [OBJ_ID])
+
+        start = time.perf_counter()
+        await asyncio.gather(*[worker() for _ in range(concurrency)])
+        return calls / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+    with StubNode() as node:
+        node.add_object(OBJ_ID, "0x2::collection::Collection<0x1::m::M>")
+        print("before  %8.0f req/s" % bench_before(node.url, calls))
+        print("pooled  %8.0f req/s" % bench_pooled(node.url, calls))
+        print("async   %8.0f req/s (concurrency=%d)" % (asyncio.run(bench_async(node.url, calls, concurrency)), concurrency))
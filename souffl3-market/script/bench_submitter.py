@@ -0,0 +1,102 @@
+"""Sequential MarketClient vs the Submitter against a local stub fullnode.
+
+    python bench_submitter.py [calls] [window] [exec_latency]
+
+Reprices `calls` listings (with a few repeated listings to exercise
+per-object ordering) and prints throughput and latency percentiles.
+First checks that the GasPool keeps leases across a refresh, fails fast
+on a budget no coin can cover, and records and retries a background
+replenish that raises.
+"""
+import sys
+import time
+
+from rpc import RpcClient
+from gas_pool import GasPool, GasPoolExhausted
+from metrics import Metrics
+from market import MarketClient
+from stub_node import StubNode, StubSuiClient
+from submitter import Submitter
+
+
+def make_client(node, coins):
+    for i in range(coins):
+        node.add_gas_coin("0x%040x" % (i + 1), 10 ** 9)
+    rpc = RpcClient(node.url, pool_size=coins)
+    sui = StubSuiClient(rpc)
+    return MarketClient(sui, rpc=rpc, gas_pool=GasPool(sui, auto_replenish=False))
+
+
+def check_gas_pool(node):
+    ids = ["0x%040x" % (0x900 + i) for i in range(4)]
+    for coin_id in ids:
+        node.add_gas_coin(coin_id, 10 ** 6, owner="0x9")
+    pool = GasPool(StubSuiClient(RpcClient(node.url), active_address="0x9"), address="0x9", auto_replenish=False)
+    leased = [pool.acquire(), pool.acquire()]
+    pool.refresh()
+    for coin in leased:
+        pool.release(coin)
+    assert len(pool.free_coins()) == 4, pool.coins
+    start = time.perf_counter()
+    try:
+        pool.acquire(min_balance=10 ** 7)
+        raise AssertionError("acquire above every balance returned a coin")
+    except GasPoolExhausted:
+        assert time.perf_counter() - start < 1.0
+    check_replenish_retries(pool)
+    for coin_id in ids:
+        del node.gas_coins[coin_id]
+
+
+class _FlakySui:
+    """Fails the first `failures` move calls, as a node dropping requests would."""
+
+    def __init__(self, sui, failures):
+        self.sui = sui
+        self.failures = failures
+
+    def move_call_txn(self, **kwargs):
+        if self.failures:
+            self.failures = self.failures - 1
+            raise ConnectionError("node dropped the request")
+        return self.sui.move_call_txn(**kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self.sui, name)
+
+
+def check_replenish_retries(pool):
+    metrics = Metrics()
+    flaky = GasPool(_FlakySui(pool.client, 2), address=pool.address, target_size=6, backoff=0.01,
+                    metrics=metrics)
+    flaky.release(flaky.acquire())
+    deadline = time.monotonic() + 5
+    while flaky._maintaining and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert not flaky._maintaining and flaky.replenish_errors == 2 and flaky.last_error is None
+    counters = {(c["name"], c["labels"]["error"]): c["value"] for c in metrics.snapshot()["counters"]}
+    assert counters == {("gas_pool_replenish_errors_total", "ConnectionError"): 2}, counters
+
+
+if __name__ == "__main__":
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    window = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+    exec_latency = float(sys.argv[3]) if len(sys.argv) > 3 else 0.01
+    listings = ["0xl%d" % (i % (calls - calls // 10)) for i in range(calls)]
+
+    with StubNode(exec_latency=exec_latency) as node:
+        check_gas_pool(node)
+        market_client = make_client(node, window)
+        start = time.perf_counter()
+        for listing in listings:
+            market_client.change_price("0x2::sui::SUI", listing, "1000")
+        elapsed = time.perf_counter() - start
+        print("sequential  %8.1f tx/s" % (calls / elapsed))
+
+        with Submitter(market_client, window=window) as submitter:
+            futures = [submitter.submit("change_price", "0x2::sui::SUI", listing, "1000") for listing in listings]
+            for future in futures:
+                future.result()
+        stats = submitter.stats.as_dict()
+        print("submitter   %8.1f tx/s  p50=%.1fms p99=%.1fms  failed=%d (window=%d)" % (
+            stats["throughput"], stats["p50"] * 1000, stats["p99"] * 1000, stats["failed"], window))
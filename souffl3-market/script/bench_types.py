@@ -0,0 +1,93 @@
+"""Parse time and retained memory: raw dict trees vs the typed sui_types objects.
+
+    python bench_types.py [payloads]
+
+The payloads follow the shape of a listing transaction's sui_getTransaction
+reply (certificate, effects with created/mutated objects, events).
+"""
+import sys
+import json
+import time
+import tracemalloc
+
+from rpc import loads
+from sui_types import TxEffects, parse_type
+
+LISTING_TYPES = [
+    "0x5f1fceec62555a2caee9173902c38429ca45182b::Market::Listing<0x2::sui::SUI>",
+    "0xc9b28c7117bfff98529fda12e0bff405afcf69cc::safe::Safe",
+    "0xc9b28c7117bfff98529fda12e0bff405afcf69cc::safe::OwnerCap",
+]
+
+
+def listing_payload(i):
+    def ref(n):
+        return {"objectId": "0x%040x" % (i * 8 + n), "version": i + 1, "digest": "D%043d" % (i * 8 + n)}
+
+    sender = "0x8a19ca58c96d873a17cbb17a27b04d6c5d604eff"
+    return json.dumps({"jsonrpc": "2.0", "id": 1, "result": {
+        "certificate": {
+            "transactionDigest": "T%043d" % i,
+            "data": {
+                "transactions": [{"Call": {
+                    "package": ref(7), "module": "Market", "function": "list_generic",
+                    "typeArguments": ["0xc9b2::nft::Nft<0x8c26::suimarines::SUIMARINES>", "0x2::sui::SUI"],
+                    "arguments": ["0x%040x" % i, "1000", "0x%040x" % (i + 1)]}}],
+                "sender": sender, "gasPayment": ref(6), "gasBudget": 10000},
+            "txSignature": "A" * 132,
+            "authSignInfo": {"epoch": 0, "signature": ["B" * 88] * 3, "signers_map": list(range(40))},
+        },
+        "effects": {
+            "status": {"status": "success"},
+            "gasUsed": {"computationCost": 1200, "storageCost": 80, "storageRebate": 20},
+            "sharedObjects": [ref(5)],
+            "transactionDigest": "T%043d" % i,
+            "created": [
+                {"owner": {"Shared": {"initial_shared_version": i + 1}}, "reference": ref(0)},
+                {"owner": {"Shared": {"initial_shared_version": i + 1}}, "reference": ref(1)},
+                {"owner": {"AddressOwner": sender}, "reference": ref(2)},
+            ],
+            "mutated": [{"owner": {"AddressOwner": sender}, "reference": ref(6)},
+                        {"owner": {"Shared": {"initial_shared_version": 1}}, "reference": ref(5)}],
+            "gasObject": {"owner": {"AddressOwner": sender}, "reference": ref(6)},
+            "events": [{"moveEvent": {"packageId": ref(7)["objectId"], "transactionModule": "Market",
+                                      "sender": sender, "type": LISTING_TYPES[0].replace("Listing", "ListEvent"),
+                                      "fields": {"price": 1000, "seller": sender}, "bcs": "C" * 200}}],
+            "dependencies": ["T%043d" % (i - 1)],
+        },
+        "timestamp_ms": 1670000000000 + i,
+    }}).encode()
+
+
+def timed(fn):
+    start = time.perf_counter()
+    value = fn()
+    return value, time.perf_counter() - start
+
+
+def retained(build):
+    tracemalloc.start()
+    value = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return value, size
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    payloads = [listing_payload(i) for i in range(n)]
+
+    _, t_json = timed(lambda: [json.loads(p) for p in payloads])
+    _, t_fast = timed(lambda: [loads(p) for p in payloads])
+    print("decode    json %.1f us/payload, %s %.1f us/payload" % (
+        t_json / n * 1e6, getattr(loads, "__module__", "json"), t_fast / n * 1e6))
+
+    dicts, mem_dicts = retained(lambda: [json.loads(p)["result"] for p in payloads])
+    typed, mem_typed = retained(lambda: [TxEffects.from_json(loads(p)["result"]["effects"]) for p in payloads])
+    print("retained  dicts %.0f B/tx, TxEffects %.0f B/tx" % (mem_dicts / n, mem_typed / n))
+
+    types = [LISTING_TYPES[i % 3] for i in range(n * 3)]
+    _, t_substr = timed(lambda: sum(1 for t in types if "Market::Listing" in t or "safe::Safe" in t))
+    _, t_parsed = timed(lambda: sum(1 for t in types if parse_type(t).is_a("Market", "Listing")
+                                    or parse_type(t).is_a("safe", "Safe")))
+    print("type test substring %.2f us, parsed+cached %.2f us" % (t_substr / len(types) * 1e6, t_parsed / len(types) * 1e6))
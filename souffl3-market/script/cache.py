@@ -0,0 +1,249 @@
+import json
+import time
+import sqlite3
+import threading
+from collections import OrderedDict
+
+from sui_types import TxEffects
+
+MISSING = object()
+
+
+class CacheStats:
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def as_dict(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": self.hits / total if total else 0.0,
+        }
+
+
+class LRUCache:
+    """Size-bounded in-memory cache, least recently used entry evicted first."""
+
+    def __init__(self, maxsize=10000):
+        self.maxsize = maxsize
+        self.stats = CacheStats()
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            value = self._data.get(key, MISSING)
+            if value is MISSING:
+                self.stats.misses = self.stats.misses + 1
+                return default
+            self._data.move_to_end(key)
+            self.stats.hits = self.stats.hits + 1
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.stats.evictions = self.stats.evictions + 1
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class TTLCache(LRUCache):
+    """LRUCache whose entries also expire `ttl` seconds after being set.
+
+    Meant for mutable object contents, where a slightly stale read is fine
+    but an old one is not.
+    """
+
+    def __init__(self, maxsize=10000, ttl=2.0, clock=time.monotonic):
+        super().__init__(maxsize)
+        self.ttl = ttl
+        self.clock = clock
+
+    def get(self, key, default=None):
+        entry = super().get(key, MISSING)
+        if entry is MISSING:
+            return default
+        expires_at, value = entry
+        if expires_at < self.clock():
+            with self._lock:
+                self._data.pop(key, None)
+                # the LRU lookup counted this as a hit
+                self.stats.hits = self.stats.hits - 1
+                self.stats.misses = self.stats.misses + 1
+            return default
+        return value
+
+    def set(self, key, value):
+        super().set(key, (self.clock() + self.ttl, value))
+
+
+class SqliteCache:
+    """On-disk cache for immutable values that should survive restarts.
+
+    Values are stored as JSON, keyed by `(namespace, key)`; `encode` /
+    `decode` convert values that are not plain JSON.
+    """
+
+    def __init__(self, path, namespace="default", encode=None, decode=None):
+        self.path = path
+        self.namespace = namespace
+        self.encode = encode
+        self.decode = decode
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            "namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, "
+            "PRIMARY KEY (namespace, key))"
+        )
+        self._conn.commit()
+
+    def get(self, key, default=None):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM cache WHERE namespace = ? AND key = ?", (self.namespace, key)
+            ).fetchone()
+            if row is None:
+                self.stats.misses = self.stats.misses + 1
+                return default
+            self.stats.hits = self.stats.hits + 1
+        value = json.loads(row[0])
+        return self.decode(value) if self.decode else value
+
+    def set(self, key, value):
+        data = json.dumps(self.encode(value) if self.encode else value)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (namespace, key, value) VALUES (?, ?, ?)",
+                (self.namespace, key, data)
+            )
+            self._conn.commit()
+
+    def delete(self, key):
+        with self._lock:
+            self._conn.execute("DELETE FROM cache WHERE namespace = ? AND key = ?", (self.namespace, key))
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM cache WHERE namespace = ?", (self.namespace,))
+            self._conn.commit()
+
+    def close(self):
+        self._conn.close()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM cache WHERE namespace = ?", (self.namespace,)
+            ).fetchone()[0]
+
+
+class TieredCache:
+    """In-memory `front` cache backed by a persistent `back` cache."""
+
+    def __init__(self, front, back):
+        self.front = front
+        self.back = back
+        self.stats = front.stats
+
+    def get(self, key, default=None):
+        value = self.front.get(key, MISSING)
+        if value is not MISSING:
+            return value
+        value = self.back.get(key, MISSING)
+        if value is MISSING:
+            return default
+        self.front.set(key, value)
+        return value
+
+    def set(self, key, value):
+        self.front.set(key, value)
+        self.back.set(key, value)
+
+    def delete(self, key):
+        self.front.delete(key)
+        self.back.delete(key)
+
+    def clear(self):
+        self.front.clear()
+        self.back.clear()
+
+    def __len__(self):
+        return len(self.back)
+
+
+class ResolverCache:
+    """Caches used by the util resolvers.
+
+    `types`, `transactions` and `effects` hold immutable data (an object id
+    never changes type, a finalized transaction never changes) and are only
+    bounded by size. `effects` keeps just the parsed TxEffects, which is far
+    smaller than the raw envelope in `transactions`. `contents` holds
+    mutable object contents and expires after `content_ttl` seconds.
+    Passing `path` persists the immutable tiers in SQLite.
+    """
+
+    def __init__(self, maxsize=10000, content_ttl=2.0, path=None):
+        self.types = LRUCache(maxsize)
+        self.transactions = LRUCache(maxsize)
+        self.effects = LRUCache(maxsize)
+        self.contents = TTLCache(maxsize, content_ttl)
+        if path is not None:
+            self.types = TieredCache(self.types, SqliteCache(path, "types"))
+            self.transactions = TieredCache(self.transactions, SqliteCache(path, "transactions"))
+            self.effects = TieredCache(self.effects, SqliteCache(
+                path, "effects", encode=TxEffects.to_json, decode=TxEffects.from_json))
+
+    def stats(self):
+        """Hit/miss counters per tier, for monitoring."""
+        res = {}
+        tiers = (("types", self.types), ("transactions", self.transactions),
+                 ("effects", self.effects), ("contents", self.contents))
+        for name, tier in tiers:
+            res[name] = tier.stats.as_dict()
+            if isinstance(tier, TieredCache):
+                res[name + "_disk"] = tier.back.stats.as_dict()
+        return res
+
+    def clear(self):
+        self.types.clear()
+        self.transactions.clear()
+        self.effects.clear()
+        self.contents.clear()
+
+
+_default_cache = None
+
+
+def default_cache():
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = ResolverCache()
+    return _default_cache
+
+
+def set_default_cache(cache):
+    """Install the ResolverCache used by util, e.g. `ResolverCache(path="resolver.db")`."""
+    global _default_cache
+    _default_cache = cache
@@ -0,0 +1,394 @@
+"""One command line for market, launchpad and NFT operations.
+
+    python cli.py market list <collection_type> <nft_id> <price> <marketplace>
+    python cli.py market delist <collection_type> <listing> <safe> [--allowlist ID]
+    python cli.py market buy <collection_type> <listing> <safe> <marketplace> --wallet COIN [...]
+    python cli.py market reprice <listing> <price>
+    python cli.py market create <beneficiary> <fee>
+    python cli.py launchpad fill <source> <checkpoint> <collection_type> <launchpad> <admin_cap>
+    python cli.py launchpad verify <source> <launchpad> [--workers N]
+    python cli.py launchpad mint <collection_type> <launchpad> <sale_plan> <plan_index> <amount> --wallet COIN [...]
+    python cli.py nft mint <name> <description> <url> <mint_cap> [--attr key=value ...]
+
+    python cli.py daemon            # keep clients, connections and gas coins warm
+
+Only the standard library is imported up front: pysui, the sui config and
+the clients are loaded on the first command that needs them. When a daemon
+is listening on the socket (`--socket`, $SOUFFL3_SOCKET, or a per-user
+default) commands are forwarded to it and run against its warm state; with
+no daemon, or with `--local`, they run in this process. `--gas-budget`
+travels with a forwarded command and applies to it alone; a `--stub-node`
+other than the daemon's is refused.
+"""
+import os
+import sys
+import json
+import socket
+import copy
+import argparse
+import tempfile
+import threading
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+LAUNCHPAD_SCRIPTS = os.path.join(HERE, "..", "..", "sui-launchpad", "script")
+NFT_SCRIPTS = os.path.join(HERE, "..", "..", "NFT-EXAMPLE", "script")
+
+SUI = "0x2::sui::SUI"
+CLOCK = "0x%040x" % 6
+GAS_BUDGET = 10000
+
+
+def default_socket():
+    base = os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+    return os.environ.get("SOUFFL3_SOCKET") or os.path.join(base, "souffl3-%d.sock" % os.getuid())
+
+
+class Context:
+    """Clients shared by every command run in one process, built on first use.
+
+    The sui config is parsed once, and the market and launchpad clients
+    share one RpcClient and one GasPool, so a daemon keeps its connections
+    and its view of the gas coins between commands. Only a `long_lived`
+    context lets the pool split coins in the background; a one-shot command
+    would exit in the middle of it. `scoped(gas_budget)` is the same
+    context with another budget, for a request that asks for one.
+    """
+
+    def __init__(self, stub_node=None, gas_budget=GAS_BUDGET, long_lived=False):
+        self.stub_node = stub_node
+        self.gas_budget = gas_budget
+        self.long_lived = long_lived
+        self._lock = threading.RLock()
+        # everything built lazily, shared with the scoped() copies
+        self._shared = {}
+
+    def scoped(self, gas_budget):
+        if gas_budget is None or gas_budget == self.gas_budget:
+            return self
+        view = copy.copy(self)
+        view.gas_budget = gas_budget
+        return view
+
+    def _get(self, key, build):
+        with self._lock:
+            value = self._shared.get(key)
+            if value is None:
+                value = self._shared[key] = build()
+            return value
+
+    def _build(self):
+        from rpc import RpcClient, default_client
+        if self.stub_node:
+            from stub_node import StubSuiClient
+            rpc = RpcClient(self.stub_node)
+            return rpc, StubSuiClient(rpc)
+        from pysui.sui.sui_clients.sync_client import SuiClient
+        from pysui.sui.sui_config import SuiConfig
+        return default_client(), SuiClient(SuiConfig.default())
+
+    @property
+    def sui(self):
+        return self._get("clients", self._build)[1]
+
+    @property
+    def rpc(self):
+        return self._get("clients", self._build)[0]
+
+    @property
+    def gas_pool(self):
+        def build():
+            from gas_pool import GasPool
+            return GasPool(self.sui, auto_replenish=self.long_lived)
+        return self._get("gas_pool", build)
+
+    @property
+    def market(self):
+        def build():
+            from market import MarketClient
+            return MarketClient(self.sui, rpc=self.rpc, gas_pool=self.gas_pool, gas_budget=self.gas_budget)
+        return self._get(("market", self.gas_budget), build)
+
+    @property
+    def launchpad(self):
+        def build():
+            _add_path(LAUNCHPAD_SCRIPTS)
+            from launchpad import sui_launchpad
+            return sui_launchpad(self.sui, gas_pool=self.gas_pool, gas_budget=self.gas_budget)
+        return self._get(("launchpad", self.gas_budget), build)
+
+    def leased(self, fn):
+        """Run `fn(gas coin id)` on a coin leased from the shared pool."""
+        coin = self.gas_pool.acquire(min_balance=self.gas_budget)
+        result = None
+        try:
+            result = fn(coin.identifier)
+        finally:
+            self.gas_pool.release(coin, result)
+        return result
+
+
+def _add_path(path):
+    path = os.path.normpath(path)
+    if path not in sys.path:
+        sys.path.append(path)
+
+
+def summarize(result):
+    """JSON-able outcome of a pysui result."""
+    from util import extract_effects
+    effects = extract_effects(result)
+    if effects is None:
+        return {"ok": result.is_ok()}
+    used = effects.get("gasUsed", {})
+    return {
+        "ok": result.is_ok() and effects.get("status", {}).get("status") == "success",
+        "digest": effects.get("transactionDigest"),
+        "status": effects.get("status"),
+        "gas": used.get("computationCost", 0) + used.get("storageCost", 0) - used.get("storageRebate", 0),
+    }
+
+
+def market_list(ctx, a):
+    fn = ctx.market.list_generic if a.generic else ctx.market.list
+    return summarize(fn(a.collection_type, a.coin_type, a.nft_id, a.price, a.marketplace))
+
+
+def market_delist(ctx, a):
+    if a.allowlist is None:
+        return summarize(ctx.market.delist_generic(a.collection_type, a.coin_type, a.listing, a.safe))
+    return summarize(ctx.market.delist(a.collection_type, a.coin_type, a.listing, a.safe, a.allowlist))
+
+
+def market_buy(ctx, a):
+    if a.allowlist is None:
+        return summarize(ctx.market.buy_generic(a.collection_type, a.coin_type, a.listing, a.safe,
+                                                a.marketplace, a.wallet))
+    return summarize(ctx.market.buy(a.collection_type, a.coin_type, a.listing, a.safe, a.allowlist,
+                                    a.marketplace, a.collection, a.wallet))
+
+
+def market_reprice(ctx, a):
+    return summarize(ctx.market.change_price(a.coin_type, a.listing, a.price))
+
+
+def market_create(ctx, a):
+    from marketplace import create_market
+    return summarize(ctx.leased(lambda gas: create_market(ctx.sui, a.beneficiary, a.fee, gas, ctx.gas_budget)))
+
+
+def launchpad_fill(ctx, a):
+    client = ctx.launchpad
+    from warehouse_loader import WarehouseLoader
+    loader = WarehouseLoader(client, a.collection_type, a.launchpad, a.checkpoint,
+                             admin_cap=a.admin_cap, workers=a.workers, rpc=ctx.rpc)
+    return loader.upload(a.source)
+
+
+def launchpad_verify(ctx, a):
+    _add_path(LAUNCHPAD_SCRIPTS)
+    from warehouse_verify import WarehouseVerifier
+    return WarehouseVerifier(a.launchpad, ctx.rpc, workers=a.workers).verify(a.source)
+
+
+def launchpad_mint(ctx, a):
+    sig = list(bytes.fromhex(a.sig)) if a.sig else []
+    return summarize(ctx.launchpad.sale_mint(a.collection_type, a.coin_type, a.launchpad, a.sale_plan,
+                                             str(a.plan_index), str(a.amount), sig, a.wallet, a.clock))
+
+
+def nft_mint(ctx, a):
+    _add_path(NFT_SCRIPTS)
+    from call import mint_nft, package
+    attrs = [pair.split("=", 1) for pair in a.attr]
+    keys, values = [k for k, _ in attrs], [v for _, v in attrs]
+    return summarize(ctx.leased(lambda gas: mint_nft(ctx.sui, a.name, a.description, a.url, keys, values,
+                                                     a.mint_cap, gas, ctx.gas_budget, a.package or package)))
+
+
+COMMANDS = {
+    ("market", "list"): market_list,
+    ("market", "delist"): market_delist,
+    ("market", "buy"): market_buy,
+    ("market", "reprice"): market_reprice,
+    ("market", "create"): market_create,
+    ("launchpad", "fill"): launchpad_fill,
+    ("launchpad", "verify"): launchpad_verify,
+    ("launchpad", "mint"): launchpad_mint,
+    ("nft", "mint"): nft_mint,
+}
+
+
+def run(ctx, args):
+    """Run a parsed command; `args` is a dict so it can come over the socket.
+
+    `gas_budget` applies to this command only. `stub_node` names the node
+    the caller expects; a context talking to another one refuses.
+    """
+    args = dict(args)
+    gas_budget, stub_node = args.pop("gas_budget", None), args.pop("stub_node", None)
+    if stub_node is not None and stub_node != ctx.stub_node:
+        raise ValueError("the daemon runs against %s, not %s; restart it or use --local" % (
+            ctx.stub_node or "the sui config's fullnode", stub_node))
+    return COMMANDS[(args["group"], args["action"])](ctx.scoped(gas_budget), argparse.Namespace(**args))
+
+
+def parser():
+    p = argparse.ArgumentParser(prog="cli.py", description="souffl3 market / launchpad / nft operations")
+    p.add_argument("--socket", default=default_socket())
+    p.add_argument("--local", action="store_true", help="run in this process even if a daemon is up")
+    p.add_argument("--stub-node", help="rehearse against a stub_node.StubNode at this URL")
+    p.add_argument("--gas-budget", type=int,
+                   help="for this command, or the default of a starting daemon (%d)" % GAS_BUDGET)
+    groups = p.add_subparsers(dest="group", required=True)
+
+    groups.add_parser("daemon", help="serve commands on --socket with warm clients")
+
+    market = groups.add_parser("market").add_subparsers(dest="action", required=True)
+    c = market.add_parser("list")
+    c.add_argument("collection_type")
+    c.add_argument("nft_id")
+    c.add_argument("price")
+    c.add_argument("marketplace")
+    c.add_argument("--coin-type", default=SUI)
+    c.add_argument("--generic", action="store_true")
+    c = market.add_parser("delist")
+    c.add_argument("collection_type")
+    c.add_argument("listing")
+    c.add_argument("safe")
+    c.add_argument("--allowlist", help="delist through the transfer allowlist instead of delist_generic")
+    c.add_argument("--coin-type", default=SUI)
+    c = market.add_parser("buy")
+    c.add_argument("collection_type")
+    c.add_argument("listing")
+    c.add_argument("safe")
+    c.add_argument("marketplace")
+    c.add_argument("--wallet", nargs="+", required=True, help="coins to pay with")
+    c.add_argument("--allowlist")
+    c.add_argument("--collection", help="needed with --allowlist")
+    c.add_argument("--coin-type", default=SUI)
+    c = market.add_parser("reprice")
+    c.add_argument("listing")
+    c.add_argument("price")
+    c.add_argument("--coin-type", default=SUI)
+    c = market.add_parser("create")
+    c.add_argument("beneficiary")
+    c.add_argument("fee")
+
+    launchpad = groups.add_parser("launchpad").add_subparsers(dest="action", required=True)
+    c = launchpad.add_parser("fill")
+    c.add_argument("source")
+    c.add_argument("checkpoint")
+    c.add_argument("collection_type")
+    c.add_argument("launchpad")
+    c.add_argument("admin_cap")
+    c.add_argument("--workers", type=int, default=4)
+    c = launchpad.add_parser("verify")
+    c.add_argument("source")
+    c.add_argument("launchpad")
+    c.add_argument("--workers", type=int, default=8)
+    c = launchpad.add_parser("mint")
+    c.add_argument("collection_type")
+    c.add_argument("launchpad")
+    c.add_argument("sale_plan")
+    c.add_argument("plan_index", type=int)
+    c.add_argument("amount", type=int)
+    c.add_argument("--wallet", nargs="+", required=True, help="coins to pay with")
+    c.add_argument("--sig", help="whitelist signature, hex")
+    c.add_argument("--clock", default=CLOCK)
+    c.add_argument("--coin-type", default=SUI)
+
+    nft = groups.add_parser("nft").add_subparsers(dest="action", required=True)
+    c = nft.add_parser("mint")
+    c.add_argument("name")
+    c.add_argument("description")
+    c.add_argument("url")
+    c.add_argument("mint_cap")
+    c.add_argument("--attr", action="append", default=[], help="key=value, repeatable")
+    c.add_argument("--package")
+    return p
+
+
+def _connect(path):
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(path)
+    except (FileNotFoundError, ConnectionRefusedError):
+        sock.close()
+        return None
+    return sock
+
+
+def ask_daemon(path, args):
+    """The daemon's reply to `args`, or None when no daemon is listening."""
+    sock = _connect(path)
+    if sock is None:
+        return None
+    with sock, sock.makefile("rwb") as f:
+        f.write(json.dumps(args).encode() + b"\n")
+        f.flush()
+        return json.loads(f.readline())
+
+
+def serve(path, ctx):
+    import socketserver
+
+    class Handler(socketserver.StreamRequestHandler):
+
+        def handle(self):
+            for line in self.rfile:
+                try:
+                    reply = {"ok": True, "result": run(ctx, json.loads(line))}
+                except Exception as e:
+                    reply = {"ok": False, "error": "%s: %s" % (type(e).__name__, e)}
+                self.wfile.write(json.dumps(reply).encode() + b"\n")
+                self.wfile.flush()
+
+    sock = _connect(path)
+    if sock is not None:
+        sock.close()
+        raise SystemExit("a daemon is already listening on %s" % path)
+    if os.path.exists(path):
+        # left behind by a daemon that did not shut down cleanly
+        os.unlink(path)
+    server = socketserver.ThreadingUnixStreamServer(path, Handler, bind_and_activate=False)
+    server.daemon_threads = True
+    # the socket signs transactions with the operator's keys: owner only
+    old_umask = os.umask(0o177)
+    try:
+        server.server_bind()
+    finally:
+        os.umask(old_umask)
+    server.server_activate()
+    print("serving on %s" % path, file=sys.stderr)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        os.unlink(path)
+
+
+def main(argv):
+    args = parser().parse_args(argv)
+    socket_path, local, stub_node = args.socket, args.local, args.stub_node
+    if args.group == "daemon":
+        return serve(socket_path, Context(stub_node, args.gas_budget or GAS_BUDGET, long_lived=True))
+    # the daemon does not share our working directory
+    for name in ("source", "checkpoint"):
+        if getattr(args, name, None):
+            setattr(args, name, os.path.abspath(getattr(args, name)))
+    request = {k: v for k, v in vars(args).items() if k not in ("socket", "local")}
+    reply = None if local else ask_daemon(socket_path, request)
+    if reply is None:
+        try:
+            reply = {"ok": True, "result": run(Context(stub_node), request)}
+        except AssertionError as e:
+            reply = {"ok": False, "error": "AssertionError: %s" % e}
+    if not reply["ok"]:
+        print(reply["error"], file=sys.stderr)
+        return 1
+    print(json.dumps(reply["result"], indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,239 @@
+import time
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+
+from rpc import default_client, RpcError, RpcTransportError
+from cache import default_cache
+from sui_types import TxEffects, parse_type
+from util import batch_get_obj_types
+
+
+class Confirmation:
+    """A final transaction: its effects and the types of the objects it created or mutated."""
+
+    __slots__ = ("digest", "effects", "types")
+
+    def __init__(self, digest, effects, types):
+        self.digest = digest
+        self.effects = effects
+        self.types = types
+
+    @property
+    def ok(self):
+        return self.effects.ok
+
+    def created(self):
+        """`[(OwnedObjectRef, MoveType)]` of the created objects whose type is known."""
+        return [(o, parse_type(self.types[o.object_id])) for o in self.effects.created if o.object_id in self.types]
+
+    def mutated(self):
+        return [(o, parse_type(self.types[o.object_id])) for o in self.effects.mutated if o.object_id in self.types]
+
+    def find(self, module, name):
+        """Id of the first created object of type `module::name`, or None."""
+        for obj, obj_type in self.created():
+            if obj_type.is_a(module, name):
+                return obj.object_id
+        return None
+
+    def __repr__(self):
+        return "Confirmation(%s, %s)" % (self.digest, "ok" if self.ok else self.effects.error)
+
+
+class _Pending:
+    __slots__ = ("future", "deadline", "delay", "next_poll")
+
+    def __init__(self, future, deadline, delay, next_poll):
+        self.future = future
+        self.deadline = deadline
+        self.delay = delay
+        self.next_poll = next_poll
+
+
+class FinalityTracker:
+    """Confirms many submitted transactions with batched polling.
+
+    `track(digest)` returns a Future resolving to a Confirmation. One
+    background thread polls the digests that are due, `batch_size`
+    sui_getTransaction calls to a JSON-RPC batch, and resolves the object
+    types of everything that became final in one more batched lookup.
+    A digest is first polled `min_interval` after it is tracked; each
+    miss doubles its wait, up to `max_interval`. Digests falling due
+    within `min_interval` of each other go out in the same round, so a
+    burst is polled together. A digest still unknown after `timeout`
+    seconds fails with TimeoutError. A batch that fails with anything but
+    RpcError / RpcTransportError fails its digests with that exception, and
+    a reply whose effects do not parse fails that digest alone.
+
+    Confirmed effects and types go into the shared cache, so the util
+    resolvers (`get_list_obj` and friends) answer from it afterwards.
+    Effects are polled; the 0.18 fullnode only streams them over a
+    websocket subscription, which these scripts have no client for.
+    """
+
+    def __init__(self, rpc=None, batch_size=100, type_chunk_size=200, min_interval=0.25, max_interval=2.0,
+                 timeout=60.0, resolve_types=True):
+        self.rpc = rpc or default_client()
+        self.batch_size = batch_size
+        self.type_chunk_size = type_chunk_size
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.timeout = timeout
+        self.resolve_types = resolve_types
+        # polling rounds and sui_getTransaction batches sent
+        self.rounds = 0
+        self.requests = 0
+        self._pending = OrderedDict()
+        self._cond = threading.Condition()
+        self._thread = None
+        self._closed = False
+
+    def track(self, digest, callback=None):
+        """Future for `digest`; `callback(future)` runs once it is done."""
+        with self._cond:
+            assert not self._closed, "tracker is closed"
+            idle = not self._pending
+            entry = self._pending.get(digest)
+            if entry is None:
+                now = time.monotonic()
+                entry = self._pending[digest] = _Pending(Future(), now + self.timeout, self.min_interval,
+                                                         now + self.min_interval)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, daemon=True)
+                self._thread.start()
+            # a busy poller wakes up before any new digest is due anyway
+            if idle:
+                self._cond.notify()
+        if callback is not None:
+            entry.future.add_done_callback(callback)
+        return entry.future
+
+    def track_all(self, digests, callback=None):
+        return [self.track(digest, callback) for digest in digests]
+
+    def confirm_all(self, digests, timeout=None):
+        """Block until every digest is final; Confirmations in input order."""
+        return [future.result(timeout) for future in self.track_all(digests)]
+
+    def _loop(self):
+        while True:
+            with self._cond:
+                while not self._closed:
+                    if self._pending:
+                        wait = min(e.next_poll for e in self._pending.values()) - time.monotonic()
+                        if wait <= 0:
+                            break
+                        self._cond.wait(wait)
+                    else:
+                        self._cond.wait()
+                if self._closed:
+                    return
+                horizon = time.monotonic() + self.min_interval
+                due = [digest for digest, e in self._pending.items() if e.next_poll <= horizon]
+            try:
+                self.poll(due)
+            except Exception as e:
+                # poll fails single digests or chunks itself; anything still
+                # escaping fails the round, and the poller lives on
+                self._fail(due, e)
+            with self._cond:
+                now = time.monotonic()
+                for digest in due:
+                    entry = self._pending.get(digest)
+                    if entry is not None:
+                        entry.delay = min(self.max_interval, entry.delay * 2)
+                        entry.next_poll = now + entry.delay
+                self._expire()
+
+    def poll(self, digests):
+        """One round over `digests`; returns how many became final."""
+        final = {}
+        for i in range(0, len(digests), self.batch_size):
+            chunk = digests[i:i + self.batch_size]
+            self.requests = self.requests + 1
+            try:
+                replies = self.rpc.batch([("sui_getTransaction", [digest]) for digest in chunk])
+            except (RpcError, RpcTransportError):
+                # the node is struggling; these wait for the next, later round
+                continue
+            except Exception as e:
+                # e.g. an HTTP 4xx: asking again will not help this chunk
+                self._fail(chunk, e)
+                continue
+            for digest, envelope in zip(chunk, replies):
+                # an error reply means the node does not know the digest yet
+                if "result" in envelope:
+                    final[digest] = envelope
+        self.rounds = self.rounds + 1
+        if final:
+            self._resolve(final)
+        return len(final)
+
+    def _resolve(self, final):
+        cache = default_cache()
+        effects = {}
+        broken = {}
+        for digest, envelope in final.items():
+            try:
+                effects[digest] = TxEffects.from_json(envelope["result"]["effects"])
+            except Exception as e:
+                # only this digest fails; the rest of the batch is final all the same
+                broken[digest] = e
+                continue
+            cache.transactions.set(digest, envelope)
+            cache.effects.set(digest, effects[digest])
+        for digest, error in broken.items():
+            self._fail([digest], error)
+        types = {}
+        if self.resolve_types:
+            gas_objects = {e.gas_object.object_id for e in effects.values() if e.gas_object is not None}
+            ids = [o.object_id for e in effects.values() for o in e.created + e.mutated
+                   if o.object_id not in gas_objects]
+            try:
+                types = batch_get_obj_types(ids, self.rpc, self.type_chunk_size)
+            except Exception:
+                # effects are final either way; callers can look the types up later
+                types = {}
+        with self._cond:
+            entries = [(self._pending.pop(digest, None), digest) for digest in effects]
+        for entry, digest in entries:
+            if entry is not None and not entry.future.done():
+                e = effects[digest]
+                ids = [o.object_id for o in e.created + e.mutated]
+                entry.future.set_result(Confirmation(digest, e, {i: types[i] for i in ids if i in types}))
+
+    def _fail(self, digests, error):
+        with self._cond:
+            entries = [self._pending.pop(digest, None) for digest in digests]
+        for entry in entries:
+            if entry is not None and not entry.future.done():
+                entry.future.set_exception(error)
+
+    def _expire(self):
+        now = time.monotonic()
+        expired = [(digest, entry) for digest, entry in self._pending.items() if entry.deadline <= now]
+        for digest, entry in expired:
+            del self._pending[digest]
+            entry.future.set_exception(TimeoutError("%s not final after %.0fs" % (digest, self.timeout)))
+
+    def pending(self):
+        with self._cond:
+            return len(self._pending)
+
+    def close(self):
+        """Stop polling; digests still pending fail."""
+        with self._cond:
+            self._closed = True
+            pending, self._pending = self._pending, OrderedDict()
+            self._cond.notify_all()
+        for entry in pending.values():
+            entry.future.set_exception(RuntimeError("finality tracker closed"))
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
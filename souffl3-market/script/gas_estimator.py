@@ -0,0 +1,147 @@
+import json
+import math
+import threading
+
+from rpc import default_client
+from cache import LRUCache, MISSING
+from util import extract_effects
+
+# budgets never go below this, so a cheap dry run cannot starve a call
+MIN_GAS_BUDGET = 1000
+# the node rejects budgets above this
+MAX_GAS_BUDGET = 1000000
+
+
+def json_value(value):
+    """pysui scalar / array wrapper -> plain JSON value."""
+    if hasattr(value, "array"):
+        return [json_value(v) for v in value.array]
+    if isinstance(value, (list, tuple)):
+        return [json_value(v) for v in value]
+    if hasattr(value, "value"):
+        return value.value
+    return value if isinstance(value, (int, float, bool)) or value is None else str(value)
+
+
+def size_bucket(size):
+    """Power-of-two bucket of an argument payload size in bytes."""
+    return 1 << max(0, size - 1).bit_length()
+
+
+def gross_gas(effects):
+    """Computation + storage cost: what the budget has to cover before the rebate."""
+    used = effects.get("gasUsed", {})
+    return used.get("computationCost", 0) + used.get("storageCost", 0)
+
+
+class ShapeStats:
+    __slots__ = ("calls", "under", "budget", "used")
+
+    def __init__(self):
+        self.calls = 0
+        self.under = 0
+        self.budget = 0
+        self.used = 0
+
+
+class GasEstimator:
+    """Gas budgets from dry runs, cached per call shape.
+
+    A shape is (package, module, function, type arguments, argument size
+    bucket); the first call of a shape is dry-run through `sui_moveCall` +
+    `sui_dryRunTransaction` and later calls of the same shape reuse the
+    costliest-per-byte measurement of it, scaled up when their arguments
+    are bigger than the measured ones (a bucket spans up to 2x). The budget is
+    that times `margin`, clamped to [MIN_GAS_BUDGET, MAX_GAS_BUDGET].
+
+    `observe()` feeds the real cost back after execution, raising the
+    shape's estimate if it was exceeded; `report()` says how close the
+    budgets were.
+    """
+
+    def __init__(self, rpc=None, margin=1.2, maxsize=4096):
+        self.rpc = rpc or default_client()
+        self.margin = margin
+        self.costs = LRUCache(maxsize)
+        self.estimates = 0
+        self.dry_runs = 0
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def shape(self, package, module, function, type_arguments, arguments):
+        """`(shape, argument size)` of a move call."""
+        type_arguments = json_value(type_arguments)
+        size = len(json.dumps(json_value(arguments)))
+        return (package, module, function, tuple(type_arguments), size_bucket(size)), size
+
+    def budget(self, cost):
+        return min(MAX_GAS_BUDGET, max(MIN_GAS_BUDGET, int(math.ceil(cost * self.margin))))
+
+    def estimate(self, signer, package, module, function, type_arguments, arguments):
+        """`(budget, shape)` for a move call."""
+        shape, size = self.shape(package, module, function, type_arguments, arguments)
+        with self._lock:
+            self.estimates = self.estimates + 1
+        known = self.costs.get(shape, MISSING)
+        if known is MISSING:
+            cost = self.dry_run(signer, package, module, function, type_arguments, arguments)
+            self._raise(shape, cost, size)
+        else:
+            cost, measured_size = known
+            cost = cost * max(1.0, size / measured_size)
+        return self.budget(cost), (shape, size)
+
+    def dry_run(self, signer, package, module, function, type_arguments, arguments):
+        """Gross gas cost of the call; the node picks the gas coin."""
+        txn = self.rpc.call("sui_moveCall", [
+            json_value(signer), json_value(package), module, function,
+            json_value(type_arguments), json_value(arguments), None, MAX_GAS_BUDGET,
+        ])
+        effects = self.rpc.call("sui_dryRunTransaction", [txn["txBytes"]])
+        with self._lock:
+            self.dry_runs = self.dry_runs + 1
+        status = effects.get("status", {})
+        assert status.get("status") == "success", "dry run of %s::%s failed: %s" % (
+            module, function, status.get("error"))
+        return gross_gas(effects)
+
+    def _raise(self, shape, cost, size):
+        # keep the measurement with the highest cost per argument byte
+        with self._lock:
+            known = self.costs.get(shape)
+            if known is None or cost / max(1, size) > known[0] / max(1, known[1]):
+                self.costs.set(shape, (cost, max(1, size)))
+
+    def observe(self, key, budget, result):
+        """Record what a call estimated as `(budget, key)` actually cost."""
+        effects = extract_effects(result) if result is not None else None
+        if not effects:
+            return
+        shape, size = key
+        cost = gross_gas(effects)
+        self._raise(shape, cost, size)
+        with self._lock:
+            stats = self._stats.get(shape)
+            if stats is None:
+                stats = self._stats[shape] = ShapeStats()
+            stats.calls = stats.calls + 1
+            stats.budget = stats.budget + budget
+            stats.used = stats.used + cost
+            if cost > budget:
+                stats.under = stats.under + 1
+
+    def report(self):
+        """Per-function accuracy: calls, budgets too small, and cost / budget."""
+        with self._lock:
+            by_function = {}
+            for (package, module, function, _, _), stats in self._stats.items():
+                entry = by_function.setdefault("%s::%s" % (module, function),
+                                               {"shapes": 0, "calls": 0, "under": 0, "budget": 0, "used": 0})
+                entry["shapes"] = entry["shapes"] + 1
+                entry["calls"] = entry["calls"] + stats.calls
+                entry["under"] = entry["under"] + stats.under
+                entry["budget"] = entry["budget"] + stats.budget
+                entry["used"] = entry["used"] + stats.used
+            for entry in by_function.values():
+                entry["utilization"] = entry["used"] / entry["budget"] if entry["budget"] else 0.0
+            return {"estimates": self.estimates, "dry_runs": self.dry_runs, "functions": by_function}
@@ -0,0 +1,229 @@
+import time
+import threading
+
+from pysui.sui.sui_types.scalars import SuiString, SuiInteger
+from pysui.sui.sui_types.collections import SuiArray
+
+from util import extract_effects, gas_used
+from rpc import backoff_delay
+from metrics import active as active_metrics
+
+SUI_COIN_TYPE = "0x2::sui::SUI"
+# how long the market and launchpad clients wait for a coin to come free
+LEASE_TIMEOUT = 60.0
+
+
+class GasPoolExhausted(Exception):
+    pass
+
+
+class GasCoin:
+
+    def __init__(self, identifier, balance, version=None):
+        # identifier is kept as pysui gave it so it can be passed straight back
+        self.identifier = identifier
+        self.key = str(identifier)
+        self.balance = balance
+        self.version = version
+        self.leased = False
+
+    def __repr__(self):
+        return "GasCoin(%s, balance=%s, version=%s)" % (self.identifier, self.balance, self.version)
+
+
+def _coin_from_sui_gas(gas):
+    balance = int(getattr(gas, "balance", 0))
+    version = getattr(gas, "version", None)
+    return GasCoin(gas.identifier, balance, version)
+
+
+class GasPool:
+    """Leases a distinct gas coin to every in-flight transaction.
+
+    Coins are fetched once with `client.get_gas`; afterwards versions and
+    balances are kept current from transaction effects, so sending a
+    transaction needs no extra round trip. While the pool holds fewer than
+    `target_size` coins, a background thread splits the largest coin with
+    `0x2::pay::divide_and_keep`; dust coins below `dust_balance` are merged
+    with `0x2::pay::join_vec`. A background replenish that raises is
+    counted in `metrics` and kept in `last_error`, then retried with
+    backoff up to `replenish_retries` times while the pool stays small.
+    """
+
+    def __init__(self, client, address=None, target_size=8, dust_balance=1000,
+                 gas_budget=1000, auto_replenish=True, replenish_retries=5, backoff=0.5, max_backoff=30.0,
+                 metrics=None):
+        self.client = client
+        self.address = address
+        self.target_size = target_size
+        self.dust_balance = dust_balance
+        self.gas_budget = gas_budget
+        self.auto_replenish = auto_replenish
+        self.replenish_retries = replenish_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.metrics = metrics if metrics is not None else active_metrics()
+        # failures of background replenishing, and the latest one if it has not recovered
+        self.replenish_errors = 0
+        self.last_error = None
+        self.coins = {}
+        self._loaded = False
+        self._cond = threading.Condition()
+        self._maintaining = False
+        self._excluded = set()
+
+    def refresh(self):
+        """Reload the coin set from the node, keeping current leases.
+
+        Known coins are updated in place: a caller still holding one
+        releases that same object afterwards.
+        """
+        result = self.client.get_gas(self.address)
+        assert result.is_ok()
+        with self._cond:
+            fresh = {}
+            for gas in result.result_data.data:
+                coin = _coin_from_sui_gas(gas)
+                if coin.key in self._excluded:
+                    continue
+                known = self.coins.get(coin.key)
+                if known is not None:
+                    known.balance, known.version = coin.balance, coin.version
+                    coin = known
+                fresh[coin.key] = coin
+            self.coins = fresh
+            self._loaded = True
+            self._cond.notify_all()
+
+    def exclude(self, coin_id):
+        """Keep `coin_id` out of the pool, e.g. because it is used as payment."""
+        with self._cond:
+            self._excluded.add(str(coin_id))
+            self.coins.pop(str(coin_id), None)
+
+    def free_coins(self):
+        with self._cond:
+            return [coin for coin in self.coins.values() if not coin.leased]
+
+    def acquire(self, min_balance=0, timeout=None):
+        """Lease the largest free coin holding at least `min_balance`.
+
+        Fails at once when no coin, leased or not, holds that much, rather
+        than waiting for a release that cannot help.
+        """
+        if not self._loaded:
+            self.refresh()
+        with self._cond:
+            coin = self._cond.wait_for(lambda: self._pick(min_balance) or not self._reachable(min_balance), timeout)
+            if coin is True:
+                raise GasPoolExhausted("no gas coin holds balance >= %d" % min_balance)
+            if not coin:
+                raise GasPoolExhausted("no free gas coin with balance >= %d" % min_balance)
+            coin.leased = True
+            low = len(self.coins) < self.target_size
+        if self.auto_replenish and low:
+            self._schedule_maintenance()
+        return coin
+
+    def release(self, coin, result=None):
+        """Return a leased coin, updating it from the transaction's effects."""
+        effects = extract_effects(result) if result is not None else None
+        with self._cond:
+            if effects is not None:
+                self._apply_effects(coin, effects)
+            coin.leased = False
+            self._cond.notify_all()
+
+    def _pick(self, min_balance):
+        best = None
+        for coin in self.coins.values():
+            if coin.leased or coin.balance < min_balance:
+                continue
+            if best is None or coin.balance > best.balance:
+                best = coin
+        return best
+
+    def _reachable(self, min_balance):
+        return any(coin.balance >= min_balance for coin in self.coins.values())
+
+    def _apply_effects(self, coin, effects):
+        gas_object = effects.get("gasObject", {}).get("reference", {})
+        if gas_object.get("objectId") == coin.key:
+            coin.version = gas_object.get("version", coin.version)
+        coin.balance = coin.balance - gas_used(effects)
+        for deleted in effects.get("deleted", []):
+            self.coins.pop(deleted.get("objectId"), None)
+
+    def _schedule_maintenance(self):
+        with self._cond:
+            if self._maintaining:
+                return
+            self._maintaining = True
+        threading.Thread(target=self._maintain, daemon=True).start()
+
+    def _maintain(self):
+        try:
+            for attempt in range(self.replenish_retries + 1):
+                if attempt:
+                    time.sleep(backoff_delay(attempt - 1, self.backoff, self.max_backoff))
+                    with self._cond:
+                        if len(self.coins) >= self.target_size:
+                            return
+                try:
+                    self.replenish()
+                except Exception as e:
+                    # nobody waits on this thread: record it and try again later
+                    self.replenish_errors = self.replenish_errors + 1
+                    self.last_error = e
+                    if self.metrics is not None:
+                        self.metrics.gas_pool_error(type(e).__name__)
+                    continue
+                self.last_error = None
+                return
+        finally:
+            with self._cond:
+                self._maintaining = False
+
+    def replenish(self):
+        """Merge dust coins and split the largest free coin, then reload."""
+        free = sorted(self.free_coins(), key=lambda c: c.balance, reverse=True)
+        # a coin cannot pay gas for a call that takes it as an argument
+        if len(free) < 2:
+            return
+        dust = [c for c in free[1:] if c.balance < self.dust_balance]
+        if len(dust) > 1:
+            done = self._move_call(free[0], dust, "join_vec", [SuiString(dust[0].key), SuiArray([SuiString(c.key) for c in dust[1:]])])
+        elif len(self.coins) < self.target_size:
+            pieces = self.target_size - len(self.coins) + 1
+            done = self._move_call(free[1], [free[0]], "divide_and_keep", [SuiString(free[0].key), SuiString(str(pieces))])
+        else:
+            done = False
+        if done:
+            self.refresh()
+
+    def _move_call(self, gas_coin, arg_coins, function, arguments):
+        with self._cond:
+            # all coins touched by the call must be free, or another
+            # transaction could be using them right now
+            if any(c.leased for c in [gas_coin] + arg_coins):
+                return False
+            for c in [gas_coin] + arg_coins:
+                c.leased = True
+        result = None
+        try:
+            result = self.client.move_call_txn(
+                signer=self.address or self.client.config.active_address,
+                package_object_id=SuiString("0x2"),
+                module=SuiString("pay"),
+                function=SuiString(function),
+                type_arguments=SuiArray([SuiString(SUI_COIN_TYPE)]),
+                arguments=arguments,
+                gas=gas_coin.identifier,
+                gas_budget=SuiInteger(self.gas_budget),
+            )
+        finally:
+            for c in arg_coins:
+                self.release(c)
+            self.release(gas_coin, result)
+        return result.is_ok()
+
@@ -0,0 +1,249 @@
+import json
+import time
+import sqlite3
+
+from rpc import default_client
+from util import batch_get_obj_types, batch_get_transactions
+
+contract_address = "0x5f1fceec62555a2caee9173902c38429ca45182b"
+
+PAGE_SIZE = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    tx_seq INTEGER NOT NULL,
+    event_seq INTEGER NOT NULL,
+    tx_digest TEXT,
+    kind TEXT NOT NULL,
+    coin_type TEXT NOT NULL,
+    collection_type TEXT,
+    seller TEXT,
+    buyer TEXT,
+    nft_id TEXT,
+    safe_id TEXT,
+    listing_id TEXT,
+    marketplace TEXT,
+    price INTEGER,
+    old_price INTEGER,
+    timestamp INTEGER,
+    PRIMARY KEY (tx_seq, event_seq)
+);
+CREATE INDEX IF NOT EXISTS events_nft ON events (nft_id);
+CREATE INDEX IF NOT EXISTS events_seller ON events (seller);
+
+CREATE TABLE IF NOT EXISTS active_listings (
+    nft_id TEXT PRIMARY KEY,
+    listing_id TEXT,
+    safe_id TEXT,
+    seller TEXT NOT NULL,
+    coin_type TEXT NOT NULL,
+    collection_type TEXT,
+    marketplace TEXT,
+    price INTEGER NOT NULL,
+    listed_at INTEGER
+);
+CREATE INDEX IF NOT EXISTS listings_collection_price ON active_listings (collection_type, coin_type, price);
+CREATE INDEX IF NOT EXISTS listings_coin_price ON active_listings (coin_type, price);
+CREATE INDEX IF NOT EXISTS listings_seller ON active_listings (seller);
+
+CREATE TABLE IF NOT EXISTS cursor (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    cursor TEXT
+);
+"""
+
+EVENT_KINDS = ("ListEvent", "DelistEvent", "ChangePriceEvent", "BuyEvent")
+
+
+def parse_event_type(event_type):
+    """`0x..::Market::ListEvent<0x2::sui::SUI>` -> ("ListEvent", "0x2::sui::SUI")."""
+    base, _, coin_type = event_type.partition("<")
+    return base.rsplit("::", 1)[-1], coin_type[:-1]
+
+
+def _int(value):
+    return int(value) if value is not None else None
+
+
+def fetch_event_page(rpc, cursor, package=contract_address, page_size=PAGE_SIZE):
+    """One page of Market events after `cursor`: `(events, next_cursor)`."""
+    query = {"MoveModule": {"package": package, "module": "Market"}}
+    page = rpc.call("sui_getEvents", [query, cursor, page_size, False])
+    data = page.get("data", [])
+    events = [MarketEvent.from_envelope(e) for e in data]
+    next_cursor = page.get("nextCursor")
+    if next_cursor is None and data:
+        # the last page has no nextCursor; resume after its final event
+        next_cursor = data[-1]["id"]
+    return [e for e in events if e is not None], next_cursor
+
+
+def listed_type(transaction, nft_id, package=contract_address):
+    """Type argument of the Market `list` / `list_generic` call in `transaction` that listed `nft_id`."""
+    data = transaction.get("result", {}).get("certificate", {}).get("data", {})
+    for tx in data.get("transactions", []):
+        call = tx.get("Call")
+        if call is None or call.get("module") != "Market" or call.get("function") not in ("list", "list_generic"):
+            continue
+        call_package = call.get("package")
+        if isinstance(call_package, dict):
+            call_package = call_package.get("objectId")
+        if call_package == package and call.get("arguments", [None])[0] == nft_id:
+            return call["typeArguments"][0]
+    return None
+
+
+def resolve_collection_types(events, rpc=None, package=contract_address):
+    """`{nft_id: collection type}` for the listings in `events`.
+
+    The collection type is the first type argument the listing call was
+    made with, read from the listing transactions (one batch per page,
+    cached): `C` for `list<C, FT>`, the object type for `list_generic`.
+    When a transaction cannot be read, or did not list through this
+    package's Market directly, the NFT object's type stands in.
+    """
+    listings = [e for e in events if e.kind == "ListEvent"]
+    if not listings:
+        return {}
+    transactions = batch_get_transactions([e.tx_digest for e in listings if e.tx_digest], rpc)
+    res = {}
+    for e in listings:
+        nft_id = e.fields["nft_id"]
+        listed = listed_type(transactions[e.tx_digest], nft_id, package) if e.tx_digest in transactions else None
+        if listed is not None:
+            res[nft_id] = listed
+    unresolved = [e.fields["nft_id"] for e in listings if e.fields["nft_id"] not in res]
+    if unresolved:
+        res.update(batch_get_obj_types(unresolved, rpc))
+    return res
+
+
+class MarketEvent:
+    __slots__ = ("tx_seq", "event_seq", "tx_digest", "kind", "coin_type", "fields", "timestamp")
+
+    def __init__(self, tx_seq, event_seq, tx_digest, kind, coin_type, fields, timestamp):
+        self.tx_seq = tx_seq
+        self.event_seq = event_seq
+        self.tx_digest = tx_digest
+        self.kind = kind
+        self.coin_type = coin_type
+        self.fields = fields
+        self.timestamp = timestamp
+
+    @classmethod
+    def from_envelope(cls, envelope):
+        """One entry of a sui_getEvents page, or None if it is not a market event."""
+        move_event = envelope.get("event", {}).get("moveEvent")
+        if move_event is None:
+            return None
+        kind, coin_type = parse_event_type(move_event["type"])
+        if kind not in EVENT_KINDS:
+            return None
+        event_id = envelope.get("id", {})
+        return cls(
+            event_id.get("txSeq"), event_id.get("eventSeq"), envelope.get("txDigest"),
+            kind, coin_type, move_event.get("fields", {}), envelope.get("timestamp"),
+        )
+
+
+class EventIndexer:
+    """Mirrors the Market events into SQLite and keeps an active-listings table.
+
+    `sync()` pages through `sui_getEvents` from the stored cursor, so a
+    restarted indexer carries on where it stopped. Listing events carry no
+    collection type; it is stored as the type argument the listing call
+    was made with, the one MarketClient.list / list_generic take (see
+    resolve_collection_types).
+    """
+
+    def __init__(self, path, rpc=None, package=contract_address, page_size=PAGE_SIZE):
+        self.rpc = rpc or default_client()
+        self.package = package
+        self.page_size = page_size
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self.conn.commit()
+
+    def load_cursor(self):
+        row = self.conn.execute("SELECT cursor FROM cursor WHERE id = 1").fetchone()
+        return json.loads(row[0]) if row and row[0] else None
+
+    def sync(self, max_pages=None):
+        """Index every new event page. Returns the number of market events applied."""
+        cursor = self.load_cursor()
+        applied = 0
+        pages = 0
+        while max_pages is None or pages < max_pages:
+            events, next_cursor = fetch_event_page(self.rpc, cursor, self.package, self.page_size)
+            applied = applied + self.apply(events, next_cursor or cursor)
+            pages = pages + 1
+            if not next_cursor or next_cursor == cursor:
+                break
+            cursor = next_cursor
+        return applied
+
+    def run_forever(self, poll_interval=2.0):
+        while True:
+            if not self.sync():
+                time.sleep(poll_interval)
+
+    def apply(self, events, cursor, collection_types=None):
+        """Apply one page of events and advance the cursor in a single transaction."""
+        if collection_types is None:
+            collection_types = resolve_collection_types(events, self.rpc, self.package)
+        with self.conn:
+            rows = []
+            for e in events:
+                f = e.fields
+                rows.append((
+                    e.tx_seq, e.event_seq, e.tx_digest, e.kind, e.coin_type,
+                    collection_types.get(f.get("nft_id")), f.get("seller"), f.get("buyer"),
+                    f.get("nft_id"), f.get("safe_id"), f.get("listing_id"), f.get("marketplace"),
+                    _int(f.get("price", f.get("new_price"))), _int(f.get("old_price")), e.timestamp,
+                ))
+                self._apply_listing(e, collection_types)
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO events VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            self.conn.execute("INSERT OR REPLACE INTO cursor (id, cursor) VALUES (1, ?)", (json.dumps(cursor),))
+        return len(events)
+
+    def _apply_listing(self, e, collection_types):
+        f = e.fields
+        if e.kind == "ListEvent":
+            self.conn.execute(
+                "INSERT OR REPLACE INTO active_listings VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (f["nft_id"], f.get("listing_id"), f.get("safe_id"), f["seller"], e.coin_type,
+                 collection_types.get(f["nft_id"]), f.get("marketplace"), int(f["price"]), e.timestamp))
+        elif e.kind == "ChangePriceEvent":
+            self.conn.execute("UPDATE active_listings SET price = ? WHERE nft_id = ?",
+                              (int(f["new_price"]), f["nft_id"]))
+        else:
+            self.conn.execute("DELETE FROM active_listings WHERE nft_id = ?", (f["nft_id"],))
+
+    def active_listings(self, collection_type=None, coin_type=None, max_price=None, min_price=None,
+                        seller=None, limit=100):
+        """Active listings matching the filters, cheapest first, as dicts."""
+        clauses, args = [], []
+        for column, op, value in (("collection_type", "=", collection_type), ("coin_type", "=", coin_type),
+                                  ("price", "<=", max_price), ("price", ">=", min_price), ("seller", "=", seller)):
+            if value is not None:
+                clauses.append("%s %s ?" % (column, op))
+                args.append(value)
+        sql = "SELECT * FROM active_listings"
+        if clauses:
+            sql = sql + " WHERE " + " AND ".join(clauses)
+        sql = sql + " ORDER BY price LIMIT ?"
+        cur = self.conn.execute(sql, args + [limit])
+        columns = [d[0] for d in cur.description]
+        return [dict(zip(columns, row)) for row in cur.fetchall()]
+
+    def close(self):
+        self.conn.close()
+
+
+if __name__ == "__main__":
+    import sys
+    indexer = EventIndexer(sys.argv[1] if len(sys.argv) > 1 else "market_events.db")
+    indexer.run_forever()
@@ -2,14 +2,69 @@ from pysui.sui.sui_clients.sync_client import SuiClient
 from pysui.sui.sui_config import SuiConfig
 from pysui.sui.sui_types.scalars import SuiString, ObjectID, SuiInteger
 from pysui.sui.sui_types.collections import SuiArray
-from util import get_shared_obj, get_marketplace_obj, get_nft_obj, get_list_obj
+import json
+import time
+
+from util import get_shared_obj, get_marketplace_obj, get_nft_obj, get_list_obj, extract_effects
+from rpc import default_client
+from gas_pool import GasPool, GasPoolExhausted, LEASE_TIMEOUT
+from metrics import active as active_metrics
 
 contract_address = "0x5f1fceec62555a2caee9173902c38429ca45182b"
 
+# sui_batchTransaction limits; the node rejects transactions above 128KiB
+MAX_CALLS_PER_BATCH = 50
+MAX_BATCH_BYTES = 96 * 1024
+MAX_BATCH_GAS_BUDGET = 1000000
+
+
+class BulkItemResult:
+    """Outcome of one item of a bulk call; `digest` is the batch transaction it went out in.
+
+    `ok` is None when the batch's request failed in transit: it may have
+    executed, so check the chain before sending the item again.
+    """
+
+    def __init__(self, index, ok, digest=None, error=None):
+        self.index = index
+        self.ok = ok
+        self.digest = digest
+        self.error = error
+
+    def __repr__(self):
+        if self.ok:
+            return "BulkItemResult(%d, ok, %s)" % (self.index, self.digest)
+        return "BulkItemResult(%d, %s, %s)" % (self.index, "unknown" if self.ok is None else "failed", self.error)
+
 class MarketClient:
 
-    def __init__(self, client):
+    def __init__(self, client, rpc=None, gas_pool=None, gas_budget=10000, max_batch_gas_budget=MAX_BATCH_GAS_BUDGET,
+                 gas_estimator=None, metrics=None, gas_timeout=LEASE_TIMEOUT):
         self.client = client
+        # pooled JSON-RPC client shared with the util resolvers
+        self.rpc = rpc or default_client()
+        # leases a distinct gas coin per transaction so calls can run in parallel
+        self.gas_pool = gas_pool or GasPool(client)
+        self.gas_budget = gas_budget
+        # seconds to wait for a free gas coin before GasPoolExhausted
+        self.gas_timeout = gas_timeout
+        self.max_batch_gas_budget = max_batch_gas_budget
+        # when set, single calls get dry-run budgets instead of gas_budget
+        self.gas_estimator = gas_estimator
+        # per-function latency / gas / failure records; None skips them entirely
+        self.metrics = metrics if metrics is not None else active_metrics()
+
+    def get_shared_obj(self, txn_id):
+        return get_shared_obj(txn_id, self.rpc)
+
+    def get_marketplace_obj(self, txn_id):
+        return get_marketplace_obj(txn_id, self.rpc)
+
+    def get_nft_obj(self, txn_id):
+        return get_nft_obj(txn_id, self.rpc)
+
+    def get_list_obj(self, txn_id):
+        return get_list_obj(txn_id, self.rpc)
 
     def get_gas(self, for_address=None):
         """get_gas Utility func to refresh gas for address.
@@ -25,110 +80,208 @@ class MarketClient:
         # assert result.is_ok()
         return result.result_data.data
 
+    def _move_call(self, function, type_arguments, arguments):
+        gas_budget, shape = self.gas_budget, None
+        if self.gas_estimator is not None:
+            gas_budget, shape = self.gas_estimator.estimate(
+                self.client.config.active_address, contract_address, "Market", function, type_arguments, arguments)
+        coin = self.gas_pool.acquire(min_balance=gas_budget, timeout=self.gas_timeout)
+        result = None
+        start = time.perf_counter() if self.metrics is not None else 0
+        try:
+            result = self.client.move_call_txn(
+                signer=self.client.config.active_address,
+                package_object_id=SuiString(contract_address),
+                module=SuiString("Market"),
+                function=SuiString(function),
+                type_arguments=type_arguments,
+                arguments=arguments,
+                gas=coin.identifier,
+                gas_budget=SuiInteger(gas_budget),
+            )
+        finally:
+            self.gas_pool.release(coin, result)
+            if self.metrics is not None:
+                self.metrics.move_call("Market", function, time.perf_counter() - start, result, gas_budget)
+        if shape is not None:
+            self.gas_estimator.observe(shape, gas_budget, result)
+        assert result.is_ok(), result.result_string
+        return result
+
+    def _batch_move_call(self, calls, gas_budget):
+        """One sui_batchTransaction for `calls` = [(function, type_args, args), ...]."""
+        from pysui.sui.sui_builders.exec_builders import BatchTransaction, MoveCallRequestParams
+
+        params = [
+            MoveCallRequestParams(
+                package_object_id=ObjectID(contract_address),
+                module=SuiString("Market"),
+                function=SuiString(function),
+                type_arguments=SuiArray([SuiString(t) for t in type_arguments]),
+                arguments=SuiArray([SuiString(a) for a in arguments]),
+            )
+            for function, type_arguments, arguments in calls
+        ]
+        coin = self.gas_pool.acquire(min_balance=gas_budget, timeout=self.gas_timeout)
+        result = None
+        start = time.perf_counter() if self.metrics is not None else 0
+        try:
+            result = self.client.execute(BatchTransaction(
+                signer=self.client.config.active_address,
+                single_transaction_params=params,
+                gas=coin.identifier,
+                gas_budget=SuiInteger(gas_budget),
+            ))
+        finally:
+            self.gas_pool.release(coin, result)
+            if self.metrics is not None:
+                self.metrics.move_call("Market", "batch", time.perf_counter() - start, result, gas_budget)
+        return result
+
+    def _chunks(self, calls):
+        chunk, size = [], 0
+        for call in calls:
+            call_size = len(json.dumps(call[1:]))
+            if chunk and (len(chunk) >= MAX_CALLS_PER_BATCH
+                          or size + call_size > MAX_BATCH_BYTES
+                          or self.gas_budget * (len(chunk) + 1) > self.max_batch_gas_budget):
+                yield chunk
+                chunk, size = [], 0
+            chunk.append(call)
+            size = size + call_size
+        if chunk:
+            yield chunk
+
+    def _submit_chunk(self, chunk, results):
+        # a batch is atomic: when the node rejected or aborted it, split it to
+        # find the items at fault; any other failure leaves its fate unknown,
+        # and splitting would resend items that may have executed
+        try:
+            result = self._batch_move_call([call[1:] for call in chunk], self.gas_budget * len(chunk))
+        except GasPoolExhausted as e:
+            # nothing was sent, and halves would wait for a coin all over again
+            self._fail(chunk, results, False, str(e))
+            return
+        except Exception as e:
+            self._fail(chunk, results, None, "%s: %s" % (type(e).__name__, e))
+            return
+        effects = None
+        if not result.is_ok():
+            if isinstance(getattr(result, "result_data", None), Exception):
+                # pysui hands transport failures such as timeouts back as a result
+                self._fail(chunk, results, None, result.result_string)
+                return
+            error = result.result_string
+        else:
+            effects = extract_effects(result)
+            error = None
+            if effects is not None and effects["status"].get("status") != "success":
+                error = effects["status"].get("error", "failed")
+        if error is None:
+            digest = effects.get("transactionDigest") if effects else None
+            for call in chunk:
+                results[call[0]] = BulkItemResult(call[0], True, digest)
+        elif len(chunk) == 1:
+            self._fail(chunk, results, False, error)
+        else:
+            half = len(chunk) // 2
+            self._submit_chunk(chunk[:half], results)
+            self._submit_chunk(chunk[half:], results)
+
+    @staticmethod
+    def _fail(chunk, results, ok, error):
+        for call in chunk:
+            results[call[0]] = BulkItemResult(call[0], ok, error=error)
+
+    def _bulk(self, calls):
+        indexed = [(i,) + tuple(call) for i, call in enumerate(calls)]
+        results = [None] * len(indexed)
+        for chunk in self._chunks(indexed):
+            self._submit_chunk(chunk, results)
+        return results
+
+    def bulk_list(self, collection_type_arg, coin_type_arg, nft_ids, prices, marketplace, generic=False):
+        """List many NFTs in as few transactions as the batch limits allow.
+
+        Returns one BulkItemResult per NFT, in input order.
+        """
+        function = "list_generic" if generic else "list"
+        return self._bulk([
+            (function, [collection_type_arg, coin_type_arg], [nft_id, str(price), marketplace])
+            for nft_id, price in zip(nft_ids, prices)
+        ])
+
+    def bulk_delist(self, collection_type_arg, coin_type_arg, listings, allowlist=None):
+        """`listings` is a list of (listing, safe); without `allowlist` delist_generic is used."""
+        if allowlist is None:
+            calls = [("delist_generic", [collection_type_arg, coin_type_arg], [listing, safe])
+                     for listing, safe in listings]
+        else:
+            calls = [("delist", [collection_type_arg, coin_type_arg], [listing, safe, allowlist])
+                     for listing, safe in listings]
+        return self._bulk(calls)
+
+    def bulk_change_price(self, coin_type_arg, listings, prices):
+        return self._bulk([
+            ("change_price", [coin_type_arg], [listing, str(price)])
+            for listing, price in zip(listings, prices)
+        ])
+
+    def _exclude_wallet(self, wallet):
+        # coins paid into a call must never be leased out as gas for it
+        for coin_id in wallet:
+            self.gas_pool.exclude(coin_id)
+
     def list(self, collection_type_arg, coin_type_arg, nft_id, price, marketplace):
-        gases = self.get_gas()
-        result = self.client.move_call_txn(
-            signer=self.client.config.active_address,
-            package_object_id=SuiString(contract_address),
-            module=SuiString("Market"),
-            function=SuiString("list"),
-            type_arguments=SuiArray([SuiString(collection_type_arg), SuiString(coin_type_arg)]),
-            arguments=[SuiString(nft_id), SuiString(price), SuiString(marketplace)],
-            gas=gases[0].identifier,
-            gas_budget=SuiInteger(10000),
+        return self._move_call(
+            "list",
+            SuiArray([SuiString(collection_type_arg), SuiString(coin_type_arg)]),
+            [SuiString(nft_id), SuiString(price), SuiString(marketplace)],
         )
-        assert result.is_ok()
-        return result
 
     def list_generic(self, collection_type_arg, coin_type_arg, nft_id, price, marketplace):
-        gases = self.get_gas()
-        result = self.client.move_call_txn(
-            signer=self.client.config.active_address,
-            package_object_id=SuiString(contract_address),
-            module=SuiString("Market"),
-            function=SuiString("list_generic"),
-            type_arguments=SuiArray([SuiString(collection_type_arg), SuiString(coin_type_arg)]),
-            arguments=[SuiString(nft_id), SuiString(price), SuiString(marketplace)],
-            gas=gases[0].identifier,
-            gas_budget=SuiInteger(10000),
+        return self._move_call(
+            "list_generic",
+            SuiArray([SuiString(collection_type_arg), SuiString(coin_type_arg)]),
+            [SuiString(nft_id), SuiString(price), SuiString(marketplace)],
         )
-        assert result.is_ok()
-        return result
 
     def delist(self, collection_type_arg, coin_type_arg, listing, safe, allowlist):
-        gases = self.get_gas()
-        result = self.client.move_call_txn(
-            signer=self.client.config.active_address,
-            package_object_id=SuiString(contract_address),
-            module=SuiString("Market"),
-            function=SuiString("delist"),
-            type_arguments=SuiArray([SuiString(collection_type_arg), SuiString(coin_type_arg)]),
-            arguments=[SuiString(listing), SuiString(safe), SuiString(allowlist)],
-            gas=gases[0].identifier,
-            gas_budget=SuiInteger(10000),
+        return self._move_call(
+            "delist",
+            SuiArray([SuiString(collection_type_arg), SuiString(coin_type_arg)]),
+            [SuiString(listing), SuiString(safe), SuiString(allowlist)],
         )
-        assert result.is_ok()
-        return result
 
     def delist_generic(self, collection_type_arg, coin_type_arg, listing, safe):
-        gases = self.get_gas()
-        result = self.client.move_call_txn(
-            signer=self.client.config.active_address,
-            package_object_id=SuiString(contract_address),
-            module=SuiString("Market"),
-            function=SuiString("delist_generic"),
-            type_arguments=SuiArray([SuiString(collection_type_arg), SuiString(coin_type_arg)]),
-            arguments=[SuiString(listing), SuiString(safe)],
-            gas=gases[0].identifier,
-            gas_budget=SuiInteger(10000),
+        return self._move_call(
+            "delist_generic",
+            SuiArray([SuiString(collection_type_arg), SuiString(coin_type_arg)]),
+            [SuiString(listing), SuiString(safe)],
         )
-        assert result.is_ok()
-        return result
 
     def buy(self, collection_type_arg, coin_type_arg, listing, safe, allowlist, market, collection, wallet):
-        gases = self.get_gas()
-        result = self.client.move_call_txn(
-            signer=self.client.config.active_address,
-            package_object_id=SuiString(contract_address),
-            module=SuiString("Market"),
-            function=SuiString("buy"),
-            type_arguments=SuiArray([SuiString(collection_type_arg), SuiString(coin_type_arg)]),
-            arguments=[SuiString(listing), SuiString(safe), SuiString(allowlist), SuiString(market), SuiString(collection), SuiArray(wallet)],
-            gas=gases[0].identifier,
-            gas_budget=SuiInteger(10000),
+        self._exclude_wallet(wallet)
+        return self._move_call(
+            "buy",
+            SuiArray([SuiString(collection_type_arg), SuiString(coin_type_arg)]),
+            [SuiString(listing), SuiString(safe), SuiString(allowlist), SuiString(market), SuiString(collection), SuiArray(wallet)],
         )
-        assert result.is_ok()
-        return result
 
     def buy_generic(self, collection_type_arg, coin_type_arg, listing, safe, market, wallet):
-        gases = self.get_gas()
-        result = self.client.move_call_txn(
-            signer=self.client.config.active_address,
-            package_object_id=SuiString(contract_address),
-            module=SuiString("Market"),
-            function=SuiString("buy_generic"),
-            type_arguments=SuiArray([SuiString(collection_type_arg), SuiString(coin_type_arg)]),
-            arguments=[SuiString(listing), SuiString(safe), SuiString(market),SuiArray(wallet)],
-            gas=gases[0].identifier,
-            gas_budget=SuiInteger(10000),
+        self._exclude_wallet(wallet)
+        return self._move_call(
+            "buy_generic",
+            SuiArray([SuiString(collection_type_arg), SuiString(coin_type_arg)]),
+            [SuiString(listing), SuiString(safe), SuiString(market),SuiArray(wallet)],
         )
-        assert result.is_ok()
-        return result
 
     def change_price(self, coin_type_arg, listing, price):
-        gases = self.get_gas()
-        result = self.client.move_call_txn(
-            signer=self.client.config.active_address,
-            package_object_id=SuiString(contract_address),
-            module=SuiString("Market"),
-            function=SuiString("change_price"),
-            type_arguments=SuiArray([SuiString(coin_type_arg)]),
-            arguments=[SuiString(listing), SuiString(price)],
-            gas=gases[0].identifier,
-            gas_budget=SuiInteger(10000),
+        return self._move_call(
+            "change_price",
+            SuiArray([SuiString(coin_type_arg)]),
+            [SuiString(listing), SuiString(price)],
         )
-        assert result.is_ok()
-        return result
 
 
 if __name__ == "__main__":
@@ -137,9 +290,9 @@ if __name__ == "__main__":
     print(client.config.active_address)
     market_client = MarketClient(client)
 
-    collection_info = get_shared_obj("GqYs3c1s2fdrhCLJZQCsbfiP6X8Dn8cqphcDQFYw1m9K")
-    marketplace_info = get_marketplace_obj("DFSoLyNoFTdtX1YCvkT3CUwBwnRQhzp9TMBR1zkRFnyp")
-    nft = get_nft_obj("CEhK4sKFG3pKEYhLN9LcJJagJEyDYvjPH8CaVxnvud9x")
+    collection_info = market_client.get_shared_obj("GqYs3c1s2fdrhCLJZQCsbfiP6X8Dn8cqphcDQFYw1m9K")
+    marketplace_info = market_client.get_marketplace_obj("DFSoLyNoFTdtX1YCvkT3CUwBwnRQhzp9TMBR1zkRFnyp")
+    nft = market_client.get_nft_obj("CEhK4sKFG3pKEYhLN9LcJJagJEyDYvjPH8CaVxnvud9x")
     # nft = get_nft_obj("CvAQ5GqMHn6RPG9ZSPvapt7zd6PAZyfEocS7gy1rXvmW")
 
     # result = market_client.list("0xae92eea71b1d19a3a3205c230facd65c876e40d0::suimarines::SUIMARINES", "0x2::sui::SUI", nft["nft"], "1000", marketplace_info["marketplace"])
@@ -152,7 +305,7 @@ if __name__ == "__main__":
     # )
 
     list_digest = "ohgY1zsdQ1aVGnwse9bUeaCCcVo1uNJraxhNWGVf3LG"
-    list_obj = get_list_obj(list_digest)
+    list_obj = market_client.get_list_obj(list_digest)
     # print(list_obj)
     # result = market_client.delist(
     #     "0xae92eea71b1d19a3a3205c230facd65c876e40d0::suimarines::SUIMARINES",
@@ -3,6 +3,9 @@ from pysui.sui.sui_config import SuiConfig
 from pysui.sui.sui_types.scalars import SuiString, ObjectID, SuiInteger
 from pysui.sui.sui_types.collections import SuiArray
 
+contract_address = "0x5f1fceec62555a2caee9173902c38429ca45182b"
+
+
 def get_gas(client, for_address=None):
     """get_gas Utility func to refresh gas for address.
     :param client: _description_
@@ -18,32 +21,40 @@ def get_gas(client, for_address=None):
     return result.result_data.data
 
 
-cfg = SuiConfig.default()
-client = SuiClient(cfg)
-gases = get_gas(client)
-print(gases[0].identifier)
-print(client.config.active_address)
-
-result = client.move_call_txn(
-    signer=client.config.active_address,
-    package_object_id=SuiString("0x5f1fceec62555a2caee9173902c38429ca45182b"),
-    module=SuiString("marketplace"),
-    function=SuiString("create_market"),
-    type_arguments=SuiArray([]),
-    arguments=[SuiString("0x8a19ca58c96d873a17cbb17a27b04d6c5d604eff"), SuiString("1000")],
-    gas=gases[0].identifier,
-    gas_budget=SuiInteger(10000),
-)
-
-print(result.result_data)
-
-# result = client.move_call_txn(
-#     signer=client.config.active_address,
-#     package_object_id=SuiString("0xce5c7d026f080e57a48cadb1b0b023ada602e4d3"),
-#     module=SuiString("suimarines"),
-#     function=SuiString("mint_nft"),
-#     type_arguments=SuiArray([]),
-#     arguments=[SuiString("name"), SuiString("description"), SuiString("1"), SuiArray(["key"]), SuiArray(["val"]), SuiString("0x2edb77eb18a8980ed56612567530fdf2b02ede4f"), SuiString("0x4a46f10fe5e3ec2a278a20bdb31cdbe0ae70a60f")],
-#     gas=gases[0].identifier,
-#     gas_budget=SuiInteger(10000),
-# )
+def create_market(client, beneficiary, fee, gas=None, gas_budget=10000):
+    """marketplace::create_market; pays with the first gas coin unless `gas` is given."""
+    result = client.move_call_txn(
+        signer=client.config.active_address,
+        package_object_id=SuiString(contract_address),
+        module=SuiString("marketplace"),
+        function=SuiString("create_market"),
+        type_arguments=SuiArray([]),
+        arguments=[SuiString(beneficiary), SuiString(str(fee))],
+        gas=gas or get_gas(client)[0].identifier,
+        gas_budget=SuiInteger(gas_budget),
+    )
+    assert result.is_ok(), result.result_string
+    return result
+
+
+if __name__ == "__main__":
+    cfg = SuiConfig.default()
+    client = SuiClient(cfg)
+    gases = get_gas(client)
+    print(gases[0].identifier)
+    print(client.config.active_address)
+
+    result = create_market(client, "0x8a19ca58c96d873a17cbb17a27b04d6c5d604eff", "1000", gases[0].identifier)
+
+    print(result.result_data)
+
+    # result = client.move_call_txn(
+    #     signer=client.config.active_address,
+    #     package_object_id=SuiString("0xce5c7d026f080e57a48cadb1b0b023ada602e4d3"),
+    #     module=SuiString("suimarines"),
+    #     function=SuiString("mint_nft"),
+    #     type_arguments=SuiArray([]),
+    #     arguments=[SuiString("name"), SuiString("description"), SuiString("1"), SuiArray(["key"]), SuiArray(["val"]), SuiString("0x2edb77eb18a8980ed56612567530fdf2b02ede4f"), SuiString("0x4a46f10fe5e3ec2a278a20bdb31cdbe0ae70a60f")],
+    #     gas=gases[0].identifier,
+    #     gas_budget=SuiInteger(10000),
+    # )
@@ -0,0 +1,284 @@
+import sys
+import json
+import time
+import bisect
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from util import extract_effects, gas_used
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (128, 512, 2048, 8192, 32768, 131072, 524288, 2097152)
+GAS_BUCKETS = (100, 500, 1000, 2500, 5000, 10000, 25000, 50000, 100000, 250000, 1000000)
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum = self.sum + value
+        self.count = self.count + 1
+
+    def cumulative(self):
+        """`[(le, count), ...]` as Prometheus buckets, ending with +Inf."""
+        total, out = 0, []
+        for le, count in zip(self.buckets + (float("inf"),), self.counts):
+            total = total + count
+            out.append((le, total))
+        return out
+
+
+def move_error_class(result):
+    """None for an executed, successful call; otherwise a short failure class."""
+    if result is None:
+        return "exception"
+    if not result.is_ok():
+        message = str(getattr(result, "result_string", ""))
+        if "InsufficientGas" in message:
+            return "insufficient_gas"
+        if "version conflict" in message or "not available for consumption" in message:
+            return "conflict"
+        return "node"
+    effects = extract_effects(result)
+    if effects is None:
+        return None
+    status = effects.get("status", {})
+    if status.get("status") == "success":
+        return None
+    error = str(status.get("error", ""))
+    if "MoveAbort" in error:
+        return "move_abort"
+    if "InsufficientGas" in error:
+        return "insufficient_gas"
+    return "failed"
+
+
+class JsonLogSink:
+    """One JSON object per line for every recorded call, to a stream or a file path."""
+
+    def __init__(self, target=None):
+        if isinstance(target, str):
+            self.stream = open(target, "a", buffering=1)
+        else:
+            self.stream = target or sys.stderr
+        self._lock = threading.Lock()
+
+    def __call__(self, record):
+        line = json.dumps(record, separators=(",", ":"))
+        with self._lock:
+            self.stream.write(line + "\n")
+
+
+class Metrics:
+    """Per-method RPC and move-call measurements.
+
+    RpcClient records latency, request/response bytes, retries and error
+    classes per JSON-RPC method (`batch` for a batch); MarketClient and
+    sui_launchpad record latency, gross gas and failure class per move
+    function. Every record is also handed to each of `sinks`, e.g. a
+    JsonLogSink. `prometheus()` renders the text exposition format.
+
+    Nothing here runs unless a Metrics is attached: clients take one as
+    `metrics=` or pick up `active()` when they are created, and without one
+    their hot path is unchanged.
+    """
+
+    def __init__(self, sinks=(), namespace="souffl3"):
+        self.sinks = list(sinks)
+        self.namespace = namespace
+        self._histograms = {}
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def _histogram(self, name, labels, buckets):
+        key = (name, labels)
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            histogram = self._histograms.setdefault(key, Histogram(buckets))
+        return histogram
+
+    def _count(self, name, labels, amount=1):
+        key = (name, labels)
+        self._counters[key] = self._counters.get(key, 0) + amount
+
+    def rpc(self, method, seconds, sent, received, retries=0, errors=()):
+        """One JSON-RPC POST; `errors` are the error classes of its envelopes."""
+        labels = (("method", method),)
+        with self._lock:
+            self._histogram("rpc_seconds", labels, LATENCY_BUCKETS).observe(seconds)
+            self._histogram("rpc_request_bytes", labels, SIZE_BUCKETS).observe(sent)
+            self._histogram("rpc_response_bytes", labels, SIZE_BUCKETS).observe(received)
+            if retries:
+                self._count("rpc_retries_total", labels, retries)
+            for error in errors:
+                self._count("rpc_errors_total", labels + (("error", error),))
+        if self.sinks:
+            self._emit({"kind": "rpc", "method": method, "seconds": seconds, "sent": sent,
+                        "received": received, "retries": retries, "errors": list(errors)})
+
+    def move_call(self, module, function, seconds, result, gas_budget=None):
+        """One executed move call (or batch transaction) and its pysui result."""
+        labels = (("function", "%s::%s" % (module, function)),)
+        error = move_error_class(result)
+        effects = extract_effects(result) if result is not None else None
+        gas = None
+        if effects is not None:
+            used = effects.get("gasUsed", {})
+            gas = used.get("computationCost", 0) + used.get("storageCost", 0)
+        with self._lock:
+            self._histogram("move_call_seconds", labels, LATENCY_BUCKETS).observe(seconds)
+            if gas is not None:
+                self._histogram("move_call_gas", labels, GAS_BUCKETS).observe(gas)
+            if error is not None:
+                self._count("move_call_errors_total", labels + (("error", error),))
+        if self.sinks:
+            record = {"kind": "move_call", "module": module, "function": function, "seconds": seconds,
+                      "gas": gas, "gas_budget": gas_budget, "error": error}
+            if effects is not None:
+                record["net_gas"] = gas_used(effects)
+                record["digest"] = effects.get("transactionDigest")
+            self._emit(record)
+
+    def failed(self, method, seconds, sent, retries, error):
+        """A POST that never got a JSON-RPC response."""
+        labels = (("method", method),)
+        with self._lock:
+            self._histogram("rpc_seconds", labels, LATENCY_BUCKETS).observe(seconds)
+            if retries:
+                self._count("rpc_retries_total", labels, retries)
+            self._count("rpc_errors_total", labels + (("error", error),))
+        if self.sinks:
+            self._emit({"kind": "rpc", "method": method, "seconds": seconds, "sent": sent,
+                        "received": 0, "retries": retries, "errors": [error]})
+
+    def gas_pool_error(self, error):
+        """A background GasPool replenish that raised; `error` is the exception class name."""
+        with self._lock:
+            self._count("gas_pool_replenish_errors_total", (("error", error),))
+        if self.sinks:
+            self._emit({"kind": "gas_pool", "error": error})
+
+    def _emit(self, record):
+        record["ts"] = time.time()
+        for sink in self.sinks:
+            sink(record)
+
+    def snapshot(self):
+        """Plain-dict copy: counters and histogram count/sum per (name, labels)."""
+        with self._lock:
+            counters = [{"name": name, "labels": dict(labels), "value": value}
+                        for (name, labels), value in self._counters.items()]
+            histograms = [{"name": name, "labels": dict(labels), "count": h.count, "sum": h.sum}
+                          for (name, labels), h in self._histograms.items()]
+        return {"counters": counters, "histograms": histograms}
+
+    def prometheus(self):
+        """Everything recorded so far in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            for name in sorted({name for name, _ in self._histograms}):
+                full = "%s_%s" % (self.namespace, name)
+                lines.append("# TYPE %s histogram" % full)
+                for (n, labels), h in sorted(self._histograms.items()):
+                    if n != name:
+                        continue
+                    for le, count in h.cumulative():
+                        lines.append("%s_bucket%s %d" % (full, _labels(labels + (("le", _le(le)),)), count))
+                    lines.append("%s_sum%s %r" % (full, _labels(labels), h.sum))
+                    lines.append("%s_count%s %d" % (full, _labels(labels), h.count))
+            for name in sorted({name for name, _ in self._counters}):
+                full = "%s_%s" % (self.namespace, name)
+                lines.append("# TYPE %s counter" % full)
+                for (n, labels), value in sorted(self._counters.items()):
+                    if n == name:
+                        lines.append("%s%s %d" % (full, _labels(labels), value))
+        return "\n".join(lines) + "\n"
+
+
+def _le(value):
+    return "+Inf" if value == float("inf") else repr(value)
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    return "{%s}" % ",".join('%s="%s"' % (k, str(v).replace("\\", "\\\\").replace('"', '\\"')) for k, v in labels)
+
+
+class MetricsServer:
+    """Serves `GET /metrics` in Prometheus text format."""
+
+    def __init__(self, metrics, host="127.0.0.1", port=0):
+        self.metrics = metrics
+        self.server = ThreadingHTTPServer((host, port), _make_handler(metrics))
+        self.server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return "http://%s:%d/metrics" % (host, port)
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def _make_handler(metrics):
+
+    class Handler(BaseHTTPRequestHandler):
+
+        def do_GET(self):
+            if self.path != "/metrics":
+                self.send_response(404)
+                self.end_headers()
+                return
+            data = metrics.prometheus().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+_active = None
+
+
+def active():
+    """The Metrics new clients attach to, or None."""
+    return _active
+
+
+def enable(metrics=None):
+    """Make `metrics` (a fresh Metrics by default) the one clients created from now on record to."""
+    global _active
+    _active = metrics if metrics is not None else Metrics()
+    return _active
+
+
+def disable():
+    global _active
+    _active = None
@@ -0,0 +1,180 @@
+import os
+import json
+import heapq
+import itertools
+
+from rpc import default_client
+from indexer import fetch_event_page, resolve_collection_types, contract_address, PAGE_SIZE
+
+
+class Order:
+    __slots__ = ("nft_id", "listing_id", "safe_id", "seller", "price", "seq")
+
+    def __init__(self, nft_id, listing_id, safe_id, seller, price, seq):
+        self.nft_id = nft_id
+        self.listing_id = listing_id
+        self.safe_id = safe_id
+        self.seller = seller
+        self.price = price
+        self.seq = seq
+
+    def as_dict(self):
+        return {"nft_id": self.nft_id, "listing_id": self.listing_id, "safe_id": self.safe_id,
+                "seller": self.seller, "price": self.price}
+
+
+class OrderBook:
+    """Active listings of one (collection type, coin type), cheapest first.
+
+    A binary heap with lazy deletion: insert, remove and reprice are
+    O(log n) amortized, and stale entries are popped off the top as soon as
+    they surface so `floor()` is a plain O(1) peek.
+    """
+
+    def __init__(self):
+        self._heap = []
+        self._orders = {}
+        self._seq = itertools.count()
+
+    def __len__(self):
+        return len(self._orders)
+
+    def __contains__(self, nft_id):
+        return nft_id in self._orders
+
+    def insert(self, nft_id, price, listing_id=None, safe_id=None, seller=None):
+        order = Order(nft_id, listing_id, safe_id, seller, price, next(self._seq))
+        self._orders[nft_id] = order
+        heapq.heappush(self._heap, (price, order.seq, nft_id))
+        self._settle()
+
+    def remove(self, nft_id):
+        order = self._orders.pop(nft_id, None)
+        self._settle()
+        return order
+
+    def reprice(self, nft_id, price):
+        order = self._orders.get(nft_id)
+        if order is None:
+            return
+        self.insert(nft_id, price, order.listing_id, order.safe_id, order.seller)
+
+    def floor(self):
+        """Cheapest active Order, or None."""
+        if not self._heap:
+            return None
+        return self._orders[self._heap[0][2]]
+
+    def cheapest(self, n):
+        """The `n` cheapest orders, O(n log n) on a copy of the heap's live entries."""
+        live = [entry for entry in self._heap if self._is_live(entry)]
+        return [self._orders[entry[2]] for entry in heapq.nsmallest(n, live)]
+
+    def orders(self):
+        return list(self._orders.values())
+
+    def _is_live(self, entry):
+        order = self._orders.get(entry[2])
+        return order is not None and order.seq == entry[1]
+
+    def _settle(self):
+        while self._heap and not self._is_live(self._heap[0]):
+            heapq.heappop(self._heap)
+        # rebuild once dead entries outnumber live ones, bounding memory
+        if len(self._heap) > 2 * len(self._orders) + 64:
+            self._heap = [entry for entry in self._heap if self._is_live(entry)]
+            heapq.heapify(self._heap)
+
+
+class OrderBooks:
+    """One OrderBook per (collection type, coin type), fed from Market events.
+
+    `sync()` applies every event after `cursor`; `snapshot()` / `restore()`
+    save the books together with that cursor so a restarted bot resumes
+    from the snapshot instead of replaying history.
+    """
+
+    def __init__(self, rpc=None, package=contract_address, page_size=PAGE_SIZE):
+        self.rpc = rpc or default_client()
+        self.package = package
+        self.page_size = page_size
+        self.books = {}
+        self.cursor = None
+        # Delist/Buy/ChangePrice events only name the NFT
+        self._book_of = {}
+
+    def book(self, collection_type, coin_type):
+        key = (collection_type, coin_type)
+        book = self.books.get(key)
+        if book is None:
+            book = self.books[key] = OrderBook()
+        return book
+
+    def floor(self, collection_type, coin_type):
+        book = self.books.get((collection_type, coin_type))
+        return book.floor() if book is not None else None
+
+    def apply(self, events, collection_types):
+        for e in events:
+            f = e.fields
+            nft_id = f["nft_id"]
+            if e.kind == "ListEvent":
+                old = self._book_of.get(nft_id)
+                if old is not None:
+                    old.remove(nft_id)
+                book = self.book(collection_types.get(nft_id), e.coin_type)
+                book.insert(nft_id, int(f["price"]), f.get("listing_id"), f.get("safe_id"), f.get("seller"))
+                self._book_of[nft_id] = book
+                continue
+            book = self._book_of.get(nft_id)
+            if book is None:
+                continue
+            if e.kind == "ChangePriceEvent":
+                book.reprice(nft_id, int(f["new_price"]))
+            else:
+                book.remove(nft_id)
+                del self._book_of[nft_id]
+
+    def sync(self, max_pages=None):
+        """Apply new events from the node. Returns how many were applied."""
+        applied = 0
+        pages = 0
+        while max_pages is None or pages < max_pages:
+            events, next_cursor = fetch_event_page(self.rpc, self.cursor, self.package, self.page_size)
+            self.apply(events, resolve_collection_types(events, self.rpc, self.package))
+            applied = applied + len(events)
+            pages = pages + 1
+            if not next_cursor or next_cursor == self.cursor:
+                break
+            self.cursor = next_cursor
+        return applied
+
+    def snapshot(self, path):
+        """Write every book and the cursor to `path` atomically."""
+        data = {
+            "cursor": self.cursor,
+            "books": [
+                {"collection_type": collection_type, "coin_type": coin_type,
+                 "orders": [order.as_dict() for order in book.orders()]}
+                for (collection_type, coin_type), book in self.books.items() if len(book)
+            ],
+        }
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(data, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+
+    def restore(self, path):
+        with open(path) as f:
+            data = json.load(f)
+        self.books = {}
+        self._book_of = {}
+        self.cursor = data["cursor"]
+        for entry in data["books"]:
+            book = self.book(entry["collection_type"], entry["coin_type"])
+            for order in entry["orders"]:
+                book.insert(order["nft_id"], order["price"], order["listing_id"], order["safe_id"], order["seller"])
+                self._book_of[order["nft_id"]] = book
+        return self
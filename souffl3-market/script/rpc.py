@@ -0,0 +1,304 @@
+import json
+import random
+import time
+import asyncio
+import itertools
+
+import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    import orjson
+    loads = orjson.loads
+    dumps = orjson.dumps
+except ImportError:
+    loads = json.loads
+    dumps = json.dumps
+
+DEFAULT_URL = "https://fullnode.devnet.sui.io:443"
+
+RETRY_STATUS = (429, 500, 502, 503, 504)
+
+
+class RpcError(Exception):
+    """Error object returned by the fullnode for a JSON-RPC call."""
+
+    def __init__(self, method, error):
+        self.method = method
+        self.code = error.get("code")
+        self.message = error.get("message")
+        super().__init__("%s failed: [%s] %s" % (method, self.code, self.message))
+
+
+class RpcTransportError(Exception):
+    """The request never produced a usable JSON-RPC response."""
+
+
+def backoff_delay(attempt, backoff, max_backoff):
+    """Exponential backoff with full jitter for the given 0-based retry attempt."""
+    return random.uniform(0, min(max_backoff, backoff * (2 ** attempt)))
+
+
+class RpcClient:
+    """Blocking JSON-RPC client over a keep-alive session.
+
+    One client should be shared by every helper so the TCP+TLS handshake to
+    the fullnode is paid once per pooled connection instead of once per call.
+    """
+
+    def __init__(self, url=DEFAULT_URL, timeout=10, retries=3, backoff=0.1, max_backoff=2.0, pool_size=16,
+                 metrics=None):
+        self.url = url
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self._ids = itertools.count(1)
+        self.set_metrics(metrics if metrics is not None else _active_metrics())
+        self.session = requests.Session()
+        self.session.headers.update({'Content-Type': 'application/json'})
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def set_metrics(self, metrics):
+        """Record every POST to `metrics` from now on; None turns recording off."""
+        self.metrics = metrics
+        # the timed path is an instance override, so an unmetered client runs the plain post
+        if metrics is None:
+            self.__dict__.pop("post", None)
+        else:
+            self.post = self._metered_post
+
+    def post(self, payload):
+        """POST a raw JSON-RPC payload (single or batch) and return the decoded body."""
+        return loads(self._send(dumps(payload))[0])
+
+    def _send(self, data):
+        """`(response body, retries)` for an encoded payload."""
+        attempt = 0
+        while True:
+            try:
+                response = self.session.post(self.url, data=data, timeout=self.timeout)
+                if response.status_code not in RETRY_STATUS:
+                    response.raise_for_status()
+                    return response.content, attempt
+                error = RpcTransportError("HTTP %d from %s" % (response.status_code, self.url))
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = RpcTransportError(str(e))
+            if attempt >= self.retries:
+                error.retries = attempt
+                raise error
+            time.sleep(backoff_delay(attempt, self.backoff, self.max_backoff))
+            attempt = attempt + 1
+
+    def _metered_post(self, payload):
+        data = dumps(payload)
+        method = _method_label(payload)
+        start = time.perf_counter()
+        try:
+            content, retries = self._send(data)
+        except Exception as e:
+            self.metrics.failed(method, time.perf_counter() - start, len(data), getattr(e, "retries", 0),
+                                "transport" if isinstance(e, RpcTransportError) else type(e).__name__)
+            raise
+        body = loads(content)
+        _record(self.metrics, method, time.perf_counter() - start, len(data), len(content), retries, body)
+        return body
+
+    def request(self, method, params):
+        """Send one call and return the whole JSON-RPC envelope."""
+        return self.post({
+            "jsonrpc": "2.0",
+            "id": next(self._ids),
+            "method": method,
+            "params": params
+        })
+
+    def call(self, method, params):
+        """Send one call and return its `result`, raising RpcError on an error reply."""
+        envelope = self.request(method, params)
+        if "error" in envelope:
+            raise RpcError(method, envelope["error"])
+        return envelope["result"]
+
+    def batch(self, calls):
+        """Send `[(method, params), ...]` as one JSON-RPC batch.
+
+        Returns the envelopes in the order of `calls`, whatever order the
+        node answered in.
+        """
+        if not calls:
+            return []
+        payload = [
+            {"jsonrpc": "2.0", "id": next(self._ids), "method": method, "params": params}
+            for method, params in calls
+        ]
+        return _order_batch(payload, self.post(payload))
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class AsyncRpcClient:
+    """asyncio JSON-RPC client with a bounded connection pool.
+
+    At most `pool_size` connections are open to the fullnode at once; extra
+    coroutines wait for a free connection instead of opening new sockets.
+    """
+
+    def __init__(self, url=DEFAULT_URL, timeout=10, retries=3, backoff=0.1, max_backoff=2.0, pool_size=16,
+                 metrics=None):
+        self.url = url
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.pool_size = pool_size
+        self._ids = itertools.count(1)
+        self._session = None
+        self.set_metrics(metrics if metrics is not None else _active_metrics())
+
+    def _get_session(self):
+        if self._session is None:
+            import aiohttp
+            connector = aiohttp.TCPConnector(limit=self.pool_size, keepalive_timeout=30)
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                headers={'Content-Type': 'application/json'},
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+        return self._session
+
+    def set_metrics(self, metrics):
+        self.metrics = metrics
+        if metrics is None:
+            self.__dict__.pop("post", None)
+        else:
+            self.post = self._metered_post
+
+    async def post(self, payload):
+        return loads((await self._send(dumps(payload)))[0])
+
+    async def _send(self, data):
+        import aiohttp
+        session = self._get_session()
+        attempt = 0
+        while True:
+            try:
+                async with session.post(self.url, data=data) as response:
+                    body = await response.read()
+                    if response.status not in RETRY_STATUS:
+                        response.raise_for_status()
+                        return body, attempt
+                    error = RpcTransportError("HTTP %d from %s" % (response.status, self.url))
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                error = RpcTransportError(str(e) or type(e).__name__)
+            if attempt >= self.retries:
+                error.retries = attempt
+                raise error
+            await asyncio.sleep(backoff_delay(attempt, self.backoff, self.max_backoff))
+            attempt = attempt + 1
+
+    async def _metered_post(self, payload):
+        data = dumps(payload)
+        method = _method_label(payload)
+        start = time.perf_counter()
+        try:
+            content, retries = await self._send(data)
+        except Exception as e:
+            self.metrics.failed(method, time.perf_counter() - start, len(data), getattr(e, "retries", 0),
+                                "transport" if isinstance(e, RpcTransportError) else type(e).__name__)
+            raise
+        body = loads(content)
+        _record(self.metrics, method, time.perf_counter() - start, len(data), len(content), retries, body)
+        return body
+
+    async def request(self, method, params):
+        return await self.post({
+            "jsonrpc": "2.0",
+            "id": next(self._ids),
+            "method": method,
+            "params": params
+        })
+
+    async def call(self, method, params):
+        envelope = await self.request(method, params)
+        if "error" in envelope:
+            raise RpcError(method, envelope["error"])
+        return envelope["result"]
+
+    async def batch(self, calls):
+        if not calls:
+            return []
+        payload = [
+            {"jsonrpc": "2.0", "id": next(self._ids), "method": method, "params": params}
+            for method, params in calls
+        ]
+        return _order_batch(payload, await self.post(payload))
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+
+def _active_metrics():
+    # imported here: metrics builds on util, which imports this module
+    from metrics import active
+    return active()
+
+
+def _method_label(payload):
+    return "batch" if isinstance(payload, list) else payload.get("method", "unknown")
+
+
+def _record(metrics, method, seconds, sent, received, retries, body):
+    envelopes = body if isinstance(body, list) else [body]
+    errors = [e for e in map(_error_class, envelopes) if e is not None]
+    metrics.rpc(method, seconds, sent, received, retries, errors)
+
+
+def _error_class(envelope):
+    if not isinstance(envelope, dict) or "error" not in envelope:
+        return None
+    return "rpc_%s" % (envelope["error"] or {}).get("code")
+
+
+def _order_batch(payload, response):
+    if not isinstance(response, list):
+        # some nodes answer a rejected batch with a single error object
+        raise RpcError("batch", response.get("error", {}))
+    by_id = {envelope.get("id"): envelope for envelope in response}
+    return [
+        by_id.get(request["id"], {"id": request["id"], "error": {"code": None, "message": "missing from batch reply"}})
+        for request in payload
+    ]
+
+
+_default_client = None
+
+
+def default_client():
+    """Process-wide RpcClient used by the util helpers when none is passed."""
+    global _default_client
+    if _default_client is None:
+        _default_client = RpcClient()
+    return _default_client
+
+
+def set_default_client(client):
+    global _default_client
+    _default_client = client
@@ -0,0 +1,414 @@
+import json
+import base64
+import socket
+import random
+import itertools
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from gas_estimator import json_value as _plain
+
+
+
+class _Server(ThreadingHTTPServer):
+    # the default backlog of 5 drops SYNs under a burst of new connections,
+    # which shows up as 1s retransmit stalls in p99
+    request_queue_size = 128
+
+
+class StubNode:
+    """Local stand-in for a Sui fullnode JSON-RPC endpoint.
+
+    Serves canned objects and transactions from memory so the scripts can be
+    benchmarked without network access. Extra methods can be registered in
+    `handlers` as `method -> fn(params)`.
+
+    `error_rate` and `conflict_rate` make that fraction of executions fail
+    before anything runs, with an internal error or a stale gas object
+    version respectively.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, exec_latency=0.0,
+                 error_rate=0.0, conflict_rate=0.0, seed=None):
+        self.latency = latency
+        self.exec_latency = exec_latency
+        self.error_rate = error_rate
+        self.conflict_rate = conflict_rate
+        self._random = random.Random(seed)
+        self.objects = {}
+        self.transactions = {}
+        self.gas_coins = {}
+        self.events = []
+        self.dynamic_fields = {}
+        # parent -> child field object ids in insertion order, for paging
+        self._children = {}
+        # move calls naming one of these objects abort, as a bad listing would
+        self.failing_objects = set()
+        self.calls = 0
+        # HTTP requests; a JSON-RPC batch is one post but many calls
+        self.posts = 0
+        self._lock = threading.Lock()
+        self._locked_coins = set()
+        self._digests = itertools.count(1)
+        self.handlers = {
+            "sui_getObject": self.get_object,
+            "sui_getRawObject": self.get_raw_object,
+            "sui_getDynamicFieldObject": self.get_dynamic_field_object,
+            "sui_getDynamicFields": self.get_dynamic_fields,
+            "sui_getTransaction": self.get_transaction,
+            "sui_getGasObjects": self.get_gas_objects,
+            "stub_moveCall": self.move_call,
+            "sui_moveCall": self.build_move_call,
+            "sui_dryRunTransaction": self.dry_run,
+            "stub_batchTransaction": self.batch_transaction,
+            "sui_getEvents": self.get_events,
+        }
+        self.server = _Server((host, port), _make_handler(self))
+        self.server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return "http://%s:%d" % (host, port)
+
+    def add_object(self, object_id, obj_type, version=1, fields=None, owner=None, bcs_bytes=None):
+        self.objects[object_id] = {
+            "type": obj_type,
+            "version": version,
+            "fields": fields or {},
+            "owner": owner or {"Shared": {"initial_shared_version": 1}},
+            "bcs_bytes": bcs_bytes or b"",
+        }
+
+    def add_dynamic_field(self, parent, name, value):
+        """A Field<K, V> child of `parent`, as a Table entry is stored."""
+        object_id = "0x%040x" % (hash((parent, name)) & (2 ** 160 - 1))
+        self.add_object(object_id, "0x2::dynamic_field::Field", fields={"id": {"id": object_id},
+                                                                     "name": name, "value": value})
+        if (parent, name) not in self.dynamic_fields:
+            self._children.setdefault(parent, []).append((name, object_id))
+        self.dynamic_fields[(parent, name)] = object_id
+
+    def add_transaction(self, digest, created, mutated=None, events=None, delay=0.0, calls=None):
+        """`created` / `mutated` are lists of (object_id, owner) pairs.
+
+        sui_getTransaction does not know the digest for `delay` seconds, as
+        with a transaction that is not final yet. `calls` are the move calls
+        of its certificate, as `{"package", "module", "function",
+        "typeArguments", "arguments"}` dicts.
+        """
+        self.transactions[digest] = {
+            "created": [_owned_ref(obj_id, owner, self.objects) for obj_id, owner in created],
+            "mutated": [_owned_ref(obj_id, owner, self.objects) for obj_id, owner in (mutated or [])],
+            "events": events or [],
+            "visible_at": time.monotonic() + delay,
+            "calls": calls or [],
+        }
+
+    def add_gas_coin(self, coin_id, balance, owner=None):
+        """Coins without an owner are returned for every address."""
+        self.gas_coins[coin_id] = {"balance": balance, "version": 1, "owner": owner}
+
+    def get_gas_objects(self, params):
+        return [
+            {"objectId": coin_id, "balance": coin["balance"], "version": coin["version"]}
+            for coin_id, coin in self.gas_coins.items() if coin["owner"] in (None, params[0])
+        ]
+
+    def build_move_call(self, params):
+        """sui_moveCall(signer, package, module, function, type_args, args, gas, budget) -> txBytes."""
+        keys = ("signer", "package_object_id", "module", "function", "type_arguments", "arguments", "gas", "gas_budget")
+        call = dict(zip(keys, params))
+        return {"txBytes": base64.b64encode(json.dumps(call).encode()).decode(), "gas": call["gas"]}
+
+    def dry_run(self, params):
+        call = json.loads(base64.b64decode(params[0]))
+        computation, storage = gas_cost([call])
+        return {"status": {"status": "success"},
+                "gasUsed": {"computationCost": computation, "storageCost": storage, "storageRebate": 10}}
+
+    def move_call(self, params):
+        """Execute a fake move call; two in-flight calls on one gas coin conflict."""
+        return self._execute(params[0], [params[0]])
+
+    def batch_transaction(self, params):
+        """sui_batchTransaction: all calls succeed or the whole batch aborts."""
+        return self._execute(params[0], params[0]["single_transaction_params"])
+
+    def _execute(self, call, move_calls):
+        for move_call in move_calls:
+            for arg in move_call.get("arguments", []):
+                for item in arg if isinstance(arg, list) else [arg]:
+                    if isinstance(item, str) and item in self.failing_objects:
+                        raise RuntimeError("MoveAbort in %s on %s" % (move_call.get("function"), item))
+        coin_id = call["gas"]
+        with self._lock:
+            coin = self.gas_coins.get(coin_id)
+            if coin is None:
+                raise KeyError("gas object %s not found" % coin_id)
+            roll = self._random.random()
+            if roll < self.error_rate:
+                raise RuntimeError("Internal error: injected failure")
+            if roll < self.error_rate + self.conflict_rate:
+                raise RuntimeError("Object %s version %d is not available for consumption: version conflict" % (
+                    coin_id, coin["version"] - 1))
+            if coin_id in self._locked_coins:
+                raise RuntimeError("Object %s is locked by another transaction: version conflict" % coin_id)
+            # object state the arguments do not show moves the real cost a little
+            jitter = 1 + self._random.uniform(-0.05, 0.05)
+            self._locked_coins.add(coin_id)
+        try:
+            computation, storage = gas_cost(move_calls)
+            computation = int(computation * jitter)
+            budget = call.get("gas_budget")
+            if budget is not None and computation + storage > int(budget):
+                raise RuntimeError("InsufficientGas: budget %s below cost %d" % (budget, computation + storage))
+            if self.exec_latency:
+                time.sleep(self.exec_latency)
+            digest = "stub%d" % next(self._digests)
+            with self._lock:
+                coin["balance"] = coin["balance"] - (computation + storage - 10)
+                coin["version"] = coin["version"] + 1
+                version = coin["version"]
+            self.transactions[digest] = {"created": [], "mutated": [], "events": []}
+            effects = self.get_transaction([digest])["effects"]
+            effects["gasUsed"] = {"computationCost": computation, "storageCost": storage, "storageRebate": 10}
+            effects["gasObject"] = {"owner": {"AddressOwner": call["signer"]},
+                                    "reference": {"objectId": coin_id, "version": version, "digest": "stub"}}
+            return {"EffectsCert": {"certificate": {"transactionDigest": digest}, "effects": {"effects": effects}}}
+        finally:
+            with self._lock:
+                self._locked_coins.discard(coin_id)
+
+    def add_event(self, event_type, fields, sender="0x0", tx_digest=None):
+        tx_seq = len(self.events)
+        self.events.append({
+            "timestamp": tx_seq,
+            "txDigest": tx_digest or "evtx%d" % tx_seq,
+            "id": {"txSeq": tx_seq, "eventSeq": 0},
+            "event": {"moveEvent": {"packageId": event_type.split("::")[0], "sender": sender,
+                                    "type": event_type, "fields": fields}},
+        })
+
+    def get_events(self, params):
+        """sui_getEvents(query, cursor, limit, descending); the query is ignored."""
+        cursor, limit = params[1], params[2]
+        start = cursor["txSeq"] + 1 if cursor else 0
+        page = self.events[start:start + limit]
+        next_cursor = page[-1]["id"] if page else cursor
+        return {"data": page, "nextCursor": next_cursor}
+
+    def get_object(self, params):
+        obj = self.objects.get(params[0])
+        if obj is None:
+            return {"status": "NotExists", "details": params[0]}
+        return {
+            "status": "Exists",
+            "details": {
+                "data": {"dataType": "moveObject", "type": obj["type"], "fields": obj["fields"]},
+                "owner": obj["owner"],
+                "reference": {"objectId": params[0], "version": obj["version"], "digest": "stub"},
+            }
+        }
+
+    def get_dynamic_field_object(self, params):
+        object_id = self.dynamic_fields.get((params[0], params[1]))
+        if object_id is None:
+            return {"status": "NotExists", "details": params[1]}
+        return self.get_object([object_id])
+
+    def get_dynamic_fields(self, params):
+        """sui_getDynamicFields(parent, cursor, limit); the cursor is a position, not an object id."""
+        children = self._children.get(params[0], [])
+        start = int(params[1] or 0)
+        limit = params[2] if len(params) > 2 and params[2] else 50
+        page = children[start:start + limit]
+        end = start + len(page)
+        return {
+            "data": [{"name": str(name), "type": "DynamicField", "objectType": self.objects[oid]["type"],
+                      "objectId": oid, "version": self.objects[oid]["version"], "digest": "stub"}
+                     for name, oid in page],
+            "nextCursor": str(end) if end < len(children) else None,
+        }
+
+    def get_raw_object(self, params):
+        obj = self.objects.get(params[0])
+        if obj is None:
+            return {"status": "NotExists", "details": params[0]}
+        return {
+            "status": "Exists",
+            "details": {
+                "data": {"dataType": "moveObject", "type": obj["type"], "version": obj["version"],
+                         "bcs_bytes": base64.b64encode(obj["bcs_bytes"]).decode()},
+                "owner": obj["owner"],
+                "reference": {"objectId": params[0], "version": obj["version"], "digest": "stub"},
+            }
+        }
+
+    def get_transaction(self, params):
+        txn = self.transactions.get(params[0])
+        if txn is None or txn.get("visible_at", 0) > time.monotonic():
+            raise KeyError("transaction %s not found" % params[0])
+        return {
+            "certificate": {"transactionDigest": params[0],
+                            "data": {"transactions": [{"Call": call} for call in txn.get("calls", [])]}},
+            "effects": {
+                "status": {"status": "success"},
+                "gasUsed": {"computationCost": 100, "storageCost": 50, "storageRebate": 10},
+                "transactionDigest": params[0],
+                "created": txn["created"],
+                "mutated": txn["mutated"],
+                "events": txn["events"],
+            },
+        }
+
+    def dispatch(self, request):
+        with self._lock:
+            self.calls = self.calls + 1
+        handler = self.handlers.get(request.get("method"))
+        if handler is None:
+            return {"jsonrpc": "2.0", "id": request.get("id"),
+                    "error": {"code": -32601, "message": "Method not found"}}
+        try:
+            result = handler(request.get("params", []))
+        except Exception as e:
+            return {"jsonrpc": "2.0", "id": request.get("id"),
+                    "error": {"code": -32000, "message": str(e)}}
+        return {"jsonrpc": "2.0", "id": request.get("id"), "result": result}
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def gas_cost(move_calls):
+    """`(computation, storage)` of the stub's gas model: a base cost plus a cost per argument byte."""
+    size = sum(len(json.dumps(move_call.get("arguments", []))) for move_call in move_calls)
+    return 100 * len(move_calls) + size // 4, 50 * len(move_calls) + size // 2
+
+
+def _owned_ref(obj_id, owner, objects):
+    version = objects[obj_id]["version"] if obj_id in objects else 1
+    return {"owner": owner, "reference": {"objectId": obj_id, "version": version, "digest": "stub"}}
+
+
+def _make_handler(node):
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def setup(self):
+            super().setup()
+            # headers and body go out in separate writes; without this Nagle
+            # stalls every keep-alive response behind a delayed ACK
+            self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            payload = json.loads(self.rfile.read(length))
+            with node._lock:
+                node.posts = node.posts + 1
+            if node.latency:
+                time.sleep(node.latency)
+            if isinstance(payload, list):
+                body = [node.dispatch(request) for request in payload]
+            else:
+                body = node.dispatch(payload)
+            data = json.dumps(body).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+class StubResult:
+    """Quacks like pysui's SuiRpcResult."""
+
+    def __init__(self, ok, result_data=None, result_string=None):
+        self._ok = ok
+        self.result_data = result_data
+        self.result_string = result_string
+
+    def is_ok(self):
+        return self._ok
+
+
+class StubGas:
+
+    def __init__(self, identifier, balance, version):
+        self.identifier = identifier
+        self.balance = balance
+        self.version = version
+
+
+class _GasList:
+
+    def __init__(self, data):
+        self.data = data
+
+
+class _StubConfig:
+
+    def __init__(self, active_address):
+        self.active_address = active_address
+
+
+class StubSuiClient:
+    """Minimal stand-in for pysui's SuiClient talking to a StubNode.
+
+    Implements just `get_gas` and `move_call_txn`, which is all the script
+    clients use, so MarketClient and sui_launchpad run unchanged against it.
+    """
+
+    def __init__(self, rpc, active_address="0x7374756273656e646572"):
+        self.rpc = rpc
+        self.config = _StubConfig(active_address)
+
+    def get_gas(self, for_address=None):
+        envelope = self.rpc.request("sui_getGasObjects", [for_address or self.config.active_address])
+        if "error" in envelope:
+            return StubResult(False, result_string=envelope["error"]["message"])
+        data = [StubGas(c["objectId"], c["balance"], c["version"]) for c in envelope["result"]]
+        return StubResult(True, _GasList(data))
+
+    def move_call_txn(self, **kwargs):
+        call = {key: _plain(value) for key, value in kwargs.items()}
+        return self._send("stub_moveCall", call)
+
+    def execute(self, builder):
+        """Only pysui's BatchTransaction builder is understood."""
+        call = {
+            "signer": _plain(builder.signer),
+            "gas": _plain(builder.gas),
+            "gas_budget": _plain(builder.gas_budget),
+            "single_transaction_params": [
+                {key: _plain(value) for key, value in vars(param).items()}
+                for param in builder.single_transaction_params
+            ],
+        }
+        return self._send("stub_batchTransaction", call)
+
+    def _send(self, method, call):
+        envelope = self.rpc.request(method, [call])
+        if "error" in envelope:
+            return StubResult(False, result_string=envelope["error"]["message"])
+        return StubResult(True, envelope["result"])
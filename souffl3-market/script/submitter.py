@@ -0,0 +1,136 @@
+import time
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+
+# MarketClient method -> index of the positional argument naming the object it
+# mutates. Operations on the same object are never in flight together.
+ORDER_KEY_ARG = {
+    "list": 2,
+    "list_generic": 2,
+    "delist": 2,
+    "delist_generic": 2,
+    "buy": 2,
+    "buy_generic": 2,
+    "change_price": 1,
+}
+
+
+class SubmitStats:
+
+    def __init__(self):
+        self.submitted = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.latencies = []
+        self.started_at = None
+        self.finished_at = None
+        self._lock = threading.Lock()
+
+    def record(self, latency, ok):
+        with self._lock:
+            self.latencies.append(latency)
+            if ok:
+                self.succeeded = self.succeeded + 1
+            else:
+                self.failed = self.failed + 1
+            self.finished_at = time.perf_counter()
+
+    def percentile(self, p):
+        with self._lock:
+            data = sorted(self.latencies)
+        if not data:
+            return 0.0
+        return data[min(len(data) - 1, int(len(data) * p / 100))]
+
+    def as_dict(self):
+        done = self.succeeded + self.failed
+        elapsed = (self.finished_at or 0) - (self.started_at or 0)
+        return {
+            "submitted": self.submitted,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "throughput": done / elapsed if elapsed > 0 else 0.0,
+            "p50": self.percentile(50),
+            "p99": self.percentile(99),
+        }
+
+
+class Submitter:
+    """Runs MarketClient calls concurrently with at most `window` in flight.
+
+    `submit("change_price", coin_type, listing, price)` returns a Future for
+    the transaction result. Calls that touch the same object (the listing,
+    or the NFT being listed) run one after another in submission order;
+    everything else runs in parallel. Each running call leases its own gas
+    coin from the client's GasPool, so the pool should hold at least
+    `window` coins.
+    """
+
+    def __init__(self, market_client, window=16):
+        self.market_client = market_client
+        self.window = window
+        self.stats = SubmitStats()
+        self._executor = ThreadPoolExecutor(max_workers=window)
+        self._lock = threading.Lock()
+        self._queues = {}
+
+    def submit(self, method, *args, key=None):
+        if key is None and method in ORDER_KEY_ARG:
+            key = str(args[ORDER_KEY_ARG[method]])
+        future = Future()
+        job = (getattr(self.market_client, method), args, future)
+        with self._lock:
+            if self.stats.started_at is None:
+                self.stats.started_at = time.perf_counter()
+            self.stats.submitted = self.stats.submitted + 1
+            if key is not None:
+                queue = self._queues.get(key)
+                if queue is not None:
+                    # an earlier call on this object is still pending
+                    queue.append(job)
+                    return future
+                self._queues[key] = deque()
+        self._executor.submit(self._run, key, job)
+        return future
+
+    def _run(self, key, job):
+        # drain this object's queue on the same worker so its calls keep
+        # submission order without re-entering the executor
+        while job is not None:
+            self._execute(*job)
+            if key is None:
+                return
+            with self._lock:
+                queue = self._queues[key]
+                if queue:
+                    job = queue.popleft()
+                else:
+                    del self._queues[key]
+                    job = None
+
+    def _execute(self, fn, args, future):
+        if not future.set_running_or_notify_cancel():
+            return
+        start = time.perf_counter()
+        try:
+            result = fn(*args)
+        except Exception as e:
+            self.stats.record(time.perf_counter() - start, False)
+            future.set_exception(e)
+        else:
+            self.stats.record(time.perf_counter() - start, True)
+            future.set_result(result)
+
+    def map(self, method, arg_lists):
+        """Submit one call per argument tuple and return the futures."""
+        return [self.submit(method, *args) for args in arg_lists]
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
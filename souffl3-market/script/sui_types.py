@@ -0,0 +1,155 @@
+import sys
+from dataclasses import dataclass
+from functools import lru_cache
+
+_intern = sys.intern
+
+
+@dataclass(frozen=True, slots=True)
+class MoveType:
+    """Parsed Move struct tag, e.g. `0x2::coin::Coin<0x2::sui::SUI>`."""
+
+    address: str
+    module: str
+    name: str
+    type_args: tuple = ()
+
+    def is_a(self, module, name):
+        return self.module == module and self.name == name
+
+    def __str__(self):
+        base = "%s::%s::%s" % (self.address, self.module, self.name)
+        if self.type_args:
+            return "%s<%s>" % (base, ", ".join(str(t) for t in self.type_args))
+        return base
+
+
+def _split_args(s):
+    args, depth, start = [], 0, 0
+    for i, ch in enumerate(s):
+        if ch == "<":
+            depth = depth + 1
+        elif ch == ">":
+            depth = depth - 1
+        elif ch == "," and depth == 0:
+            args.append(s[start:i].strip())
+            start = i + 1
+    args.append(s[start:].strip())
+    return args
+
+
+@lru_cache(maxsize=4096)
+def parse_type(type_str):
+    """Parse a type string once; repeated strings return the same MoveType.
+
+    Primitive type arguments (`u64`, `address`, `vector<u8>`...) are kept as
+    interned strings.
+    """
+    head, lt, rest = type_str.partition("<")
+    parts = head.split("::")
+    if len(parts) != 3:
+        return _intern(type_str)
+    type_args = ()
+    if lt:
+        type_args = tuple(parse_type(arg) for arg in _split_args(rest[:-1]))
+    address, module, name = parts
+    return MoveType(_intern(address), _intern(module), _intern(name), type_args)
+
+
+@dataclass(frozen=True, slots=True)
+class ObjectRef:
+    object_id: str
+    version: int
+    digest: str
+
+    @classmethod
+    def from_json(cls, data):
+        return cls(data["objectId"], data["version"], data["digest"])
+
+
+@dataclass(frozen=True, slots=True)
+class OwnedObjectRef:
+    """`owner` is "Immutable", "Shared", "AddressOwner" or "ObjectOwner"; `owner_id` the address if any."""
+
+    owner: str
+    owner_id: str
+    ref: ObjectRef
+
+    @property
+    def object_id(self):
+        return self.ref.object_id
+
+    @classmethod
+    def from_json(cls, data):
+        owner = data["owner"]
+        if isinstance(owner, str):
+            kind, owner_id = owner, None
+        else:
+            kind, value = next(iter(owner.items()))
+            owner_id = value if isinstance(value, str) else None
+        return cls(_intern(kind), owner_id, ObjectRef.from_json(data["reference"]))
+
+
+@dataclass(frozen=True, slots=True)
+class TxEffects:
+    """The parts of a transaction's effects the scripts read."""
+
+    digest: str
+    ok: bool
+    error: str
+    gas_used: int
+    gas_object: OwnedObjectRef
+    created: tuple
+    mutated: tuple
+    deleted: tuple
+
+    @classmethod
+    def from_json(cls, effects):
+        status = effects.get("status", {})
+        used = effects.get("gasUsed", {})
+        gas_object = effects.get("gasObject")
+        return cls(
+            effects.get("transactionDigest"),
+            status.get("status") == "success",
+            status.get("error"),
+            used.get("computationCost", 0) + used.get("storageCost", 0) - used.get("storageRebate", 0),
+            OwnedObjectRef.from_json(gas_object) if gas_object else None,
+            tuple(OwnedObjectRef.from_json(o) for o in effects.get("created", ())),
+            tuple(OwnedObjectRef.from_json(o) for o in effects.get("mutated", ())),
+            tuple(ObjectRef.from_json(o) for o in effects.get("deleted", ())),
+        )
+
+    def to_json(self):
+        """Inverse of from_json for the materialized fields, used by the disk cache."""
+        def owned(o):
+            owner = o.owner if o.owner_id is None else {o.owner: o.owner_id}
+            return {"owner": owner, "reference": ref(o.ref)}
+
+        def ref(r):
+            return {"objectId": r.object_id, "version": r.version, "digest": r.digest}
+
+        effects = {
+            "transactionDigest": self.digest,
+            "status": {"status": "success" if self.ok else "failure", "error": self.error},
+            "gasUsed": {"computationCost": self.gas_used},
+            "created": [owned(o) for o in self.created],
+            "mutated": [owned(o) for o in self.mutated],
+            "deleted": [ref(r) for r in self.deleted],
+        }
+        if self.gas_object is not None:
+            effects["gasObject"] = owned(self.gas_object)
+        return effects
+
+
+@dataclass(frozen=True, slots=True)
+class ObjectInfo:
+    ref: ObjectRef
+    type: MoveType
+
+    @classmethod
+    def from_json(cls, result):
+        """From a sui_getObject result; None unless the object exists."""
+        if result.get("status") != "Exists":
+            return None
+        details = result["details"]
+        return cls(ObjectRef.from_json(details["reference"]), parse_type(details["data"]["type"]))
@@ -1,115 +1,203 @@
-import requests
-import json
-
-url = "https://fullnode.devnet.sui.io:443"
-
-def get_obj_type(object_id):
-    payload = json.dumps({
-        "jsonrpc": "2.0",
-        "id": 1,
-        "method": "sui_getObject",
-        "params": [
-            object_id
-        ]
-    })
-    headers = {
-        'Content-Type': 'application/json'
-    }
-
-    response = requests.request("POST", url, headers=headers, data=payload)
-    return json.loads(response.text)["result"]["details"]["data"]["type"]
-
-def get_obj_by_id(obj_id):
-    payload = json.dumps({
-        "jsonrpc": "2.0",
-        "id": 1,
-        "method": "sui_getObject",
-        "params": [
-            obj_id
-        ]
-    })
-    headers = {
-        'Content-Type': 'application/json'
-    }
-
-    response = requests.request("POST", url, headers=headers, data=payload)
-    return json.loads(response.text)
-
-def get_txn_by_id(txn_id):
-    payload = json.dumps({
-        "jsonrpc": "2.0",
-        "id": 1,
-        "method": "sui_getTransaction",
-        "params": [
-            txn_id
-        ]
-    })
-    headers = {
-        'Content-Type': 'application/json'
-    }
-
-    response = requests.request("POST", url, headers=headers, data=payload)
-    return json.loads(response.text)
-
-def get_shared_obj(txn_id):
-    txn_ = get_txn_by_id(txn_id)
-    created_objs = txn_["result"]["effects"]["created"]
+from concurrent.futures import ThreadPoolExecutor
+
+from rpc import default_client, DEFAULT_URL
+from cache import default_cache
+from sui_types import TxEffects, parse_type
+
+url = DEFAULT_URL
+
+def get_obj_type(object_id, client=None):
+    # an object id never changes type, so this is cached without expiry
+    types = default_cache().types
+    obj_type = types.get(object_id)
+    if obj_type is None:
+        client = client or default_client()
+        obj_type = client.call("sui_getObject", [object_id])["details"]["data"]["type"]
+        types.set(object_id, obj_type)
+    return obj_type
+
+def get_obj_by_id(obj_id, client=None):
+    contents = default_cache().contents
+    obj = contents.get(obj_id)
+    if obj is None:
+        client = client or default_client()
+        obj = client.request("sui_getObject", [obj_id])
+        _remember_object(obj_id, obj.get("result"))
+    return obj
+
+def get_txn_by_id(txn_id, client=None):
+    transactions = default_cache().transactions
+    txn_ = transactions.get(txn_id)
+    if txn_ is None:
+        client = client or default_client()
+        txn_ = client.request("sui_getTransaction", [txn_id])
+        if "result" in txn_:
+            transactions.set(txn_id, txn_)
+    return txn_
+
+def _remember_object(obj_id, result):
+    if result is None or result.get("status") != "Exists":
+        return
+    cache = default_cache()
+    cache.contents.set(obj_id, {"jsonrpc": "2.0", "result": result})
+    cache.types.set(obj_id, result["details"]["data"]["type"])
+
+BATCH_CHUNK_SIZE = 50
+BATCH_WORKERS = 4
+
+def batch_get_objects(object_ids, client=None, chunk_size=BATCH_CHUNK_SIZE, max_workers=BATCH_WORKERS):
+    """Fetch many objects with JSON-RPC batches.
+
+    Ids are split into chunks of `chunk_size` and the chunks are sent
+    concurrently. Returns `{object_id: sui_getObject result}`; objects the
+    node errored on are left out.
+    """
+    client = client or default_client()
+    object_ids = list(dict.fromkeys(object_ids))
+    chunks = [object_ids[i:i + chunk_size] for i in range(0, len(object_ids), chunk_size)]
+
+    def fetch(chunk):
+        return chunk, client.batch([("sui_getObject", [obj_id]) for obj_id in chunk])
+
+    if len(chunks) > 1:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(chunks))) as pool:
+            replies = list(pool.map(fetch, chunks))
+    else:
+        replies = [fetch(chunk) for chunk in chunks]
+
+    res = {}
+    for chunk, envelopes in replies:
+        for obj_id, envelope in zip(chunk, envelopes):
+            if "result" in envelope:
+                res[obj_id] = envelope["result"]
+                _remember_object(obj_id, envelope["result"])
+    return res
+
+def batch_get_transactions(digests, client=None, chunk_size=BATCH_CHUNK_SIZE):
+    """`{digest: sui_getTransaction envelope}` for many digests; cached like get_txn_by_id."""
+    client = client or default_client()
+    transactions = default_cache().transactions
+    res = {}
+    missing = []
+    for digest in dict.fromkeys(digests):
+        txn_ = transactions.get(digest)
+        if txn_ is None:
+            missing.append(digest)
+        else:
+            res[digest] = txn_
+    for i in range(0, len(missing), chunk_size):
+        chunk = missing[i:i + chunk_size]
+        for digest, envelope in zip(chunk, client.batch([("sui_getTransaction", [d]) for d in chunk])):
+            if "result" in envelope:
+                transactions.set(digest, envelope)
+                res[digest] = envelope
+    return res
+
+def batch_get_obj_types(object_ids, client=None, chunk_size=BATCH_CHUNK_SIZE):
+    """Types of many objects; only ids missing from the type cache hit the node."""
+    types = default_cache().types
+    res = {}
+    missing = []
+    for obj_id in object_ids:
+        obj_type = types.get(obj_id)
+        if obj_type is None:
+            missing.append(obj_id)
+        else:
+            res[obj_id] = obj_type
+    for obj_id, obj in batch_get_objects(missing, client, chunk_size).items():
+        if obj.get("status") == "Exists":
+            res[obj_id] = obj["details"]["data"]["type"]
+    return res
+
+def get_txn_effects(txn_id, client=None):
+    """TxEffects of a transaction; cached, since finalized effects never change."""
+    effects = default_cache().effects
+    txn_effects = effects.get(txn_id)
+    if txn_effects is None:
+        client = client or default_client()
+        result = client.call("sui_getTransaction", [txn_id])
+        txn_effects = TxEffects.from_json(result["effects"])
+        effects.set(txn_id, txn_effects)
+    return txn_effects
+
+def batch_get_parsed_types(object_ids, client=None):
+    """Like batch_get_obj_types, with each type parsed into a MoveType."""
+    return {obj_id: parse_type(t) for obj_id, t in batch_get_obj_types(object_ids, client).items()}
+
+def get_created_obj_types(txn_id, client=None, owner_filter=None):
+    """Created objects of a transaction as `(OwnedObjectRef, MoveType)` pairs,
+    in two round trips: one sui_getTransaction and one batch for their types."""
+    created_objs = get_txn_effects(txn_id, client).created
+    if owner_filter is not None:
+        created_objs = [obj for obj in created_objs if owner_filter(obj.owner)]
+    types = batch_get_parsed_types([obj.object_id for obj in created_objs], client)
+    return [(obj, types[obj.object_id]) for obj in created_objs if obj.object_id in types]
+
+def get_shared_obj(txn_id, client=None):
     res = {}
-    for obj in created_objs:
-        if obj["owner"] == "Immutable":
-            res["package_id"] = obj["reference"]["objectId"]
-            continue
-        if "Shared" in obj["owner"]:
-            obj_id = obj["reference"]["objectId"]
-            obj_type = get_obj_type(obj["reference"]["objectId"])
-            if "mint_cap::MintCap" in obj_type:
-                res["mint_cap"] = obj_id
-            if "transfer_allowlist" in obj_type:
-                res["transfer_allowlist"] = obj_id
-            if "collection::Collection" in obj_type:
-                res["collection"] = obj_id
-                print(obj_type)
-            continue
+    for obj in get_txn_effects(txn_id, client).created:
+        if obj.owner == "Immutable":
+            res["package_id"] = obj.object_id
+    for obj, obj_type in get_created_obj_types(txn_id, client, lambda owner: owner == "Shared"):
+        if obj_type.is_a("mint_cap", "MintCap"):
+            res["mint_cap"] = obj.object_id
+        if obj_type.module == "transfer_allowlist":
+            res["transfer_allowlist"] = obj.object_id
+        if obj_type.is_a("collection", "Collection"):
+            res["collection"] = obj.object_id
     return res
 
 
-def get_marketplace_obj(txn_id):
-    txn_ = get_txn_by_id(txn_id)
-    created_objs = txn_["result"]["effects"]["created"]
+def get_marketplace_obj(txn_id, client=None):
     res = {}
-    for obj in created_objs:
-        res["marketplace"] = obj["reference"]["objectId"]
+    for obj in get_txn_effects(txn_id, client).created:
+        res["marketplace"] = obj.object_id
 
     return res
 
-def get_nft_obj(txn_id):
-    txn_ = get_txn_by_id(txn_id)
-    created_objs = txn_["result"]["effects"]["created"]
+def get_nft_obj(txn_id, client=None):
     res = {}
-    for obj in created_objs:
-        obj_id = obj["reference"]["objectId"]
-        obj_type = get_obj_type(obj["reference"]["objectId"])
-        if "nft::Nft" in obj_type:
-            res["nft"] = obj_id
+    for obj, obj_type in get_created_obj_types(txn_id, client):
+        if obj_type.is_a("nft", "Nft"):
+            res["nft"] = obj.object_id
 
     return res
 
-def get_list_obj(txn_id):
-    txn_ = get_txn_by_id(txn_id)
-    created_objs = txn_["result"]["effects"]["created"]
+def get_list_obj(txn_id, client=None):
     res = {}
-    for obj in created_objs:
-        obj_id = obj["reference"]["objectId"]
-        obj_type = get_obj_type(obj["reference"]["objectId"])
-        if "Market::Listing" in obj_type:
-            res["listing"] = obj_id
-        if "safe::OwnerCap" in obj_type:
-            res['owner_cap'] = obj_id
-        if "safe::Safe" in obj_type:
-            res["safe"] = obj_id
+    for obj, obj_type in get_created_obj_types(txn_id, client):
+        if obj_type.is_a("Market", "Listing"):
+            res["listing"] = obj.object_id
+        if obj_type.is_a("safe", "OwnerCap"):
+            res['owner_cap'] = obj.object_id
+        if obj_type.is_a("safe", "Safe"):
+            res["safe"] = obj.object_id
     return res
 
 
+def extract_effects(result):
+    """Effects dict of a pysui SuiRpcResult, a raw envelope or a bare result.
+
+    Returns None when the result carries no effects.
+    """
+    data = getattr(result, "result_data", result)
+    if hasattr(data, "to_dict"):
+        data = data.to_dict()
+    if isinstance(data, dict) and "result" in data:
+        data = data["result"]
+    if isinstance(data, dict) and "EffectsCert" in data:
+        data = data["EffectsCert"]
+    while isinstance(data, dict) and "effects" in data:
+        data = data["effects"]
+    if isinstance(data, dict) and "status" in data:
+        return data
+    return None
+
+def gas_used(effects):
+    used = effects.get("gasUsed", {})
+    return used.get("computationCost", 0) + used.get("storageCost", 0) - used.get("storageRebate", 0)
+
+
 if __name__ == "__main__":
     # res = get_shared_obj("328KStz3kzMVj22KjVA8JfW7NQ56wRpm8wUK4V41Pzmu")
     # print(res)
@@ -0,0 +1,76 @@
+"""Fixed gas budgets vs GasEstimator budgets against a stub fullnode.
+
+    python bench_gas_estimator.py [calls]
+
+Runs `calls` change_price calls and warehouse fills of 5 to 400 items,
+once with the hard-coded 10000 budget and once with a GasEstimator, and
+prints how many calls failed for gas, the budget reserved per call and how
+much of it was used. The stub charges a base cost plus a cost per argument
+byte, with +-5% noise on execution.
+"""
+import sys
+import random
+
+from launchpad import sui_launchpad
+from gas_pool import GasPool
+from gas_estimator import GasEstimator, gross_gas
+from market import MarketClient
+from rpc import RpcClient
+from stub_node import StubNode, StubSuiClient
+from util import extract_effects
+
+
+def workload(calls):
+    rng = random.Random(7)
+    jobs = []
+    for i in range(calls):
+        jobs.append(("change_price", (i, str(rng.randint(1, 10 ** 9)))))
+        n = rng.choice([5, 20, 50, 100, 200, 400])
+        items = [("Gekacha #%d" % j, "https://gekacha.io/%d.png" % j) for j in range(n)]
+        jobs.append(("fill", items))
+    return jobs
+
+
+def run(node, jobs, estimator):
+    rpc = RpcClient(node.url)
+    sui = StubSuiClient(rpc)
+    pool = GasPool(sui, auto_replenish=False)
+    market = MarketClient(sui, rpc=rpc, gas_pool=pool, gas_estimator=estimator)
+    launchpad = sui_launchpad(sui, gas_pool=pool, gas_estimator=estimator)
+    stats = {"calls": 0, "failed": 0, "budget": 0, "used": 0}
+    for kind, args in jobs:
+        stats["calls"] = stats["calls"] + 1
+        try:
+            if kind == "change_price":
+                result = market.change_price("0x2::sui::SUI", "0x%040x" % args[0], args[1])
+            else:
+                result = launchpad.filling_warehouse_by_creator(
+                    "0xadc", "0xc::gekacha::Gekacha", "0x1a",
+                    [name for name, _ in args], [url for _, url in args], [], [], [])
+        except AssertionError:
+            stats["failed"] = stats["failed"] + 1
+            continue
+        stats["used"] = stats["used"] + gross_gas(extract_effects(result))
+    return stats
+
+
+if __name__ == "__main__":
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    jobs = workload(calls)
+    with StubNode(seed=3) as node:
+        node.add_gas_coin("0x%040x" % 1, 10 ** 12)
+        estimator = GasEstimator(RpcClient(node.url))
+        for label, est in (("fixed 10000", None), ("estimator", estimator)):
+            stats = run(node, jobs, est)
+            ok = stats["calls"] - stats["failed"]
+            if est is None:
+                budget = 10000 * ok
+            else:
+                budget = sum(entry["budget"] for entry in estimator.report()["functions"].values())
+            print("%-12s %3d/%d failed for gas, %6.0f budget reserved per successful call, used/budget %.2f" % (
+                label, stats["failed"], stats["calls"], budget / max(1, ok), stats["used"] / max(1, budget)))
+        report = estimator.report()
+        print("estimator    %d estimates, %d dry runs" % (report["estimates"], report["dry_runs"]))
+        for function, entry in report["functions"].items():
+            print("  %-44s shapes %d  calls %4d  under %d  used/budget %.2f" % (
+                function, entry["shapes"], entry["calls"], entry["under"], entry["utilization"]))
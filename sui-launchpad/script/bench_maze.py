@@ -0,0 +1,33 @@
+"""Per-mint cost of the old bitmap walk vs the Fenwick maze by collection size.
+
+    python bench_maze.py [mints per size]
+
+Both models draw the same slots; the first mints are measured, when the
+old walk is cheapest per slot taken.
+"""
+import sys
+
+from maze_model import FenwickMaze, BitmapMaze
+
+
+def run(maze_cls, size, mints):
+    maze = maze_cls(size)
+    drawn = []
+    for n in range(mints):
+        drawn.append(maze.mint(size - n, "0x%040x" % (n + 1)))
+    return drawn, maze.steps / mints, maze.copied / mints
+
+
+if __name__ == "__main__":
+    mints = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    print("%8s  %12s %12s  %12s %12s" % ("size", "old steps", "old copied", "new steps", "new copied"))
+    for size in (1000, 5000, 10000, 50000, 100000):
+        old, old_steps, old_copied = run(BitmapMaze, size, mints)
+        new, new_steps, new_copied = run(FenwickMaze, size, mints)
+        assert old == new, "models disagree at size %d" % size
+        print("%8d  %12.0f %12.0f  %12.1f %12.0f" % (size, old_steps, old_copied, new_steps, new_copied))
+
+    # drain a small collection completely: every index exactly once
+    size = 1000
+    maze = FenwickMaze(size)
+    assert sorted(maze.mint(size - n, "0x%040x" % (n + 1)) for n in range(size)) == list(range(size))
@@ -0,0 +1,156 @@
+"""Rehearse a drop: many wallets calling sale_mint against a local stub fullnode.
+
+    python bench_mint_day.py --wallets 500 --mints 4 --concurrency 64 \\
+        --latency 0.002 --exec-latency 0.02 --error-rate 0.01 --conflict-rate 0.02
+
+Every wallet has its own client, gas coins and GasPool. Failed attempts are
+retried with jittered backoff when the failure is transient (injected node
+errors, gas version conflicts, transport errors); Move aborts are not. Prints
+throughput, latency percentiles, retries and a failure breakdown, or one JSON
+object with `--json` for CI.
+"""
+import sys
+import json
+import time
+import argparse
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from launchpad import sui_launchpad
+from gas_pool import GasPool
+from rpc import RpcClient, RpcTransportError, backoff_delay
+from stub_node import StubNode, StubSuiClient
+
+COLLECTION_TYPE = "0xc0ffee::gekacha::Gekacha"
+COIN_TYPE = "0x2::sui::SUI"
+LAUNCHPAD = "0x%040x" % 0x1a
+SALE_PLAN = "0x%040x" % 0x5a
+CLOCK = "0x%040x" % 6
+
+RETRIABLE = ("conflict", "node_error", "transport")
+
+
+def classify(error):
+    if isinstance(error, RpcTransportError):
+        return "transport"
+    message = str(error)
+    if "version conflict" in message or "not available for consumption" in message:
+        return "conflict"
+    if "MoveAbort" in message:
+        return "move_abort"
+    if "Internal error" in message:
+        return "node_error"
+    return "other"
+
+
+def percentile(data, p):
+    data = sorted(data)
+    return data[min(len(data) - 1, int(len(data) * p / 100))] if data else 0.0
+
+
+class MintDay:
+    """Drives `wallets * mints` sale_mint calls through `concurrency` threads."""
+
+    def __init__(self, node, wallets, mints, concurrency, gas_per_wallet=2, retries=3, backoff=0.01):
+        self.node = node
+        self.mints = mints
+        self.concurrency = concurrency
+        self.retries = retries
+        self.backoff = backoff
+        self.rpc = RpcClient(node.url, pool_size=concurrency)
+        self.clients = []
+        for w in range(wallets):
+            address = "0x%040x" % (0x10000 + w)
+            for c in range(gas_per_wallet):
+                node.add_gas_coin("0x%040x" % (0x1000000 + w * gas_per_wallet + c), 10 ** 9, owner=address)
+            sui = StubSuiClient(self.rpc, address)
+            client = sui_launchpad(sui, gas_pool=GasPool(sui, auto_replenish=False))
+            # wallets know their coins before the sale opens
+            client.gas_pool.refresh()
+            self.clients.append((client, ["0x%040x" % (0x2000000 + w)]))
+        self.latencies = []
+        self.retried = 0
+        self.errors = Counter()
+        self.failures = Counter()
+        self._lock = threading.Lock()
+
+    def mint(self, wallet):
+        client, payment = self.clients[wallet]
+        start = time.perf_counter()
+        attempt = 0
+        while True:
+            try:
+                client.sale_mint(COLLECTION_TYPE, COIN_TYPE, LAUNCHPAD, SALE_PLAN, "0", "1", [], payment, CLOCK)
+            except (AssertionError, RpcTransportError) as e:
+                kind = classify(e)
+                with self._lock:
+                    self.errors[kind] = self.errors[kind] + 1
+                if kind not in RETRIABLE or attempt >= self.retries:
+                    with self._lock:
+                        self.failures[kind] = self.failures[kind] + 1
+                    return
+                time.sleep(backoff_delay(attempt, self.backoff, 1.0))
+                attempt = attempt + 1
+                with self._lock:
+                    self.retried = self.retried + 1
+                continue
+            with self._lock:
+                self.latencies.append(time.perf_counter() - start)
+            return
+
+    def run(self):
+        jobs = [w for _ in range(self.mints) for w in range(len(self.clients))]
+        start = time.perf_counter()
+        with ThreadPoolExecutor(self.concurrency) as pool:
+            list(pool.map(self.mint, jobs))
+        elapsed = time.perf_counter() - start
+        return {
+            "attempted": len(jobs),
+            "minted": len(self.latencies),
+            "elapsed": elapsed,
+            "throughput": len(self.latencies) / elapsed,
+            "p50_ms": percentile(self.latencies, 50) * 1000,
+            "p99_ms": percentile(self.latencies, 99) * 1000,
+            "retries": self.retried,
+            "errors": dict(self.errors),
+            "failures": dict(self.failures),
+        }
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="sale_mint load simulation against a stub fullnode")
+    parser.add_argument("--wallets", type=int, default=500)
+    parser.add_argument("--mints", type=int, default=4, help="mints per wallet")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--gas-per-wallet", type=int, default=2)
+    parser.add_argument("--latency", type=float, default=0.002, help="per request, seconds")
+    parser.add_argument("--exec-latency", type=float, default=0.02, help="per execution, seconds")
+    parser.add_argument("--error-rate", type=float, default=0.01)
+    parser.add_argument("--conflict-rate", type=float, default=0.02)
+    parser.add_argument("--abort-rate", type=float, default=0.0, help="fraction of wallets whose mints abort")
+    parser.add_argument("--retries", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+
+    with StubNode(latency=args.latency, exec_latency=args.exec_latency, error_rate=args.error_rate,
+                  conflict_rate=args.conflict_rate, seed=args.seed) as node:
+        day = MintDay(node, args.wallets, args.mints, args.concurrency, args.gas_per_wallet, args.retries)
+        # an aborting wallet stands in for one with too little SUI
+        for client, payment in day.clients[:int(args.wallets * args.abort_rate)]:
+            node.failing_objects.update(payment)
+        report = day.run()
+
+    if args.json:
+        print(json.dumps(report))
+        return
+    print("%d/%d minted in %.1fs: %.0f mints/s, p50 %.1f ms, p99 %.1f ms" % (
+        report["minted"], report["attempted"], report["elapsed"], report["throughput"],
+        report["p50_ms"], report["p99_ms"]))
+    print("retries %d, errors %s, failures %s" % (report["retries"], report["errors"] or "{}",
+                                                 report["failures"] or "{}"))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
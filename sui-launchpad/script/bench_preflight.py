@@ -0,0 +1,87 @@
+"""sale_mint with and without a SalePlanMirror when most calls are doomed.
+
+    python bench_preflight.py [wallets] [attempts per wallet]
+
+The plan allows 2 mints per address and every wallet tries `attempts`
+times, so everything past the second mint would abort on chain. The stub
+node does not enforce plan limits, so "sent" is what reaches the node.
+"""
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from launchpad import sui_launchpad
+from gas_pool import GasPool
+from rpc import RpcClient
+from stub_node import StubNode, StubSuiClient
+from sale_plan_mirror import SalePlanMirror, SaleRejected
+
+LAUNCHPAD = "0x%040x" % 0x1a
+SALE_PLAN = "0x%040x" % 0x5a
+RECORD_TABLE = "0x%040x" % 0x7e
+CLOCK = "0x%040x" % 6
+
+
+def setup(node):
+    now = int(time.time())
+    plan = {"type": "plan::Plan", "fields": {
+        "price": "100", "start_at": str(now - 60), "end_at": str(now + 3600), "does_whitelist": False,
+        "max_amount_this_plan": "100000", "max_mint_amount_per_address": "2",
+        "already_mint_amount_this_plan": "0",
+        "record": {"type": "record::SaleRecord", "fields": {"record": {"type": "0x2::table::Table<address, u64>",
+                                                                       "fields": {"id": {"id": RECORD_TABLE}}}}},
+    }}
+    node.add_object(SALE_PLAN, "plan::SalePlan", fields={"id": {"id": SALE_PLAN}, "plans": [plan]})
+    node.add_object(LAUNCHPAD, "administrate::Launchpad", fields={
+        "id": {"id": LAUNCHPAD}, "collection_max": "100000", "reserve": "0", "reserve_index": "0", "mint_index": "0"})
+
+
+def run(node, wallets, attempts, use_mirror):
+    rpc = RpcClient(node.url, pool_size=32)
+    mirror = SalePlanMirror(SALE_PLAN, LAUNCHPAD, rpc) if use_mirror else None
+    clients = []
+    for w in range(wallets):
+        address = "0x%040x" % (0x10000 + w + (wallets if use_mirror else 0))
+        node.add_gas_coin("0x%040x" % (0x1000000 + w + (wallets if use_mirror else 0)), 10 ** 9, owner=address)
+        sui = StubSuiClient(rpc, address)
+        client = sui_launchpad(sui, gas_pool=GasPool(sui, auto_replenish=False), mirrors=[mirror] if mirror else ())
+        client.gas_pool.refresh()
+        clients.append(client)
+    if mirror is not None:
+        mirror.load([client.client.config.active_address for client in clients])
+    sent_before = node.calls
+
+    def mint(w):
+        # each wallet's attempts are sequential, as one user clicking "mint"
+        for _ in range(attempts):
+            try:
+                clients[w].sale_mint("0xc::gekacha::Gekacha", "0x2::sui::SUI", LAUNCHPAD, SALE_PLAN, "0", "1",
+                                     [], ["0x%040x" % (0x2000000 + w)], CLOCK)
+            except SaleRejected:
+                pass
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(32) as pool:
+        list(pool.map(mint, range(wallets)))
+    elapsed = time.perf_counter() - start
+    return elapsed, node.calls - sent_before, mirror
+
+
+if __name__ == "__main__":
+    wallets = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    attempts = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    with StubNode(exec_latency=0.02) as node:
+        setup(node)
+        elapsed, requests, _ = run(node, wallets, attempts, False)
+        print("no mirror   %.2fs, %d node requests" % (elapsed, requests))
+        elapsed, requests, mirror = run(node, wallets, attempts, True)
+        print("mirror      %.2fs, %d node requests, %s" % (elapsed, requests, dict(mirror.metrics)))
+
+        n = 100000
+        start = time.perf_counter()
+        for i in range(n):
+            try:
+                mirror.check(0, 1, "0x%040x" % (0x10000 + wallets))
+            except SaleRejected:
+                pass
+        print("check       %.2f us per call" % ((time.perf_counter() - start) / n * 1e6))
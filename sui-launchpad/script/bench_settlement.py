@@ -0,0 +1,95 @@
+"""Compare per-mint and accumulated settlement of sale proceeds.
+
+    python bench_settlement.py --mints 10000 --shareholders 5 --disperse-every 1000
+
+prints a model, not a measurement: the coin objects and transfers each
+mode leaves behind if every mint pays every shareholder (per mint) or a
+dispersal every `--disperse-every` mints does (accumulate). The only
+measured numbers come from a fullnode: given two sale plans that differ
+only in beneficiary account_type (1: per mint, 3: accumulate), it dry-runs
+one sale_mint against each and one disperse_proceeds, and projects the gas
+of the whole sale from those:
+
+    python bench_settlement.py --node https://fullnode.devnet.sui.io:443 \\
+        --signer 0x.. --collection-type 0x..::gekacha::Gekacha --coin-type 0x2::sui::SUI \\
+        --launchpad 0x.. --per-mint-plan 0x.. --accumulate-plan 0x.. --payment 0x.. --clock 0x..
+"""
+import sys
+import json
+import argparse
+
+from settlement import launchpad_package
+from gas_estimator import GasEstimator
+from rpc import RpcClient
+
+
+def object_model(mints, shareholders, disperse_every):
+    """Coins created and transfers made by settling `mints` payments each way, by counting."""
+    dispersals = -(-mints // disperse_every)
+    return {
+        "per_mint": {"coins": mints * shareholders, "transfers": mints * shareholders},
+        "accumulate": {"coins": dispersals * shareholders, "transfers": dispersals * shareholders,
+                       "dispersals": dispersals},
+    }
+
+
+def measure(args):
+    estimator = GasEstimator(RpcClient(args.node))
+
+    def dry_run(function, arguments):
+        return estimator.dry_run(args.signer, launchpad_package, "port", function,
+                                 [args.collection_type, args.coin_type], arguments)
+
+    def mint(sale_plan):
+        return dry_run("sale_mint", [args.launchpad, sale_plan, 0, 1, [], [args.payment], args.clock])
+
+    per_mint, accumulate = mint(args.per_mint_plan), mint(args.accumulate_plan)
+    # dispersing an empty balance returns early, so mint first when measuring on a fresh plan
+    disperse = dry_run("disperse_proceeds", [args.accumulate_plan])
+    dispersals = -(-args.mints // args.disperse_every)
+    return {
+        "sale_mint": {"per_mint": per_mint, "accumulate": accumulate},
+        "disperse_proceeds": disperse,
+        "sale": {"per_mint": per_mint * args.mints,
+                 "accumulate": accumulate * args.mints + disperse * dispersals},
+    }
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="per-mint vs accumulated settlement")
+    parser.add_argument("--mints", type=int, default=10000)
+    parser.add_argument("--shareholders", type=int, default=5)
+    parser.add_argument("--disperse-every", type=int, default=1000, help="mints between dispersals")
+    parser.add_argument("--node")
+    parser.add_argument("--signer")
+    parser.add_argument("--collection-type")
+    parser.add_argument("--coin-type", default="0x2::sui::SUI")
+    parser.add_argument("--launchpad")
+    parser.add_argument("--per-mint-plan")
+    parser.add_argument("--accumulate-plan")
+    parser.add_argument("--payment")
+    parser.add_argument("--clock", default="0x%040x" % 6)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+
+    report = {"model": object_model(args.mints, args.shareholders, args.disperse_every)}
+    if args.node:
+        report["gas"] = measure(args)
+
+    if args.json:
+        print(json.dumps(report))
+        return
+    objects = report["model"]
+    print("model (counted, not measured): %d mints, %d shareholders, disperse every %d mints" % (
+        args.mints, args.shareholders, args.disperse_every))
+    for mode in ("per_mint", "accumulate"):
+        print("  %-10s %8d coins, %8d transfers" % (mode, objects[mode]["coins"], objects[mode]["transfers"]))
+    if "gas" in report:
+        gas = report["gas"]
+        print("dry-run sale_mint gas: per_mint %d, accumulate %d; disperse_proceeds %d" % (
+            gas["sale_mint"]["per_mint"], gas["sale_mint"]["accumulate"], gas["disperse_proceeds"]))
+        print("whole sale, projected from the dry runs: per_mint %d, accumulate %d" % (gas["sale"]["per_mint"], gas["sale"]["accumulate"]))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,101 @@
+"""Whitelist signer throughput: raw signing, then the HTTP endpoint under load.
+
+    python bench_signer.py [wallets] [clients]
+
+The launchpad and sale plan are served by a StubNode; their BCS bytes are
+rewritten every 50 ms to mimic mints invalidating the signed message.
+"""
+import os
+import sys
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from nacl.signing import VerifyKey
+
+from whitelist_signer import WhitelistSigner, SignerServer, whitelist_message
+from stub_node import StubNode
+from rpc import RpcClient
+
+LAUNCHPAD = "0x%040x" % 1
+SALE_PLAN = "0x%040x" % 2
+
+
+def percentile(data, p):
+    data = sorted(data)
+    return data[min(len(data) - 1, int(len(data) * p / 100))] if data else 0.0
+
+
+def bench_raw(signer, n):
+    messages = [os.urandom(1500) for _ in range(n)]
+    start = time.perf_counter()
+    for m in messages:
+        signer.key.sign(m)
+    serial = time.perf_counter() - start
+    signer.sign_messages(messages[:1000])
+    signer.signatures.clear()
+    start = time.perf_counter()
+    signer.sign_messages(messages)
+    pooled = time.perf_counter() - start
+    print("raw       serial %.0f sig/s, pool(%d) %.0f sig/s" % (n / serial, signer.workers, n / pooled))
+
+
+def bench_http(node, signer, wallets, clients):
+    stop = threading.Event()
+
+    def mint():
+        version = 1
+        while not stop.is_set():
+            version = version + 1
+            node.add_object(SALE_PLAN, "0x1::plan::SalePlan", version, bcs_bytes=os.urandom(900))
+            time.sleep(0.05)
+
+    local = threading.local()
+    verify_key = VerifyKey(signer.public_key)
+
+    def request(wallet):
+        session = getattr(local, "session", None)
+        if session is None:
+            session = local.session = requests.Session()
+        start = time.perf_counter()
+        reply = session.post(server.url + "/sign", json={
+            "launchpad": LAUNCHPAD, "sale_plan": SALE_PLAN, "plan_index": 0, "wallet": wallet})
+        latency = time.perf_counter() - start
+        assert reply.status_code == 200, reply.text
+        return latency, bytes.fromhex(reply.json()["signature"])
+
+    with SignerServer(signer) as server:
+        minter = threading.Thread(target=mint, daemon=True)
+        minter.start()
+        start = time.perf_counter()
+        with ThreadPoolExecutor(clients) as pool:
+            results = list(pool.map(request, ["0x%040x" % (100 + i) for i in range(wallets)]))
+        elapsed = time.perf_counter() - start
+        stop.set()
+        minter.join()
+        time.sleep(signer.messages.ttl)
+        # once the objects stop changing, an answer verifies against their current bytes
+        _, signature = request("0x%040x" % 100)
+        message = whitelist_message(node.objects[LAUNCHPAD]["bcs_bytes"], node.objects[SALE_PLAN]["bcs_bytes"], 0)
+        verify_key.verify(message, signature)
+
+    latencies = [latency for latency, _ in results]
+    print("http      %d wallets, %d clients: %.0f sig/s, p50 %.2f ms, p99 %.2f ms, %d distinct messages signed" % (
+        wallets, clients, wallets / elapsed, percentile(latencies, 50) * 1000,
+        percentile(latencies, 99) * 1000, signer.signatures.stats.misses))
+
+
+if __name__ == "__main__":
+    wallets = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    clients = int(sys.argv[2]) if len(sys.argv) > 2 else 32
+    with StubNode() as node:
+        node.add_object(LAUNCHPAD, "0x1::launchpad::Launchpad", 1, bcs_bytes=os.urandom(1200))
+        node.add_object(SALE_PLAN, "0x1::plan::SalePlan", 1, bcs_bytes=os.urandom(900))
+        signer = WhitelistSigner(os.urandom(32), rpc=RpcClient(node.url), message_ttl=0.05)
+        try:
+            bench_raw(signer, 20000)
+            signer.signatures = type(signer.signatures)(signer.signatures.maxsize)
+            bench_http(node, signer, wallets, clients)
+        finally:
+            signer.close()
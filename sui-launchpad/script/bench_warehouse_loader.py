@@ -0,0 +1,229 @@
+"""Uploading a collection into a Warehouse on a local stub fullnode, with interruptions.
+
+    python bench_warehouse_loader.py [items] [workers]
+
+The stub appends each filling call's items to the Warehouse TableVec the
+way `add_token_info` pops them, and WarehouseVerifier compares the result
+with the source. Before timing a clean upload it checks that chunks stay
+within the gas limit, and that an upload cut short resumes without
+skipping or duplicating an item: after a crash whose last chunks landed,
+after one whose last chunks never left, and after a chunk the node
+aborted.
+"""
+import os
+import sys
+import json
+import time
+import tempfile
+import threading
+
+from launchpad import sui_launchpad
+from rpc import RpcClient
+from gas_pool import GasPool
+from stub_node import StubNode, StubSuiClient
+from warehouse_loader import WarehouseLoader, Checkpoint, chunk_items, chunk_gas, read_items
+from warehouse_verify import WarehouseVerifier
+
+LAUNCHPAD = "0x%040x" % 0x1a
+TABLE = "0x%040x" % 0x1b
+ADMIN_CAP = "0x%040x" % 0x1c
+COLLECTION = "0xc::gekacha::Gekacha"
+
+
+def source_item(i):
+    return {"name": "Gekacha #%d" % i, "url": "https://example.com/gekacha/%d.png" % i, "symbol": "GKC",
+            "attributes": {"background": ["red", "blue", "green"][i % 3], "level": i % 50}}
+
+
+class _Warehouse:
+    """Serves filling_warehouse_by_creator on a StubNode."""
+
+    def __init__(self, node):
+        self.node = node
+        self.size = 0
+        self.budgets = []
+        self._lock = threading.Lock()
+        self._execute = node.handlers["stub_moveCall"]
+        node.handlers["stub_moveCall"] = self.fill
+        self._publish()
+
+    def _publish(self):
+        self.node.add_object(LAUNCHPAD, "0x1::administrate::Launchpad", fields={
+            "mint_index": 0,
+            "warehouse": {"fields": {"nft_content": {"fields": {"contents": {"fields": {
+                "id": {"id": TABLE}, "size": str(self.size)}}}}}}})
+
+    def fill(self, params):
+        result = self._execute(params)
+        call = params[0]
+        names, urls, symbols, keys, values = call["arguments"][2:7]
+        with self._lock:
+            self.budgets.append(int(call["gas_budget"]))
+            # add_token_info pops from the back of its vectors
+            for i in reversed(range(len(names))):
+                self.node.add_dynamic_field(TABLE, str(self.size), {"type": "0x1::warehouse::NFTContent", "fields": {
+                    "name": names[i], "url": urls[i], "symbol": {"fields": {"vec": symbols[i:i + 1]}},
+                    "attribute_keys": keys[i] if keys else [], "attribute_values": values[i] if values else [],
+                    "is_used": False}})
+                self.size = self.size + 1
+            self._publish()
+        return result
+
+
+class _Crash(BaseException):
+    """The loader's process dying: nothing catches it and no later call is made."""
+
+
+class _CrashingSui:
+    """Lets `calls` filling calls through, then dies on every later one.
+
+    With `landed` the call that dies has reached the node first.
+    """
+
+    def __init__(self, sui, calls, landed):
+        self.sui = sui
+        self.calls = calls
+        self.landed = landed
+        self._lock = threading.Lock()
+
+    def move_call_txn(self, **kwargs):
+        with self._lock:
+            self.calls = self.calls - 1
+            dead = self.calls < 0
+        if dead and self.landed:
+            self.sui.move_call_txn(**kwargs)
+        if dead:
+            # dies once the calls before it are logged, so the checkpoint is the same every run
+            time.sleep(0.05)
+            raise _Crash()
+        return self.sui.move_call_txn(**kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self.sui, name)
+
+
+def read_checkpoint(path):
+    with open(path) as f:
+        header = json.loads(f.readline())
+    state = Checkpoint(path, header)
+    state.close()
+    return state
+
+
+def make_launchpad(node, rpc, coins):
+    for i in range(coins):
+        node.add_gas_coin("0x%040x" % (0x100 + i), 10 ** 9)
+    sui = StubSuiClient(rpc)
+    return sui_launchpad(sui, gas_pool=GasPool(sui, auto_replenish=False))
+
+
+def loader(client, checkpoint, workers, rpc, **limits):
+    return WarehouseLoader(client, COLLECTION, LAUNCHPAD, checkpoint, admin_cap=ADMIN_CAP, workers=workers,
+                           rpc=rpc, **limits)
+
+
+def check_complete(report, items, in_order=True):
+    assert report["source_items"] == report["chain_size"] == items, report
+    for section in ("missing", "duplicated", "unexpected", "holes"):
+        assert report[section]["count"] == 0, (section, report[section])
+    if in_order:
+        assert report["ok"], report["out_of_order"]
+    return report
+
+
+def check_gas_chunks(source, rpc, tmp):
+    max_gas = 20000
+    starts = 0
+    for start, items, size in chunk_items(read_items(source), max_gas=max_gas):
+        assert start == starts and chunk_gas(len(items), size) <= max_gas
+        starts = start + len(items)
+    with StubNode() as node:
+        warehouse = _Warehouse(node)
+        with RpcClient(node.url) as rpc:
+            client = make_launchpad(node, rpc, 2)
+            summary = loader(client, os.path.join(tmp, "gas.jsonl"), 1, rpc, max_chunk_gas=max_gas).upload(source)
+            assert summary["failed_chunks"] == 0 and summary["items"] == starts, summary
+            assert max(warehouse.budgets) <= max_gas and len(warehouse.budgets) > 1, warehouse.budgets
+            check_complete(WarehouseVerifier(LAUNCHPAD, rpc).verify(source), starts)
+
+
+def check_resume(source, items, tmp, landed):
+    checkpoint = os.path.join(tmp, "crash-%s.jsonl" % landed)
+    with StubNode() as node:
+        warehouse = _Warehouse(node)
+        with RpcClient(node.url) as rpc:
+            client = make_launchpad(node, rpc, 2)
+            crashing = sui_launchpad(_CrashingSui(client.client, 3, landed), gas_pool=client.gas_pool)
+            try:
+                loader(crashing, checkpoint, 1, rpc, max_chunk_items=50).upload(source)
+                raise AssertionError("the upload did not crash")
+            except _Crash:
+                pass
+            state = read_checkpoint(checkpoint)
+            assert len(state.done) == 3 and state.pending, (state.done, state.pending)
+            before = warehouse.size
+            summary = loader(client, checkpoint, 1, rpc, max_chunk_items=50).upload(source)
+            resent = warehouse.size - before
+            pending = sum(entry["count"] for entry in state.pending.values())
+            # landed chunks are kept, lost ones sent again; nothing else repeats
+            assert resent == items - 150 - (pending if landed else 0), (resent, pending, summary)
+            assert summary["skipped_chunks"] == 3 + (len(state.pending) if landed else 0), summary
+            check_complete(WarehouseVerifier(LAUNCHPAD, rpc).verify(source), items)
+
+
+def check_failed_chunk(source, items, tmp):
+    checkpoint = os.path.join(tmp, "failed.jsonl")
+    with StubNode() as node:
+        warehouse = _Warehouse(node)
+        with RpcClient(node.url) as rpc:
+            client = make_launchpad(node, rpc, 2)
+            node.failing_objects.add(source_item(120)["name"])
+            summary = loader(client, checkpoint, 1, rpc, max_chunk_items=50).upload(source)
+            assert summary["failed_chunks"] == 1 and warehouse.size == items - 50, summary
+            node.failing_objects.clear()
+            summary = loader(client, checkpoint, 1, rpc, max_chunk_items=50).upload(source)
+            assert summary == {"chunks": 1, "items": 50, "skipped_chunks": items // 50 - 1, "failed_chunks": 0}, summary
+            # the retried chunk lands last, so it is out of place but neither lost nor doubled
+            report = check_complete(WarehouseVerifier(LAUNCHPAD, rpc).verify(source), items, in_order=False)
+            run = report["out_of_order"]["sample"][0]
+            assert (run["source_start"], run["chain_start"]) == (100, items - 50), report["out_of_order"]
+
+            # a warehouse that matches neither outcome of the pending chunks is refused
+            warehouse.size = warehouse.size + 3
+            warehouse._publish()
+            with open(checkpoint, "a") as f:
+                f.write(json.dumps({"start": items, "count": 7, "state": "pending", "digest": None}) + "\n")
+            try:
+                loader(client, checkpoint, 1, rpc, max_chunk_items=50).upload(source)
+                raise AssertionError("a pending chunk that half landed was not refused")
+            except RuntimeError:
+                pass
+
+
+if __name__ == "__main__":
+    items = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, "source.jsonl")
+        with open(source, "w") as f:
+            for i in range(items):
+                f.write(json.dumps(source_item(i)) + "\n")
+        small = os.path.join(tmp, "small.jsonl")
+        with open(small, "w") as f:
+            for i in range(500):
+                f.write(json.dumps(source_item(i)) + "\n")
+        check_gas_chunks(small, None, tmp)
+        check_resume(small, 500, tmp, landed=True)
+        check_resume(small, 500, tmp, landed=False)
+        check_failed_chunk(small, 500, tmp)
+
+        with StubNode(exec_latency=0.01) as node:
+            _Warehouse(node)
+            with RpcClient(node.url, pool_size=workers) as rpc:
+                client = make_launchpad(node, rpc, workers * 2)
+                start = time.perf_counter()
+                summary = loader(client, os.path.join(tmp, "run.jsonl"), workers, rpc).upload(source)
+                elapsed = time.perf_counter() - start
+                report = check_complete(WarehouseVerifier(LAUNCHPAD, rpc).verify(source), items, in_order=workers == 1)
+        print("%d items  %d chunks  %d workers  %.2fs  %.0f items/s  %d out of order" % (
+            items, summary["chunks"], workers, elapsed, items / elapsed, report["out_of_order"]["count"]))
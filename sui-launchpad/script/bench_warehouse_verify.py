@@ -0,0 +1,107 @@
+"""Verifying a 100k-item Warehouse against its metadata file on a local stub fullnode.
+
+    python bench_warehouse_verify.py [items] [workers]
+
+The Warehouse is built from the source with a few faults injected: one
+chunk stored back to front (sent without the reversal add_token_info's
+pop_back needs), two chunks landed in each other's place, one item never
+uploaded, one uploaded twice and a handful already minted. The stub runs in
+a child process so the peak RSS printed is the verifier's own. Fails unless
+every fault is reported.
+"""
+import os
+import sys
+import json
+import time
+import resource
+import tempfile
+import multiprocessing
+
+from warehouse_verify import WarehouseVerifier
+from rpc import RpcClient
+from stub_node import StubNode
+
+LAUNCHPAD = "0x%040x" % 0x1a
+TABLE = "0x%040x" % 0x1b
+CHUNK = 100
+
+
+def source_item(i):
+    return {"name": "Gekacha #%d" % i, "url": "https://example.com/gekacha/%d.png" % i, "symbol": "GKC",
+            "attributes": {"background": ["red", "blue", "green"][i % 3], "level": i % 50}}
+
+
+def chain_content(item, is_used=False):
+    attributes = item["attributes"]
+    return {"type": "0x1::warehouse::NFTContent", "fields": {
+        "name": item["name"], "url": item["url"], "symbol": {"fields": {"vec": [item["symbol"]]}},
+        "attribute_keys": list(attributes), "attribute_values": [str(v) for v in attributes.values()],
+        "is_used": is_used}}
+
+
+def chain_order(items):
+    """Source indices in the order they end up on chain, and the faults put in."""
+    order = list(range(items))
+    reversed_chunk = 3 * CHUNK
+    order[reversed_chunk:reversed_chunk + CHUNK] = order[reversed_chunk:reversed_chunk + CHUNK][::-1]
+    a, b = items // 2, items // 2 + 5 * CHUNK
+    order[a:a + CHUNK], order[b:b + CHUNK] = order[b:b + CHUNK], order[a:a + CHUNK]
+    missing = items - 7
+    order.remove(missing)
+    duplicate = items // 4
+    order.append(duplicate)
+    used = list(range(10, 15))
+    return order, {"reversed": reversed_chunk, "swapped": (a, b), "missing": missing, "duplicate": duplicate,
+                   "used": used}
+
+
+def serve(items, ready, stop):
+    order, faults = chain_order(items)
+    with StubNode() as node:
+        for position, i in enumerate(order):
+            node.add_dynamic_field(TABLE, str(position), chain_content(source_item(i), position in faults["used"]))
+        node.add_object(LAUNCHPAD, "0x1::administrate::Launchpad", fields={
+            "mint_index": 5,
+            "warehouse": {"fields": {"nft_content": {"fields": {"contents": {"fields": {
+                "id": {"id": TABLE}, "size": str(len(order))}}}}}}})
+        ready.send(node.url)
+        stop.recv()
+
+
+if __name__ == "__main__":
+    items = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    _, faults = chain_order(items)
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, "source.jsonl")
+        with open(source, "w") as f:
+            for i in range(items):
+                f.write(json.dumps(source_item(i)) + "\n")
+        ready, child_ready = multiprocessing.Pipe()
+        stop, child_stop = multiprocessing.Pipe()
+        stub = multiprocessing.Process(target=serve, args=(items, child_ready, child_stop), daemon=True)
+        stub.start()
+        url = ready.recv()
+        try:
+            baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            with RpcClient(url, pool_size=workers) as rpc:
+                start = time.perf_counter()
+                report = WarehouseVerifier(LAUNCHPAD, rpc, workers=workers).verify(source)
+                elapsed = time.perf_counter() - start
+            peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        finally:
+            stop.send(None)
+            stub.join()
+
+    kinds = {run["kind"] for run in report["out_of_order"]["sample"]}
+    assert {"reversed", "shifted"} <= kinds, report["out_of_order"]
+    assert report["missing"]["sample"] == [faults["missing"]], report["missing"]
+    assert report["duplicated"]["count"] == 1, report["duplicated"]
+    assert report["used"]["sample"] == faults["used"], report["used"]
+    assert report["unexpected"]["count"] == report["holes"]["count"] == 0
+    assert not report["ok"]
+    print("%d items  %d workers  %.2fs  %.0f items/s" % (items, workers, elapsed, items / elapsed))
+    print("peak RSS %.1f MB (%.1f MB before verifying)" % (peak / 1024, baseline / 1024))
+    print("matched %d  out of order %d in %d runs %s  missing %d  duplicated %d  used %d" % (
+        report["matched"], report["out_of_order"]["count"], report["out_of_order"]["runs"], sorted(kinds),
+        report["missing"]["count"], report["duplicated"]["count"], report["used"]["count"]))
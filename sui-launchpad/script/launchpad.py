@@ -1,14 +1,66 @@
+import os
+import sys
+import time
+
 from pysui.sui.sui_clients.sync_client import SuiClient
 from pysui.sui.sui_config import SuiConfig
 from pysui.sui.sui_types.scalars import SuiString, ObjectID, SuiInteger
 from pysui.sui.sui_types.collections import SuiArray
 
+# shared client infrastructure lives next to the market scripts
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "souffl3-market", "script"))
+
+from gas_pool import GasPool, LEASE_TIMEOUT
+from metrics import active as active_metrics
+from util import extract_effects
+
 
 class sui_launchpad:
 
-    def __init__(self, client):
+    def __init__(self, client, gas_pool=None, gas_budget=10000, mirrors=(), gas_estimator=None, metrics=None,
+                 gas_timeout=LEASE_TIMEOUT):
         self.contract_address = "0xfdfe8940223686b8967fdae16e6d824808bab85d"
         self.client = client
+        self.gas_pool = gas_pool or GasPool(client)
+        self.gas_budget = gas_budget
+        # seconds to wait for a free gas coin before GasPoolExhausted
+        self.gas_timeout = gas_timeout
+        # sale_plan id -> SalePlanMirror; sale_mint checks these before sending
+        self.mirrors = {mirror.sale_plan: mirror for mirror in mirrors}
+        # when set, calls without an explicit gas_budget get dry-run budgets
+        self.gas_estimator = gas_estimator
+        # per-function latency / gas / failure records; None skips them entirely
+        self.metrics = metrics if metrics is not None else active_metrics()
+
+    def _move_call(self, module, function, type_arguments, arguments, gas_budget=None):
+        shape = None
+        if gas_budget is None and self.gas_estimator is not None:
+            gas_budget, shape = self.gas_estimator.estimate(
+                self.client.config.active_address, self.contract_address, module, function,
+                type_arguments, arguments)
+        gas_budget = gas_budget or self.gas_budget
+        coin = self.gas_pool.acquire(min_balance=gas_budget, timeout=self.gas_timeout)
+        result = None
+        start = time.perf_counter() if self.metrics is not None else 0
+        try:
+            result = self.client.move_call_txn(
+                signer=self.client.config.active_address,
+                package_object_id=SuiString(self.contract_address),
+                module=SuiString(module),
+                function=SuiString(function),
+                type_arguments=type_arguments,
+                arguments=arguments,
+                gas=coin.identifier,
+                gas_budget=SuiInteger(gas_budget),
+            )
+        finally:
+            self.gas_pool.release(coin, result)
+            if self.metrics is not None:
+                self.metrics.move_call(module, function, time.perf_counter() - start, result, gas_budget)
+        if shape is not None:
+            self.gas_estimator.observe(shape, gas_budget, result)
+        assert result.is_ok(), result.result_string
+        return result
 
     # def create_with_unregulated_cap(self, unregulated_mint_cap, collection_max, reserve, does_sequential):
     #     gases = self.get_gas()
@@ -43,41 +95,30 @@ class sui_launchpad:
     #     pass
 
     def filling_warehouse_by_creator(self, admin_cap, collection_type, launchpad,
-                                     names, urls, symbols, attr_keys, attr_values):
-        gases = self.get_gas()
-        result = self.client.move_call_txn(
-            signer=self.client.config.active_address,
-            package_object_id=SuiString(self.contract_address),
-            module=SuiString("administrate"),
-            function=SuiString("filling_warehouse_by_creator"),
-            type_arguments=SuiArray([SuiString(collection_type)]),
-            arguments=[
+                                     names, urls, symbols, attr_keys, attr_values, gas_budget=None):
+        return self._move_call(
+            "administrate",
+            "filling_warehouse_by_creator",
+            SuiArray([SuiString(collection_type)]),
+            [
                 SuiString(admin_cap), SuiString(launchpad), SuiArray(names), SuiArray(urls),
                 SuiArray(symbols), SuiArray(attr_keys), SuiArray(attr_values)
             ],
-            gas=gases[0].identifier,
-            gas_budget=SuiInteger(10000),
+            gas_budget,
         )
-        assert result.is_ok()
-        return result
 
-    def filling_warehouse_by_admin(self, permission, collection_type, launchpad, names, urls, symbols, attr_keys, attr_values):
-        gases = self.get_gas()
-        result = self.client.move_call_txn(
-            signer=self.client.config.active_address,
-            package_object_id=SuiString(self.contract_address),
-            module=SuiString("administrate"),
-            function=SuiString("filling_warehouse_by_admin"),
-            type_arguments=SuiArray([SuiString(collection_type)]),
-            arguments=[
+    def filling_warehouse_by_admin(self, permission, collection_type, launchpad, names, urls, symbols, attr_keys, attr_values,
+                                   gas_budget=None):
+        return self._move_call(
+            "administrate",
+            "filling_warehouse_by_admin",
+            SuiArray([SuiString(collection_type)]),
+            [
                 SuiString(launchpad), SuiArray(names), SuiArray(urls),
                 SuiArray(symbols), SuiArray(attr_keys), SuiArray(attr_values), SuiString(permission)
             ],
-            gas=gases[0].identifier,
-            gas_budget=SuiInteger(10000),
+            gas_budget,
         )
-        assert result.is_ok()
-        return result
 
     def create_sale_plan(self):
         pass
@@ -86,19 +127,47 @@ class sui_launchpad:
         pass
 
     def sale_mint(self, collection_type, coin_type, launchpad, sale_plan, plan_index, mint_amount, sig, wallet, clock):
-        gases = self.get_gas()
-        result = self.client.move_call_txn(
-            signer=self.client.config.active_address,
-            package_object_id=SuiString(self.contract_address),
-            module=SuiString("port"),
-            function=SuiString("sale_mint"),
-            type_arguments=SuiArray([SuiString(collection_type), SuiString(coin_type)]),
-            arguments=[
+        mirror = self.mirrors.get(sale_plan)
+        if mirror is not None:
+            mirror.check(int(plan_index), int(mint_amount), self.client.config.active_address)
+        for coin_id in wallet:
+            self.gas_pool.exclude(coin_id)
+        result = self._move_call(
+            "port",
+            "sale_mint",
+            SuiArray([SuiString(collection_type), SuiString(coin_type)]),
+            [
                 SuiString(launchpad), SuiString(sale_plan), SuiString(plan_index), SuiString(mint_amount), SuiArray(sig),
                 SuiArray(wallet), SuiString(clock)
             ],
-            gas=gases[0].identifier,
-            gas_budget=SuiInteger(10000),
         )
-        assert result.is_ok()
+        effects = extract_effects(result)
+        # a mint that aborted on chain changed nothing the mirror tracks
+        if mirror is not None and effects is not None and effects.get("status", {}).get("status") == "success":
+            mirror.note(int(plan_index), int(mint_amount), self.client.config.active_address)
         return result
+
+    def disperse_proceeds(self, collection_type, coin_type, sale_plan):
+        """Pay accumulated sale proceeds out to the shareholders; the sender must be one."""
+        return self._move_call(
+            "port",
+            "disperse_proceeds",
+            SuiArray([SuiString(collection_type), SuiString(coin_type)]),
+            [SuiString(sale_plan)],
+        )
+
+    def disperse_proceeds_by_creator(self, admin_cap, collection_type, coin_type, sale_plan):
+        return self._move_call(
+            "port",
+            "disperse_proceeds_by_creator",
+            SuiArray([SuiString(collection_type), SuiString(coin_type)]),
+            [SuiString(admin_cap), SuiString(sale_plan)],
+        )
+
+    def disperse_proceeds_by_admin(self, permission, collection_type, coin_type, sale_plan):
+        return self._move_call(
+            "port",
+            "disperse_proceeds_by_admin",
+            SuiArray([SuiString(collection_type), SuiString(coin_type)]),
+            [SuiString(permission), SuiString(sale_plan)],
+        )
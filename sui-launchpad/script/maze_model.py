@@ -0,0 +1,115 @@
+"""Python mirror of computing_room's Maze, for predicting and costing mints.
+
+`FenwickMaze` follows the Move code step for step; `BitmapMaze` is the
+previous linear walk, kept to compare against. Both count `steps` (loop
+iterations) and `copied` (bits copied) per mint as a proxy for gas.
+"""
+import struct
+import hashlib
+
+BUCKET_SIZE = 64
+
+
+def pseudo_random(address, remaining):
+    """utils::pseudo_random: sha2_256(bcs(address) + bcs(remaining)), bytes 24..32 as u64, in 1..=remaining."""
+    assert remaining > 0
+    data = bytes.fromhex(address[2:].rjust(40, "0")) + struct.pack("<Q", remaining)
+    value = struct.unpack("<Q", hashlib.sha256(data).digest()[24:32])[0]
+    return value % remaining + 1
+
+
+def bucket_sizes(nfts, bucket_size):
+    """utils::create_bit_mask's bucket lengths."""
+    sizes = []
+    while nfts > 0:
+        size = min(nfts, bucket_size)
+        sizes.append(size)
+        nfts = nfts - size
+    return sizes
+
+
+def lowbit(i):
+    return i ^ (i & (i - 1))
+
+
+class FenwickMaze:
+
+    def __init__(self, max, bucket_size=BUCKET_SIZE):
+        self.bucket_size = bucket_size
+        self.bits = [[False] * size for size in bucket_sizes(max, bucket_size)]
+        buckets = len(self.bits)
+        self.free = [len(b) for b in self.bits]
+        for i in range(1, buckets + 1):
+            parent = i + lowbit(i)
+            if parent <= buckets:
+                self.free[parent - 1] = self.free[parent - 1] + self.free[i - 1]
+        self.top_step = 1
+        while self.top_step * 2 <= buckets:
+            self.top_step = self.top_step * 2
+        self.steps = 0
+        self.copied = 0
+
+    def take(self, rank):
+        """Mark the `rank`-th (1-based) free slot used and return its index."""
+        buckets = len(self.free)
+        bucket, step = 0, self.top_step
+        while step > 0:
+            self.steps = self.steps + 1
+            nxt = bucket + step
+            if nxt <= buckets and self.free[nxt - 1] < rank:
+                bucket = nxt
+                rank = rank - self.free[nxt - 1]
+            step = step // 2
+        assert bucket < buckets
+        bits = self.bits[bucket]
+        i = 0
+        while True:
+            self.steps = self.steps + 1
+            if not bits[i]:
+                rank = rank - 1
+                if rank == 0:
+                    break
+            i = i + 1
+        bits[i] = True
+        node = bucket + 1
+        while node <= buckets:
+            self.steps = self.steps + 1
+            self.free[node - 1] = self.free[node - 1] - 1
+            node = node + lowbit(node)
+        return bucket * self.bucket_size + i
+
+    def mint(self, remaining, address):
+        return self.take(pseudo_random(address, remaining))
+
+
+class BitmapMaze:
+    """The old get_random_index: walk bits from slot 0, then rebuild every bucket."""
+
+    def __init__(self, max, bucket_size=1024):
+        self.bits = [[False] * size for size in bucket_sizes(max, bucket_size)]
+        self.steps = 0
+        self.copied = 0
+
+    def take(self, rank):
+        pos = 0
+        found = None
+        for bits in self.bits:
+            for i in range(len(bits)):
+                self.steps = self.steps + 1
+                if not bits[i]:
+                    rank = rank - 1
+                    if rank == 0:
+                        bits[i] = True
+                        found = pos
+                        break
+                pos = pos + 1
+            if found is not None:
+                break
+        assert found is not None
+        # `*bit_vec = new` copies every bucket on every mint
+        self.copied = self.copied + sum(len(bits) for bits in self.bits)
+        self.steps = self.steps + len(self.bits)
+        return found
+
+    def mint(self, remaining, address):
+        return self.take(pseudo_random(address, remaining))
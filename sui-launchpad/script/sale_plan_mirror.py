@@ -0,0 +1,160 @@
+import time
+import threading
+from collections import Counter
+
+from rpc import default_client, RpcError
+
+
+class SaleRejected(Exception):
+    """A sale_mint the chain would abort, caught before sending it."""
+
+    def __init__(self, reason, detail):
+        super().__init__("%s: %s" % (reason, detail))
+        self.reason = reason
+
+
+class PlanState:
+    __slots__ = ("price", "start_at", "end_at", "does_whitelist", "max_amount", "max_per_address",
+                 "minted", "record_table")
+
+    def __init__(self, fields):
+        self.price = int(fields["price"])
+        self.start_at = int(fields["start_at"])
+        self.end_at = int(fields["end_at"])
+        self.does_whitelist = fields["does_whitelist"]
+        self.max_amount = int(fields["max_amount_this_plan"])
+        self.max_per_address = int(fields["max_mint_amount_per_address"])
+        self.minted = int(fields["already_mint_amount_this_plan"])
+        self.record_table = fields["record"]["fields"]["record"]["fields"]["id"]["id"]
+
+
+def _fields(envelope, object_id):
+    if "error" in envelope:
+        raise RpcError("sui_getObject", envelope["error"])
+    result = envelope["result"]
+    assert result.get("status") == "Exists", "object %s does not exist" % object_id
+    return result["details"]["data"]["fields"]
+
+
+class SalePlanMirror:
+    """Client-side copy of a SalePlan and its Launchpad, checking sale_mint before it is sent.
+
+    `check()` repeats the aborting asserts of `plan::check_with_plan`,
+    `record::check` and `administrate::sale_mint` against the copy and raises
+    SaleRejected for a call the chain would abort. Mint counters only grow,
+    so a stale copy can let a doomed call through but never rejects one that
+    would succeed; `note()` applies this client's own mints right away and
+    the whole copy is reloaded once it is `max_age` seconds old. Start and
+    end times are only enforced beyond `clock_skew` seconds.
+
+    Per-address counts live in each plan's SaleRecord table and are fetched
+    by `load(addresses)` or the first time an address is checked.
+    """
+
+    def __init__(self, sale_plan, launchpad, rpc=None, max_age=5.0, clock_skew=2.0, clock=time.time):
+        self.sale_plan = sale_plan
+        self.launchpad = launchpad
+        self.rpc = rpc or default_client()
+        self.max_age = max_age
+        self.clock_skew = clock_skew
+        self.clock = clock
+        self.plans = []
+        self.records = {}
+        self.mint_index = 0
+        self.sale_supply = 0
+        self.loaded_at = None
+        self.metrics = Counter()
+        self._lock = threading.RLock()
+
+    def load(self, addresses=()):
+        """(Re)load the plans, the launchpad counters and every address record seen so far.
+
+        `addresses` are looked up in every plan's record up front, in the
+        same batch, instead of one request each on first use.
+        """
+        calls = [("sui_getObject", [self.sale_plan]), ("sui_getObject", [self.launchpad])]
+        replies = self.rpc.batch(calls)
+        plans = [PlanState(p["fields"]) for p in _fields(replies[0], self.sale_plan)["plans"]]
+        launchpad = _fields(replies[1], self.launchpad)
+        keys = list(self.records)
+        keys.extend((i, a) for i in range(len(plans)) for a in addresses if (i, a) not in self.records)
+        counts = self._fetch_records(plans, keys)
+        with self._lock:
+            self.plans = plans
+            self.mint_index = int(launchpad["mint_index"])
+            self.sale_supply = int(launchpad["collection_max"]) - int(launchpad["reserve"])
+            # a count we already raised locally may not be on chain yet
+            for key, count in zip(keys, counts):
+                old = self.records.get(key)
+                self.records[key] = count if old is None or (count is not None and count > old) else old
+            self.loaded_at = time.monotonic()
+            self.metrics["loads"] = self.metrics["loads"] + 1
+        return self
+
+    def _fetch_records(self, plans, keys):
+        """Counts for `(plan_index, address)` keys; None where the table has no entry."""
+        if not keys:
+            return []
+        replies = self.rpc.batch([
+            ("sui_getDynamicFieldObject", [plans[plan_index].record_table, address])
+            for plan_index, address in keys
+        ])
+        counts = []
+        for (plan_index, address), envelope in zip(keys, replies):
+            if "error" in envelope:
+                raise RpcError("sui_getDynamicFieldObject", envelope["error"])
+            result = envelope["result"]
+            if result.get("status") != "Exists":
+                counts.append(None)
+            else:
+                counts.append(int(result["details"]["data"]["fields"]["value"]))
+        self.metrics["record_lookups"] = self.metrics["record_lookups"] + len(keys)
+        return counts
+
+    def _record(self, plan_index, address):
+        key = (plan_index, address)
+        if key not in self.records:
+            self.records[key] = self._fetch_records(self.plans, [key])[0]
+        return self.records[key]
+
+    def check(self, plan_index, mint_amount, address):
+        """Raise SaleRejected if `address` minting `mint_amount` from `plan_index` would abort."""
+        with self._lock:
+            if self.loaded_at is None or time.monotonic() - self.loaded_at > self.max_age:
+                self.load()
+            self.metrics["checked"] = self.metrics["checked"] + 1
+            reason, detail = self._verdict(plan_index, mint_amount, address)
+            if reason is not None:
+                self.metrics["rejected"] = self.metrics["rejected"] + 1
+                self.metrics["rejected_" + reason] = self.metrics["rejected_" + reason] + 1
+                raise SaleRejected(reason, detail)
+
+    def _verdict(self, plan_index, mint_amount, address):
+        if plan_index >= len(self.plans):
+            return "no_plan", "sale plan has %d plans" % len(self.plans)
+        plan = self.plans[plan_index]
+        # plan::check_with_plan, as written on chain
+        if plan.minted > plan.max_amount + mint_amount:
+            return "plan_sold_out", "%d of %d minted" % (plan.minted, plan.max_amount)
+        count = self._record(plan_index, address)
+        # record::check skips addresses that have not minted yet
+        if count is not None and count + mint_amount > plan.max_per_address:
+            return "address_limit", "%s minted %d of %d" % (address, count, plan.max_per_address)
+        now = self.clock()
+        if plan.start_at > now + self.clock_skew:
+            return "not_started", "starts at %d" % plan.start_at
+        if plan.end_at <= now - self.clock_skew:
+            return "ended", "ended at %d" % plan.end_at
+        # administrate::sale_mint
+        if self.mint_index + mint_amount > self.sale_supply:
+            return "launchpad_sold_out", "%d of %d sold" % (self.mint_index, self.sale_supply)
+        return None, None
+
+    def note(self, plan_index, mint_amount, address):
+        """Apply a successful sale_mint by `address` to the copy."""
+        with self._lock:
+            plan = self.plans[plan_index]
+            plan.minted = plan.minted + mint_amount
+            key = (plan_index, address)
+            self.records[key] = (self.records.get(key) or 0) + mint_amount
+            self.mint_index = self.mint_index + mint_amount
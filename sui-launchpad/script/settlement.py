@@ -0,0 +1,104 @@
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "souffl3-market", "script"))
+
+from rpc import default_client
+
+launchpad_package = "0xfdfe8940223686b8967fdae16e6d824808bab85d"
+
+ACCOUNT_SHARED = 1
+ACCOUNT_SHARED_ACCUMULATED = 3
+
+
+def _value(value):
+    """u64 / Balance field as rendered by the node."""
+    if isinstance(value, dict):
+        return _value(value["fields"]["value"])
+    return int(value)
+
+
+def _option(value):
+    """Option<T> field: the inner value or None."""
+    if isinstance(value, dict) and "vec" in value.get("fields", {}):
+        vec = value["fields"]["vec"]
+        return vec[0] if vec else None
+    return value
+
+
+def sale_plan_fields(sale_plan, rpc=None):
+    # straight from the node: the shared object cache may hold an older version
+    result = (rpc or default_client()).call("sui_getObject", [sale_plan])
+    assert result.get("status") == "Exists", "object %s does not exist" % sale_plan
+    return result["details"]["data"]["fields"]
+
+
+def shares(fields):
+    """`[(address, share), ...]` in the order `shared_account::disperse` pays them."""
+    shared = _option(fields["beneficiary"]["fields"]["shared"])
+    if shared is None:
+        return []
+    return [(s["fields"]["account"], int(s["fields"]["share"])) for s in shared["fields"]["shares"]]
+
+
+def split(amount, share_list):
+    """How `shared_account::disperse` divides `amount`: pro rata, the last shareholder takes the rest."""
+    total = sum(share for _, share in share_list)
+    payouts = [(account, amount * share // total) for account, share in share_list[:-1]]
+    payouts.append((share_list[-1][0], amount - sum(paid for _, paid in payouts)))
+    return payouts
+
+
+def dispersals(sale_plan, rpc=None, package=launchpad_package, page_size=500):
+    """Every ProceedsDispersed event of `sale_plan`: `[(tx_digest, amount), ...]`."""
+    rpc = rpc or default_client()
+    query = {"MoveEvent": "%s::plan::ProceedsDispersed" % package}
+    found, cursor = [], None
+    while True:
+        page = rpc.call("sui_getEvents", [query, cursor, page_size, False])
+        for envelope in page.get("data", []):
+            fields = envelope["event"]["moveEvent"]["fields"]
+            if fields["sale_plan"] == sale_plan:
+                found.append((envelope.get("txDigest"), int(fields["amount"])))
+        cursor = page.get("nextCursor")
+        if not cursor or not page.get("data"):
+            return found
+
+
+def audit(sale_plan, rpc=None, package=launchpad_package):
+    """Reconcile a sale plan's revenue against what was dispersed and what is still held.
+
+    Revenue is each plan's price times its minted amount. For an
+    accumulating beneficiary it must equal dispersed + pending; `payouts`
+    is what each shareholder has received through dispersals.
+    """
+    rpc = rpc or default_client()
+    fields = sale_plan_fields(sale_plan, rpc)
+    account_type = int(fields["beneficiary"]["fields"]["account_type"])
+    revenue = sum(int(p["fields"]["price"]) * int(p["fields"]["already_mint_amount_this_plan"])
+                  for p in fields["plans"])
+    report = {"sale_plan": sale_plan, "account_type": account_type, "revenue": revenue}
+    if account_type != ACCOUNT_SHARED_ACCUMULATED:
+        return report
+    share_list = shares(fields)
+    events = dispersals(sale_plan, rpc, package)
+    payouts = dict((account, 0) for account, _ in share_list)
+    for _, amount in events:
+        for account, paid in split(amount, share_list):
+            payouts[account] = payouts[account] + paid
+    dispersed = sum(amount for _, amount in events)
+    pending = _value(fields["proceeds"])
+    report.update({
+        "dispersals": len(events),
+        "dispersed": dispersed,
+        "pending": pending,
+        "unaccounted": revenue - dispersed - pending,
+        "payouts": payouts,
+    })
+    return report
+
+
+if __name__ == "__main__":
+    import json
+    # settlement.py <sale_plan> [package]
+    print(json.dumps(audit(sys.argv[1], package=sys.argv[2] if len(sys.argv) > 2 else launchpad_package), indent=2))
@@ -0,0 +1,309 @@
+import csv
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from launchpad import sui_launchpad
+from rpc import default_client
+from util import extract_effects
+
+# the node rejects transactions above 128KiB; leave room for the envelope
+MAX_CHUNK_BYTES = 96 * 1024
+MAX_CHUNK_ITEMS = 500
+
+# gas_budget = GAS_BASE + GAS_PER_ITEM * items + GAS_PER_BYTE * bytes
+GAS_BASE = 2000
+GAS_PER_ITEM = 60
+GAS_PER_BYTE = 2
+MAX_GAS_BUDGET = 1000000
+
+
+def read_items(path):
+    """Lazily yield `{"name", "url", "symbol", "attributes"}` rows from a CSV or JSONL file.
+
+    CSV needs `name` and `url` columns; `symbol` and `attributes` are
+    optional, attributes being a JSON object or `key=value;key=value`.
+    """
+    with open(path, newline="") as f:
+        if path.endswith(".jsonl") or path.endswith(".ndjson"):
+            for line in f:
+                if line.strip():
+                    yield _normalize(json.loads(line))
+        else:
+            for row in csv.DictReader(f):
+                yield _normalize(row)
+
+
+def _normalize(row):
+    attributes = row.get("attributes") or {}
+    if isinstance(attributes, str):
+        attributes = attributes.strip()
+        if attributes.startswith("{"):
+            attributes = json.loads(attributes)
+        else:
+            attributes = dict(pair.split("=", 1) for pair in attributes.split(";") if pair)
+    return {
+        "name": row["name"],
+        "url": row["url"],
+        "symbol": row.get("symbol") or None,
+        "attributes": attributes,
+    }
+
+
+def _uleb_len(n):
+    size = 1
+    while n >= 0x80:
+        n = n >> 7
+        size = size + 1
+    return size
+
+
+def _bcs_str_len(s):
+    n = len(s.encode())
+    return _uleb_len(n) + n
+
+
+def item_bytes(item):
+    """BCS-serialized size of one item's share of the call arguments."""
+    size = _bcs_str_len(item["name"]) + _bcs_str_len(item["url"])
+    if item["symbol"] is not None:
+        size = size + _bcs_str_len(item["symbol"])
+    attributes = item["attributes"]
+    if attributes:
+        size = size + 2 * _uleb_len(len(attributes))
+        for key, value in attributes.items():
+            size = size + _bcs_str_len(key) + _bcs_str_len(str(value))
+    return size
+
+
+def chunk_gas(count, size):
+    return GAS_BASE + GAS_PER_ITEM * count + GAS_PER_BYTE * size
+
+
+def chunk_gas_budget(count, size):
+    # chunk_items keeps chunks within MAX_GAS_BUDGET; only one item too big
+    # on its own gets a capped budget
+    return min(MAX_GAS_BUDGET, chunk_gas(count, size))
+
+
+def chunk_items(items, max_bytes=MAX_CHUNK_BYTES, max_items=MAX_CHUNK_ITEMS, max_gas=MAX_GAS_BUDGET):
+    """Group items into `(start, items, size)` chunks bounded by bytes, count and gas estimate.
+
+    `add_token_info` drops symbols (or attributes) for a whole call unless
+    every item has them, so a chunk never mixes items with and without.
+    """
+    chunk, size, start, shape = [], 0, 0, None
+    for index, item in enumerate(items):
+        item_shape = (item["symbol"] is not None, bool(item["attributes"]))
+        n = item_bytes(item)
+        if chunk and (len(chunk) >= max_items or size + n > max_bytes or item_shape != shape
+                      or chunk_gas(len(chunk) + 1, size + n) > max_gas):
+            yield start, chunk, size
+            chunk, size = [], 0
+        if not chunk:
+            start, shape = index, item_shape
+        chunk.append(item)
+        size = size + n
+    if chunk:
+        yield start, chunk, size
+
+
+def warehouse_size(launchpad, rpc=None):
+    """Number of NFTContent entries in the launchpad's Warehouse TableVec, read fresh from the node."""
+    fields = (rpc or default_client()).call("sui_getObject", [launchpad])["details"]["data"]["fields"]
+    table = fields["warehouse"]["fields"]["nft_content"]["fields"]["contents"]["fields"]
+    return int(table["size"])
+
+
+class Checkpoint:
+    """Append-only JSONL log of chunk states, so an interrupted upload resumes.
+
+    A chunk is logged `pending` before it is sent, then `done` once its
+    transaction succeeds or `failed` when the node rejected it. A chunk
+    still `pending` on restart may or may not have executed. The first line
+    pins the source file and chunk limits; resuming with different ones
+    would shift chunk boundaries.
+    """
+
+    def __init__(self, path, header):
+        self.path = path
+        self.header = header
+        self.done = {}
+        self.pending = {}
+        if os.path.exists(path):
+            self._load()
+        self._f = open(path, "a")
+        if os.path.getsize(path) == 0:
+            self._write(header)
+
+    def _load(self):
+        with open(self.path) as f:
+            lines = [json.loads(line) for line in f if line.strip()]
+        if lines and lines[0] != self.header:
+            raise ValueError("checkpoint %s was written for %s, not %s" % (self.path, lines[0], self.header))
+        for entry in lines[1:]:
+            self._track(entry)
+
+    def _write(self, entry):
+        self._f.write(json.dumps(entry) + "\n")
+        self._f.flush()
+        os.fsync(self._f.fileno())
+
+    def mark(self, start, count, state, digest=None):
+        entry = {"start": start, "count": count, "state": state, "digest": digest}
+        self._write(entry)
+        self._track(entry)
+
+    def _track(self, entry):
+        start = entry["start"]
+        self.pending.pop(start, None)
+        if entry["state"] == "done":
+            self.done[start] = entry
+        elif entry["state"] == "pending":
+            self.pending[start] = entry
+
+    def close(self):
+        self._f.close()
+
+
+class WarehouseLoader:
+    """Streams collection metadata into a launchpad Warehouse.
+
+    Items are read lazily, cut into chunks that fit the transaction size and
+    gas limits, and up to `workers` chunks are in flight at once, each on
+    its own gas coin from the client's GasPool. `add_token_info` pops items
+    from the back of its vectors, so every chunk is sent reversed and lands
+    in the TableVec in source order. Chunks sent in parallel may still land
+    in any order relative to each other; use `workers=1` when the Warehouse
+    index must equal the source line number.
+
+    Pass `admin_cap` to fill with `filling_warehouse_by_creator`, or
+    `permission` for `filling_warehouse_by_admin`.
+    """
+
+    def __init__(self, launchpad_client, collection_type, launchpad, checkpoint_path,
+                 admin_cap=None, permission=None, workers=4,
+                 max_chunk_bytes=MAX_CHUNK_BYTES, max_chunk_items=MAX_CHUNK_ITEMS, max_chunk_gas=MAX_GAS_BUDGET,
+                 rpc=None):
+        assert (admin_cap is None) != (permission is None), "pass exactly one of admin_cap / permission"
+        self.client = launchpad_client
+        self.collection_type = collection_type
+        self.launchpad = launchpad
+        self.checkpoint_path = checkpoint_path
+        self.admin_cap = admin_cap
+        self.permission = permission
+        self.workers = workers
+        self.max_chunk_bytes = max_chunk_bytes
+        self.max_chunk_items = max_chunk_items
+        self.max_chunk_gas = max_chunk_gas
+        self.rpc = rpc
+
+    def _send(self, items, size):
+        items = list(reversed(items))
+        names = [item["name"] for item in items]
+        urls = [item["url"] for item in items]
+        symbols = [item["symbol"] for item in items] if items[0]["symbol"] is not None else []
+        if items[0]["attributes"]:
+            attr_keys = [list(item["attributes"].keys()) for item in items]
+            attr_values = [[str(v) for v in item["attributes"].values()] for item in items]
+        else:
+            attr_keys, attr_values = [], []
+        # a client with a gas estimator budgets the call itself
+        gas_budget = None if self.client.gas_estimator is not None else chunk_gas_budget(len(items), size)
+        if self.admin_cap is not None:
+            return self.client.filling_warehouse_by_creator(
+                self.admin_cap, self.collection_type, self.launchpad,
+                names, urls, symbols, attr_keys, attr_values, gas_budget)
+        return self.client.filling_warehouse_by_admin(
+            self.permission, self.collection_type, self.launchpad,
+            names, urls, symbols, attr_keys, attr_values, gas_budget)
+
+    def _resolve_pending(self, checkpoint):
+        """Decide whether chunks left `pending` by a crash made it on chain."""
+        if not checkpoint.pending:
+            return
+        confirmed = sum(entry["count"] for entry in checkpoint.done.values())
+        pending = sum(entry["count"] for entry in checkpoint.pending.values())
+        on_chain = warehouse_size(self.launchpad, self.rpc)
+        if on_chain == confirmed:
+            # none of them landed; they are sent again
+            checkpoint.pending.clear()
+        elif on_chain == confirmed + pending:
+            for start, entry in list(checkpoint.pending.items()):
+                checkpoint.mark(start, entry["count"], "done")
+        else:
+            raise RuntimeError(
+                "warehouse holds %d items but the checkpoint accounts for %d confirmed and %d pending; "
+                "verify the warehouse before resuming" % (on_chain, confirmed, pending))
+
+    def upload(self, path):
+        """Upload `path`, skipping chunks the checkpoint already has. Returns a summary dict."""
+        header = {"source": os.path.abspath(path), "launchpad": self.launchpad,
+                  "max_chunk_bytes": self.max_chunk_bytes, "max_chunk_items": self.max_chunk_items,
+                  "max_chunk_gas": self.max_chunk_gas}
+        checkpoint = Checkpoint(self.checkpoint_path, header)
+        summary = {"chunks": 0, "items": 0, "skipped_chunks": 0, "failed_chunks": 0}
+        try:
+            self._resolve_pending(checkpoint)
+            in_flight = {}
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                chunks = chunk_items(read_items(path), self.max_chunk_bytes, self.max_chunk_items, self.max_chunk_gas)
+                for start, items, size in chunks:
+                    if start in checkpoint.done:
+                        summary["skipped_chunks"] = summary["skipped_chunks"] + 1
+                        continue
+                    # bounded look-ahead keeps memory flat however big the source is
+                    while len(in_flight) >= self.workers * 2:
+                        self._collect(wait(in_flight, return_when=FIRST_COMPLETED)[0], in_flight, checkpoint, summary)
+                    checkpoint.mark(start, len(items), "pending")
+                    in_flight[pool.submit(self._send, items, size)] = (start, len(items))
+                self._collect(wait(in_flight)[0], in_flight, checkpoint, summary)
+        finally:
+            checkpoint.close()
+        return summary
+
+    def _collect(self, finished, in_flight, checkpoint, summary):
+        for future in finished:
+            start, count = in_flight.pop(future)
+            try:
+                result = future.result()
+            except AssertionError:
+                # the node answered with an error: nothing was executed
+                checkpoint.mark(start, count, "failed")
+                summary["failed_chunks"] = summary["failed_chunks"] + 1
+                continue
+            except Exception:
+                # outcome unknown; stays pending and the next run checks the chain
+                summary["failed_chunks"] = summary["failed_chunks"] + 1
+                continue
+            effects = extract_effects(result)
+            if effects is None:
+                # no effects to tell; stays pending like an unknown outcome
+                summary["failed_chunks"] = summary["failed_chunks"] + 1
+                continue
+            digest = effects.get("transactionDigest")
+            if effects.get("status", {}).get("status") != "success":
+                # executed but aborted, e.g. out of gas: nothing was added
+                checkpoint.mark(start, count, "failed", digest)
+                summary["failed_chunks"] = summary["failed_chunks"] + 1
+                continue
+            checkpoint.mark(start, count, "done", digest)
+            summary["chunks"] = summary["chunks"] + 1
+            summary["items"] = summary["items"] + count
+
+
+if __name__ == "__main__":
+    import sys
+    from pysui.sui.sui_clients.sync_client import SuiClient
+    from pysui.sui.sui_config import SuiConfig
+
+    # warehouse_loader.py <source.csv|.jsonl> <checkpoint> <collection_type> <launchpad> <admin_cap>
+    source, checkpoint_path, collection_type, launchpad, admin_cap = sys.argv[1:6]
+    loader = WarehouseLoader(
+        sui_launchpad(SuiClient(SuiConfig.default())),
+        collection_type,
+        launchpad,
+        checkpoint_path,
+        admin_cap=admin_cap,
+    )
+    print(loader.upload(source))
@@ -0,0 +1,282 @@
+import os
+import sys
+import json
+import hashlib
+from array import array
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "souffl3-market", "script"))
+
+from rpc import default_client, RpcError
+from warehouse_loader import read_items
+
+PAGE_SIZE = 500
+FETCH_BATCH = 100
+WORKERS = 8
+DIGEST_SIZE = 16
+# how many indices / runs each report section lists; counts are always complete
+SAMPLE = 20
+
+
+def content_hash(name, url, symbol, keys, values):
+    encoded = json.dumps([name, url, symbol, keys, values], separators=(",", ":"), ensure_ascii=False)
+    return hashlib.blake2b(encoded.encode(), digest_size=DIGEST_SIZE).digest()
+
+
+def item_hash(item):
+    """Hash of a source item as `add_token_info` stores it."""
+    attributes = item["attributes"] or {}
+    return content_hash(item["name"], item["url"], item["symbol"],
+                        list(attributes.keys()), [str(v) for v in attributes.values()])
+
+
+def _fields(value):
+    return value["fields"] if isinstance(value, dict) and "fields" in value else value
+
+
+def _string(value):
+    # String and Url come back either bare or as {"fields": {"bytes" | "url": ...}}
+    value = _fields(value)
+    if isinstance(value, dict):
+        return _string(value.get("url", value.get("bytes")))
+    return value
+
+
+def _option(value):
+    value = _fields(value)
+    if isinstance(value, dict) and "vec" in value:
+        return _string(value["vec"][0]) if value["vec"] else None
+    return _string(value)
+
+
+def entry_hash(content):
+    """`(hash, is_used)` of an on-chain NFTContent."""
+    content = _fields(content)
+    return content_hash(_string(content["name"]), _string(content["url"]), _option(content.get("symbol")),
+                        [_string(k) for k in content.get("attribute_keys") or []],
+                        [_string(v) for v in content.get("attribute_values") or []]), bool(content["is_used"])
+
+
+def warehouse_table(launchpad, rpc=None):
+    """`(table id, size, mint_index)` of a launchpad's Warehouse, read fresh from the node."""
+    result = (rpc or default_client()).call("sui_getObject", [launchpad])
+    assert result.get("status") == "Exists", "object %s does not exist" % launchpad
+    fields = result["details"]["data"]["fields"]
+    table = fields["warehouse"]["fields"]["nft_content"]["fields"]["contents"]["fields"]
+    return table["id"]["id"], int(table["size"]), int(fields.get("mint_index", 0))
+
+
+def iter_table(table_id, rpc=None, page_size=PAGE_SIZE, fetch_batch=FETCH_BATCH, workers=WORKERS):
+    """Yield `(index, NFTContent fields)` for every entry of a TableVec's table, in no particular order.
+
+    Field ids are listed page by page; the field objects are fetched in
+    batches on `workers` threads while the next pages are listed, with at
+    most `2 * workers` batches in flight.
+    """
+    rpc = rpc or default_client()
+
+    def fetch(ids):
+        entries = []
+        for object_id, envelope in zip(ids, rpc.batch([("sui_getObject", [i]) for i in ids])):
+            if "error" in envelope:
+                raise RpcError("sui_getObject", envelope["error"])
+            field = envelope["result"]["details"]["data"]["fields"]
+            entries.append((int(field["name"]), field["value"]))
+        return entries
+
+    with ThreadPoolExecutor(workers) as pool:
+        in_flight = deque()
+        cursor = None
+        while True:
+            page = rpc.call("sui_getDynamicFields", [table_id, cursor, page_size])
+            ids = [f["objectId"] for f in page["data"]]
+            for i in range(0, len(ids), fetch_batch):
+                in_flight.append(pool.submit(fetch, ids[i:i + fetch_batch]))
+            while len(in_flight) > workers * 2:
+                yield from in_flight.popleft().result()
+            cursor = page.get("nextCursor")
+            if not cursor or not ids:
+                break
+        while in_flight:
+            yield from in_flight.popleft().result()
+
+
+class _Section:
+    __slots__ = ("count", "sample")
+
+    def __init__(self):
+        self.count = 0
+        self.sample = []
+
+    def add(self, entry):
+        self.count = self.count + 1
+        if len(self.sample) < SAMPLE:
+            self.sample.append(entry)
+
+    def as_dict(self):
+        return {"count": self.count, "sample": self.sample}
+
+
+class _Runs:
+    """Groups misplaced items into runs: `shifted` blocks keep their order, `reversed` ones are flipped."""
+
+    def __init__(self):
+        self.items = 0
+        self.runs = _Section()
+        self._run = None
+
+    def add(self, source_index, chain_index):
+        self.items = self.items + 1
+        run = self._run
+        if run is not None and source_index == run["source_end"] + 1:
+            step = chain_index - run["chain_end"]
+            if step in (1, -1) and run["kind"] in ("moved", "shifted" if step == 1 else "reversed"):
+                run["kind"] = "shifted" if step == 1 else "reversed"
+                run["source_end"], run["chain_end"] = source_index, chain_index
+                return
+        self.flush()
+        self._run = {"kind": "moved", "source_start": source_index, "source_end": source_index,
+                     "chain_start": chain_index, "chain_end": chain_index}
+
+    def flush(self):
+        if self._run is not None:
+            self.runs.add(self._run)
+            self._run = None
+
+    def as_dict(self):
+        self.flush()
+        return {"count": self.items, "runs": self.runs.count, "sample": self.runs.sample}
+
+
+class _HashIndex:
+    """Content hash -> Warehouse indices, without a Python object per entry.
+
+    Open addressing over an array of `index + 1` (0 marks an empty slot),
+    at least twice as many slots as entries; the hashes themselves stay in
+    the verifier's bytearray. Entries go in by index, so a probe meets the
+    copies of one hash lowest index first.
+    """
+
+    def __init__(self, hashes, present):
+        self.hashes = hashes
+        capacity = 1
+        while capacity < 2 * len(present):
+            capacity = capacity * 2
+        self.mask = capacity - 1
+        self.slots = array("I", [0]) * capacity
+        for index in range(len(present)):
+            if present[index]:
+                slot = self._slot(hashes[index * DIGEST_SIZE:index * DIGEST_SIZE + 8])
+                while self.slots[slot]:
+                    slot = (slot + 1) & self.mask
+                self.slots[slot] = index + 1
+
+    def _slot(self, h):
+        return int.from_bytes(h[:8], "little") & self.mask
+
+    def indices(self, h):
+        slot = self._slot(h)
+        while self.slots[slot]:
+            index = self.slots[slot] - 1
+            if self.hashes[index * DIGEST_SIZE:(index + 1) * DIGEST_SIZE] == h:
+                yield index
+            slot = (slot + 1) & self.mask
+
+
+class WarehouseVerifier:
+    """Compares a launchpad's Warehouse with the metadata file it was filled from.
+
+    The chain side is reduced to one DIGEST_SIZE-byte content hash per
+    entry, held in a bytearray by index, and a _HashIndex over it; the
+    source is streamed through once. That is 18 bytes per item plus 8 to
+    16 for the index, whatever the metadata size.
+
+    The report counts:
+    - `matched`: source item i is Warehouse entry i.
+    - `missing`: source items on chain nowhere.
+    - `out_of_order`: source items stored at another index. They are
+      grouped into runs: `shifted` (a chunk landed elsewhere in order),
+      `reversed` (a chunk stored back to front, as `add_token_info`'s
+      pop_back does to a chunk that was not sent reversed), or `moved`.
+    - `duplicated`: extra copies of a source item.
+    - `unexpected`: entries matching no source item.
+    - `holes`: indices below the table size that could not be read.
+    - `used`: entries already marked `is_used`, next to the launchpad's
+      mint_index.
+    """
+
+    def __init__(self, launchpad, rpc=None, page_size=PAGE_SIZE, fetch_batch=FETCH_BATCH, workers=WORKERS):
+        self.launchpad = launchpad
+        self.rpc = rpc or default_client()
+        self.page_size = page_size
+        self.fetch_batch = fetch_batch
+        self.workers = workers
+
+    def verify(self, source):
+        table_id, size, mint_index = warehouse_table(self.launchpad, self.rpc)
+        hashes = bytearray(size * DIGEST_SIZE)
+        present = bytearray(size)
+        used = _Section()
+        for index, content in iter_table(table_id, self.rpc, self.page_size, self.fetch_batch, self.workers):
+            if index >= size:
+                continue
+            h, is_used = entry_hash(content)
+            hashes[index * DIGEST_SIZE:(index + 1) * DIGEST_SIZE] = h
+            present[index] = 1
+            if is_used:
+                used.add(index)
+        where = _HashIndex(hashes, present)
+
+        claimed = bytearray(size)
+        missing, runs = _Section(), _Runs()
+        matched = items = 0
+        for i, item in enumerate(read_items(source)):
+            items = items + 1
+            h = item_hash(item)
+            if i < size and present[i] and hashes[i * DIGEST_SIZE:(i + 1) * DIGEST_SIZE] == h and not claimed[i]:
+                claimed[i] = 1
+                matched = matched + 1
+                continue
+            j = self._claim(where.indices(h), claimed)
+            if j is None:
+                missing.add(i)
+            else:
+                runs.add(i, j)
+
+        duplicated, unexpected, holes = _Section(), _Section(), _Section()
+        for index in range(size):
+            if not present[index]:
+                holes.add(index)
+            elif not claimed[index]:
+                copies = sum(1 for _ in where.indices(hashes[index * DIGEST_SIZE:(index + 1) * DIGEST_SIZE]))
+                (duplicated if copies > 1 else unexpected).add(index)
+        out_of_order = runs.as_dict()
+        return {
+            "launchpad": self.launchpad,
+            "chain_size": size,
+            "source_items": items,
+            "matched": matched,
+            "ok": matched == items == size,
+            "missing": missing.as_dict(),
+            "out_of_order": out_of_order,
+            "duplicated": duplicated.as_dict(),
+            "unexpected": unexpected.as_dict(),
+            "holes": holes.as_dict(),
+            "used": dict(used.as_dict(), mint_index=mint_index),
+        }
+
+    @staticmethod
+    def _claim(indices, claimed):
+        for j in indices:
+            if not claimed[j]:
+                claimed[j] = 1
+                return j
+        return None
+
+
+if __name__ == "__main__":
+    # warehouse_verify.py <source.csv|.jsonl> <launchpad>
+    report = WarehouseVerifier(sys.argv[2]).verify(sys.argv[1])
+    print(json.dumps(report, indent=2))
+    sys.exit(0 if report["ok"] else 1)
@@ -0,0 +1,273 @@
+import os
+import sys
+import json
+import base64
+import socket
+import struct
+import hashlib
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from nacl.signing import SigningKey
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "souffl3-market", "script"))
+
+from rpc import default_client, RpcError
+from cache import LRUCache, TTLCache, MISSING
+
+# below this many signatures a batch is signed in-process; shipping it to the
+# pool costs more than ed25519 itself
+MIN_POOL_BATCH = 256
+
+
+def whitelist_message(launchpad_bcs, sale_plan_bcs, plan_index):
+    """The bytes `plan::check_whitelist` verifies: bcs(launchpad) + bcs(sale_plan) + bcs(plan_index)."""
+    return launchpad_bcs + sale_plan_bcs + struct.pack("<Q", plan_index)
+
+
+def fetch_raw_objects(ids, rpc=None):
+    """`{object_id: (version, bcs bytes)}` for `ids`, in one batch request."""
+    rpc = rpc or default_client()
+    raw = {}
+    for object_id, envelope in zip(ids, rpc.batch([("sui_getRawObject", [object_id]) for object_id in ids])):
+        if "error" in envelope:
+            raise RpcError("sui_getRawObject", envelope["error"])
+        result = envelope["result"]
+        assert result.get("status") == "Exists", "object %s does not exist" % object_id
+        data = result["details"]["data"]
+        raw[object_id] = (data["version"], base64.b64decode(data["bcs_bytes"]))
+    return raw
+
+
+_worker_key = None
+
+
+def _init_worker(seed):
+    global _worker_key
+    _worker_key = SigningKey(seed)
+
+
+def _sign_chunk(messages):
+    return [_worker_key.sign(m).signature for m in messages]
+
+
+class WhitelistSigner:
+    """Issues the off-chain whitelist signatures `port::sale_mint` takes as `sig`.
+
+    The signed message covers the launchpad and sale plan objects as they
+    are on chain, so it is built once per (launchpad, sale_plan, plan_index)
+    from their raw BCS and reused for `message_ttl` seconds; every mint
+    changes those objects, which is what makes a signature stale. The
+    message does not name the minter, so all wallets asking within the same
+    state share one signature: it is cached by message digest, concurrent
+    misses on the same message wait for a single signing, and large batches
+    of distinct messages are spread across a process pool.
+
+    `allowlist`, when given, is the set of wallet addresses a signature may
+    be issued to.
+    """
+
+    def __init__(self, seed, rpc=None, workers=None, cache_size=4096, message_ttl=1.0, allowlist=None):
+        self.seed = bytes(seed)
+        self.key = SigningKey(self.seed)
+        self.rpc = rpc or default_client()
+        self.workers = workers or os.cpu_count()
+        self.allowlist = set(allowlist) if allowlist is not None else None
+        self.signatures = LRUCache(cache_size)
+        self.messages = TTLCache(cache_size, message_ttl)
+        self._lock = threading.Lock()
+        self._in_flight = {}
+        self._pool = None
+
+    @property
+    def public_key(self):
+        return bytes(self.key.verify_key)
+
+    def message(self, launchpad, sale_plan, plan_index):
+        key = (launchpad, sale_plan, plan_index)
+        message = self.messages.get(key, MISSING)
+        if message is MISSING:
+            raw = fetch_raw_objects([launchpad, sale_plan], self.rpc)
+            message = whitelist_message(raw[launchpad][1], raw[sale_plan][1], plan_index)
+            self.messages.set(key, message)
+        return message
+
+    def check_wallet(self, wallet):
+        if self.allowlist is not None and wallet not in self.allowlist:
+            raise PermissionError("%s is not whitelisted" % wallet)
+
+    def sign(self, launchpad, sale_plan, plan_index, wallet=None):
+        """Signature bytes for minting from `plan_index` of `sale_plan`."""
+        self.check_wallet(wallet)
+        return self.sign_messages([self.message(launchpad, sale_plan, plan_index)])[0]
+
+    def sign_messages(self, messages):
+        """Sign `messages`, returning signatures in the same order."""
+        digests = [hashlib.sha256(m).digest() for m in messages]
+        signatures = [self.signatures.get(d, MISSING) for d in digests]
+        owned, waiting = {}, {}
+        with self._lock:
+            for i, d in enumerate(digests):
+                if signatures[i] is not MISSING or d in owned:
+                    continue
+                future = self._in_flight.get(d)
+                if future is None:
+                    future = self._in_flight[d] = Future()
+                    owned[d] = (messages[i], future)
+                else:
+                    waiting[d] = future
+        if owned:
+            self._sign_owned(owned)
+        for i, d in enumerate(digests):
+            if signatures[i] is MISSING:
+                signatures[i] = (owned[d][1] if d in owned else waiting[d]).result()
+        return signatures
+
+    def _sign_owned(self, owned):
+        batch = list(owned.items())
+        try:
+            if len(batch) < MIN_POOL_BATCH:
+                results = [self.key.sign(message).signature for _, (message, _) in batch]
+            else:
+                chunk = -(-len(batch) // self.workers)
+                chunks = [[message for _, (message, _) in batch[i:i + chunk]] for i in range(0, len(batch), chunk)]
+                results = [sig for part in self._get_pool().map(_sign_chunk, chunks) for sig in part]
+        except Exception as e:
+            with self._lock:
+                for d, (_, future) in batch:
+                    del self._in_flight[d]
+                    future.set_exception(e)
+            raise
+        for (d, _), signature in zip(batch, results):
+            self.signatures.set(d, signature)
+        with self._lock:
+            for (d, (_, future)), signature in zip(batch, results):
+                del self._in_flight[d]
+                future.set_result(signature)
+
+    def _get_pool(self):
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(self.workers, initializer=_init_worker, initargs=(self.seed,))
+            return self._pool
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+
+class SignerServer:
+    """Local HTTP front for a WhitelistSigner.
+
+    `POST /sign` with `{"launchpad", "sale_plan", "plan_index", "wallet"}`
+    answers `{"signature", "public_key"}` in hex; `POST /sign_batch` takes and
+    returns a list of those. `GET /public_key` is the key to register with
+    `plan::add_pubkey_into_whitelist`.
+    """
+
+    def __init__(self, signer, host="127.0.0.1", port=0):
+        self.signer = signer
+        self.server = _Server((host, port), _make_handler(signer))
+        self.server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return "http://%s:%d" % (host, port)
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+
+class _Server(ThreadingHTTPServer):
+    # the default backlog of 5 drops SYNs under a burst of new connections,
+    # which shows up as 1s retransmit stalls in p99
+    request_queue_size = 128
+
+
+def _make_handler(signer):
+    public_key = signer.public_key.hex()
+
+    def answer(signature):
+        return {"signature": signature.hex(), "public_key": public_key}
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def setup(self):
+            super().setup()
+            self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+        def do_GET(self):
+            if self.path != "/public_key":
+                return self._reply(404, {"error": "not found"})
+            self._reply(200, {"public_key": public_key})
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            try:
+                body = json.loads(self.rfile.read(length))
+                if self.path == "/sign":
+                    result = answer(signer.sign(body["launchpad"], body["sale_plan"],
+                                                int(body["plan_index"]), body.get("wallet")))
+                elif self.path == "/sign_batch":
+                    for r in body:
+                        signer.check_wallet(r.get("wallet"))
+                    messages = [signer.message(r["launchpad"], r["sale_plan"], int(r["plan_index"])) for r in body]
+                    result = [answer(sig) for sig in signer.sign_messages(messages)]
+                else:
+                    return self._reply(404, {"error": "not found"})
+            except PermissionError as e:
+                return self._reply(403, {"error": str(e)})
+            except (KeyError, ValueError, TypeError) as e:
+                return self._reply(400, {"error": "bad request: %r" % e})
+            except Exception as e:
+                return self._reply(502, {"error": str(e)})
+            self._reply(200, result)
+
+        def _reply(self, status, body):
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+if __name__ == "__main__":
+    # whitelist_signer.py <seed file (32 bytes hex)> [port] [allowlist file, one address per line]
+    with open(sys.argv[1]) as f:
+        seed = bytes.fromhex(f.read().strip())
+    port = int(sys.argv[2]) if len(sys.argv) > 2 else 8700
+    allowlist = None
+    if len(sys.argv) > 3:
+        with open(sys.argv[3]) as f:
+            allowlist = [line.strip() for line in f if line.strip()]
+    signer = WhitelistSigner(seed, allowlist=allowlist)
+    server = SignerServer(signer, port=port)
+    print("signing with %s on %s" % (signer.public_key.hex(), server.url))
+    try:
+        server.server.serve_forever()
+    finally:
+        signer.close()
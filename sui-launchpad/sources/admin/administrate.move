@@ -100,7 +100,7 @@ module sui_launchpad::administrate {
         }
     }
 
-    public fun filling_warehouse_by_creator<C>(
+    public entry fun filling_warehouse_by_creator<C>(
         _admin_cap: &AdminCap<C>,
         launchpad: &mut Launchpad<C>,
         names: vector<String>,
@@ -8,20 +8,53 @@ module sui_launchpad::computing_room {
 
     friend sui_launchpad::administrate;
 
+    /// Slots per BitVector bucket; finding a slot scans at most one bucket.
+    const BUCKET_SIZE: u64 = 64;
+
     struct Maze has store, drop {
         does_sequential: bool,
-        bits: Option<vector<BitVector>>
+        bits: Option<vector<BitVector>>,
+        // Fenwick tree over the free slots of each bucket, 1-based:
+        // free[i - 1] covers buckets (i - lowbit(i), i]
+        free: vector<u64>,
+        // highest power of two <= number of buckets
+        top_step: u64
     }
 
     public fun create_maze(does_sequential: bool, max: u64): Maze {
         let bits = option::none<vector<BitVector>>();
+        let free = vector::empty<u64>();
+        let top_step = 0;
         if (!does_sequential) {
-            let bit_vec = utils::create_bit_mask(max);
+            let bit_vec = utils::create_bit_mask(max, BUCKET_SIZE);
+            let buckets = vector::length(&bit_vec);
+            let i = 0;
+            while (i < buckets) {
+                vector::push_back(&mut free, bit_vector::length(vector::borrow(&bit_vec, i)));
+                i = i + 1;
+            };
+            // build the tree in place in O(buckets)
+            let i = 1;
+            while (i <= buckets) {
+                let parent = i + lowbit(i);
+                if (parent <= buckets) {
+                    let count = *vector::borrow(&free, i - 1);
+                    let slot = vector::borrow_mut(&mut free, parent - 1);
+                    *slot = *slot + count;
+                };
+                i = i + 1;
+            };
+            top_step = 1;
+            while (top_step * 2 <= buckets) {
+                top_step = top_step * 2;
+            };
             option::fill(&mut bits, bit_vec);
         };
         Maze {
             does_sequential,
-            bits
+            bits,
+            free,
+            top_step
         }
     }
 
@@ -33,42 +66,71 @@ module sui_launchpad::computing_room {
         }
     }
 
+    fun lowbit(i: u64): u64 {
+        i ^ (i & (i - 1))
+    }
+
+    /// Takes the `random_index`-th (1-based) free slot: O(log buckets) to find
+    /// its bucket, at most BUCKET_SIZE bits inside it.
     fun get_random_index(maze: &mut Maze, remaining: u64, receiver_addr: address): u64 {
 
         let random_index = utils::pseudo_random(receiver_addr, remaining);
 
-        let required_position= 0;
+        let buckets = vector::length(&maze.free);
         let bucket = 0;
-        let pos= 0;
-        let new = vector::empty();
-        let bit_vec = option::borrow_mut(&mut maze.bits);
-
-        while (required_position < random_index) {
-            let bitvector=*vector::borrow_mut(bit_vec, bucket);
-            let i =0;
-            while (i < bit_vector::length(&bitvector)) {
-                if (!bit_vector::is_index_set(&bitvector, i)) {
-                    required_position = required_position + 1;
-                };
-                if (required_position == random_index) {
-                    bit_vector::set(&mut bitvector, i);
-                    vector::push_back(&mut new, bitvector);
-                    break
+        let rank = random_index;
+        let step = maze.top_step;
+        while (step > 0) {
+            let next = bucket + step;
+            if (next <= buckets) {
+                let count = *vector::borrow(&maze.free, next - 1);
+                if (count < rank) {
+                    bucket = next;
+                    rank = rank - count;
                 };
-                pos = pos + 1;
-                i = i + 1;
             };
-            vector::push_back(&mut new, bitvector);
-            bucket=bucket + 1
+            step = step / 2;
         };
+        // TODO: error unify
+        assert!(bucket < buckets, 30);
 
-        while (bucket < vector::length(bit_vec)) {
-            let bitvector=*vector::borrow_mut(bit_vec, bucket);
-            vector::push_back(&mut new, bitvector);
-            bucket=bucket+1;
+        let bitvector = vector::borrow_mut(option::borrow_mut(&mut maze.bits), bucket);
+        let i = 0;
+        loop {
+            if (!bit_vector::is_index_set(bitvector, i)) {
+                rank = rank - 1;
+                if (rank == 0) break
+            };
+            i = i + 1;
         };
+        bit_vector::set(bitvector, i);
+
+        let node = bucket + 1;
+        while (node <= buckets) {
+            let slot = vector::borrow_mut(&mut maze.free, node - 1);
+            *slot = *slot - 1;
+            node = node + lowbit(node);
+        };
+
+        bucket * BUCKET_SIZE + i
+    }
 
-        *bit_vec = new;
-        pos
+    #[test_only]
+    public fun free_slots(maze: &Maze): u64 {
+        let total = 0;
+        let bits = option::borrow(&maze.bits);
+        let b = 0;
+        while (b < vector::length(bits)) {
+            let bitvector = vector::borrow(bits, b);
+            let i = 0;
+            while (i < bit_vector::length(bitvector)) {
+                if (!bit_vector::is_index_set(bitvector, i)) {
+                    total = total + 1;
+                };
+                i = i + 1;
+            };
+            b = b + 1;
+        };
+        total
     }
 }
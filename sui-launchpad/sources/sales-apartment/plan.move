@@ -4,7 +4,10 @@ module sui_launchpad::plan {
     use std::string::String;
     use std::option::{Self, Option};
 
-    use sui::object::{Self, UID};
+    use sui::object::{Self, ID, UID};
+    use sui::event;
+    use sui::coin::{Self, Coin};
+    use sui::balance::{Self, Balance};
     use sui::bcs::{to_bytes};
     use sui::clock::{Clock, timestamp_ms};
     use sui::tx_context::TxContext;
@@ -18,10 +21,19 @@ module sui_launchpad::plan {
     use sui_launchpad::administrate::{Launchpad, AdminCap};
     use sui_launchpad::permission::{Self, Permission};
 
+    friend sui_launchpad::port;
+
     struct SalePlan<phantom C, phantom T> has key, store {
         id: UID,
         plans: vector<Plan>,
-        beneficiary: Beneficiary
+        beneficiary: Beneficiary,
+        // sale payments waiting for disperse_proceeds, when the beneficiary accumulates
+        proceeds: Balance<T>
+    }
+
+    struct ProceedsDispersed has copy, drop {
+        sale_plan: ID,
+        amount: u64
     }
 
     struct Plan has store {
@@ -48,7 +60,8 @@ module sui_launchpad::plan {
         let sale_plan = SalePlan<C, T> {
             id: object::new(ctx),
             plans: vector::empty<Plan>(),
-            beneficiary
+            beneficiary,
+            proceeds: balance::zero<T>()
         };
         share_object(sale_plan);
     }
@@ -185,6 +198,68 @@ module sui_launchpad::plan {
         &mut sale_plan.beneficiary
     }
 
+    /// Pays a sale: straight to the shareholders, or into `proceeds` when the
+    /// beneficiary accumulates.
+    public(friend) fun settle<C, T>(
+        sale_plan: &mut SalePlan<C, T>,
+        payment: Coin<T>,
+        ctx: &mut TxContext
+    ) {
+        if (financial::does_accumulate(&sale_plan.beneficiary)) {
+            balance::join(&mut sale_plan.proceeds, coin::into_balance(payment));
+        } else {
+            financial::settlement(&mut sale_plan.beneficiary, payment, ctx);
+        };
+    }
+
+    public fun disperse_proceeds<C, T>(
+        sale_plan: &mut SalePlan<C, T>,
+        ctx: &mut TxContext
+    ) {
+        // TODO: error unify
+        assert!(financial::is_shareholder(&sale_plan.beneficiary, tx_context::sender(ctx)), 24);
+        do_disperse_proceeds(sale_plan, ctx);
+    }
+
+    public fun disperse_proceeds_with_cap<C, T>(
+        _admin_cap: &AdminCap<C>,
+        sale_plan: &mut SalePlan<C, T>,
+        ctx: &mut TxContext
+    ) {
+        do_disperse_proceeds(sale_plan, ctx);
+    }
+
+    public fun disperse_proceeds_by_admin<C, T>(
+        permission: &Permission,
+        sale_plan: &mut SalePlan<C, T>,
+        ctx: &mut TxContext
+    ) {
+        permission::check_permission(permission, tx_context::sender(ctx));
+        do_disperse_proceeds(sale_plan, ctx);
+    }
+
+    fun do_disperse_proceeds<C, T>(
+        sale_plan: &mut SalePlan<C, T>,
+        ctx: &mut TxContext
+    ) {
+        let amount = balance::value(&sale_plan.proceeds);
+        if (amount == 0) {
+            return
+        };
+        let coins = coin::take(&mut sale_plan.proceeds, amount, ctx);
+        financial::disperse_accumulated(&sale_plan.beneficiary, coins, ctx);
+        event::emit(ProceedsDispersed {
+            sale_plan: object::id(sale_plan),
+            amount
+        });
+    }
+
+    public fun proceeds_value<C, T>(
+        sale_plan: &SalePlan<C, T>
+    ): u64 {
+        balance::value(&sale_plan.proceeds)
+    }
+
     public fun check_whitelist<C, T>(
         launchpad: &Launchpad<C>,
         sale_plan: &SalePlan<C, T>,
@@ -220,7 +295,8 @@ module sui_launchpad::plan {
         let sale_plan = SalePlan<C, T> {
             id: object::new(ctx),
             plans: vector::empty<Plan>(),
-            beneficiary
+            beneficiary,
+            proceeds: balance::zero<T>()
         };
         sale_plan
     }
@@ -7,10 +7,10 @@ module sui_launchpad::port {
     use sui::pay::{join_vec};
     use sui::tx_context::TxContext;
     use sui_launchpad::plan::{Self, SalePlan};
-    use sui_launchpad::administrate::{Self, Launchpad};
+    use sui_launchpad::administrate::{Self, Launchpad, AdminCap};
+    use sui_launchpad::permission::Permission;
     use sui::tx_context;
     use sui::transfer;
-    use sui_launchpad::financial;
 
 
     public entry fun sale_mint<C, T>(
@@ -29,14 +29,14 @@ module sui_launchpad::port {
         let total_cost = price * mint_amount;
         // TODO: error unify
         assert!(coin::value(&coins) >= total_cost, 8);
-        // settlement first
-        let beneficiary = plan::borrow_beneficiary_mut<C, T>(sale_plan);
-        financial::settlement(beneficiary, coin::split(&mut coins, total_cost, ctx), ctx);
         plan::check_with_plan<C, T>(sale_plan, plan_index, mint_amount, clock, ctx);
         // TODO: only support offchain whitelist currently
         if (plan::does_whitelist<C, T>(sale_plan, plan_index)) {
             plan::check_whitelist<C, T>(launchpad, sale_plan, plan_index, &sig);
         };
+        // settle after the checks: the whitelist signature covers the sale plan
+        // as it was before this transaction, accumulated proceeds included
+        plan::settle<C, T>(sale_plan, coin::split(&mut coins, total_cost, ctx), ctx);
         let nfts = administrate::sale_mint<C>(launchpad, mint_amount, ctx);
         // update numbers in plan
         plan::increase_sale_plan_counter<C, T>(sale_plan, plan_index, mint_amount, ctx);
@@ -53,4 +53,26 @@ module sui_launchpad::port {
 
     }
 
+    public entry fun disperse_proceeds<C, T>(
+        sale_plan: &mut SalePlan<C, T>,
+        ctx: &mut TxContext
+    ) {
+        plan::disperse_proceeds<C, T>(sale_plan, ctx);
+    }
+
+    public entry fun disperse_proceeds_by_creator<C, T>(
+        admin_cap: &AdminCap<C>,
+        sale_plan: &mut SalePlan<C, T>,
+        ctx: &mut TxContext
+    ) {
+        plan::disperse_proceeds_with_cap<C, T>(admin_cap, sale_plan, ctx);
+    }
+
+    public entry fun disperse_proceeds_by_admin<C, T>(
+        permission: &Permission,
+        sale_plan: &mut SalePlan<C, T>,
+        ctx: &mut TxContext
+    ) {
+        plan::disperse_proceeds_by_admin<C, T>(permission, sale_plan, ctx);
+    }
 }
@@ -10,6 +10,8 @@ module sui_launchpad::financial {
     use sui::tx_context;
     use sui::transfer;
 
+    // account_type 1: every payment is split between the shareholders as it
+    // comes in; 3: payments accumulate on the SalePlan and are dispersed in bulk
     struct Beneficiary has store {
         account_type: u8,
         shared: Option<SharedAccount>,
@@ -43,6 +45,26 @@ module sui_launchpad::financial {
 
     }
 
+    public fun does_accumulate(beneficiary: &Beneficiary): bool {
+        beneficiary.account_type == 3
+    }
+
+    public fun is_shareholder(beneficiary: &Beneficiary, addr: address): bool {
+        option::is_some(&beneficiary.shared)
+            && shared_account::is_shareholder(option::borrow(&beneficiary.shared), addr)
+    }
+
+    /// Pays out accumulated proceeds of a shared beneficiary in one go.
+    public fun disperse_accumulated<T>(
+        beneficiary: &Beneficiary,
+        coins: Coin<T>,
+        ctx: &mut TxContext
+    ) {
+        // TODO: error unify
+        assert!(does_accumulate(beneficiary), 25);
+        shared_account::disperse(option::borrow(&beneficiary.shared), coins, ctx);
+    }
+
     public fun settlement<T>(
         beneficiary: &mut Beneficiary,
         coins: Coin<T>,
@@ -42,6 +42,18 @@ module sui_launchpad::shared_account {
         }
     }
 
+    public fun is_shareholder(shared_account: &SharedAccount, addr: address): bool {
+        let len = vector::length(&shared_account.shares);
+        let i = 0;
+        while (i < len) {
+            if (vector::borrow(&shared_account.shares, i).account == addr) {
+                return true
+            };
+            i = i + 1;
+        };
+        false
+    }
+
     public fun disperse<T>(
         shared_account: &SharedAccount,
         coins: Coin<T>,
@@ -107,20 +107,14 @@ module sui_launchpad::utils {
         random
     }
 
-    public fun create_bit_mask(nfts: u64): vector<BitVector> {
-        let full_buckets = nfts / 1024;
-        let remaining = nfts - full_buckets * 1024;
-        if (nfts < 1024) {
-            full_buckets = 0;
-            remaining = nfts;
-        };
+    /// One BitVector per `bucket_size` items, the last one holding the rest.
+    public fun create_bit_mask(nfts: u64, bucket_size: u64): vector<BitVector> {
         let v1 = vector::empty();
-        while (full_buckets > 0) {
-            let new = bit_vector::new(1023);
-            vector::push_back(&mut v1, new);
-            full_buckets=full_buckets-1;
+        while (nfts > 0) {
+            let size = if (nfts < bucket_size) { nfts } else { bucket_size };
+            vector::push_back(&mut v1, bit_vector::new(size));
+            nfts = nfts - size;
         };
-        vector::push_back(&mut v1,bit_vector::new(remaining));
         v1
     }
 }
@@ -215,4 +215,148 @@ module sui_launchpad::test_launch {
         clock::delete_for_testing(clock_);
         test_scenario::end(scenario);
     }
-}
\ No newline at end of file
+
+    #[test]
+    fun test_accumulated_settlement() {
+        use sui::sui::SUI;
+        use sui::clock::{Self};
+        use sui::coin::{Self};
+        let scenario = test_scenario::begin(OWNER);
+        let ctx_ = ctx(&mut scenario);
+        let (admin_cap, launchpad) = create(Witness {}, ctx_);
+        filling_warehouse_by_creator(
+            &admin_cap,
+            &mut launchpad,
+            vector[string::utf8(b"GG #1"), string::utf8(b"GG #2")],
+            vector[string::utf8(b"https://1"), string::utf8(b"https://2")],
+            vector[string::utf8(b"G1"), string::utf8(b"G2")],
+            vector[],
+            vector[]
+        );
+        let sale_plan = plan::test_create_sale_plan<Gekacha, SUI>(
+            &admin_cap,
+            3,
+            vector[OWNER, OWNER],
+            vector[10, 20],
+            ctx_
+        );
+        plan::add_plan<Gekacha, SUI>(
+            &admin_cap,
+            &mut sale_plan,
+            string::utf8(b"Pre Sale I"),
+            100,
+            0,
+            1000,
+            false,
+            0,
+            100,
+            2,
+            ctx_
+        );
+        let clock_ = clock::create_for_testing(10);
+        let wallet = coin::mint_for_testing<SUI>(1000, ctx_);
+        port::sale_mint(
+            &mut launchpad,
+            &mut sale_plan,
+            0,
+            1,
+            vector<u8>[],
+            vector[wallet],
+            &clock_,
+            ctx_
+        );
+        assert!(plan::proceeds_value(&sale_plan) == 100, 0);
+        port::disperse_proceeds_by_creator(&admin_cap, &mut sale_plan, ctx_);
+        assert!(plan::proceeds_value(&sale_plan) == 0, 1);
+
+        transfer::transfer(admin_cap, OWNER);
+        transfer::transfer(launchpad, OWNER);
+        transfer::transfer(sale_plan, OWNER);
+
+        clock::delete_for_testing(clock_);
+        test_scenario::end(scenario);
+    }
+
+    #[test]
+    fun test_whitelisted_mint_after_settle() {
+        use sui::sui::SUI;
+        use sui::clock::{Self};
+        use sui::coin::{Self};
+        let scenario = test_scenario::begin(OWNER);
+        let ctx_ = ctx(&mut scenario);
+        let (admin_cap, launchpad) = create(Witness {}, ctx_);
+        filling_warehouse_by_creator(
+            &admin_cap,
+            &mut launchpad,
+            vector[string::utf8(b"GG #1"), string::utf8(b"GG #2")],
+            vector[string::utf8(b"https://1"), string::utf8(b"https://2")],
+            vector[string::utf8(b"G1"), string::utf8(b"G2")],
+            vector[],
+            vector[]
+        );
+        let sale_plan = plan::test_create_sale_plan<Gekacha, SUI>(
+            &admin_cap,
+            3,
+            vector[OWNER, OWNER],
+            vector[10, 20],
+            ctx_
+        );
+        plan::add_plan<Gekacha, SUI>(
+            &admin_cap,
+            &mut sale_plan,
+            string::utf8(b"Public Sale"),
+            100,
+            0,
+            1000,
+            false,
+            0,
+            100,
+            2,
+            ctx_
+        );
+        plan::add_plan<Gekacha, SUI>(
+            &admin_cap,
+            &mut sale_plan,
+            string::utf8(b"Whitelist Sale"),
+            100,
+            0,
+            1000,
+            true,
+            1,
+            100,
+            2,
+            ctx_
+        );
+        let clock_ = clock::create_for_testing(10);
+        // the first mint leaves proceeds on the sale plan
+        port::sale_mint(
+            &mut launchpad,
+            &mut sale_plan,
+            0,
+            1,
+            vector<u8>[],
+            vector[coin::mint_for_testing<SUI>(1000, ctx_)],
+            &clock_,
+            ctx_
+        );
+        assert!(plan::proceeds_value(&sale_plan) == 100, 0);
+        port::sale_mint(
+            &mut launchpad,
+            &mut sale_plan,
+            1,
+            1,
+            vector<u8>[],
+            vector[coin::mint_for_testing<SUI>(1000, ctx_)],
+            &clock_,
+            ctx_
+        );
+        assert!(plan::proceeds_value(&sale_plan) == 200, 1);
+
+        transfer::transfer(admin_cap, OWNER);
+        transfer::transfer(launchpad, OWNER);
+        transfer::transfer(sale_plan, OWNER);
+
+        clock::delete_for_testing(clock_);
+        test_scenario::end(scenario);
+    }
+}
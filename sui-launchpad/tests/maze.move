@@ -0,0 +1,37 @@
+#[test_only]
+module sui_launchpad::test_maze {
+
+    use std::vector;
+    use sui_launchpad::computing_room;
+
+    const MINTER: address = @0xA1C11;
+
+    #[test]
+    fun test_random_mints_cover_every_index_once() {
+        // two full buckets and a partial one
+        let max = 130u64;
+        let maze = computing_room::create_maze(false, max);
+        let seen = vector::empty<bool>();
+        let i = 0;
+        while (i < max) {
+            vector::push_back(&mut seen, false);
+            i = i + 1;
+        };
+        let remaining = max;
+        while (remaining > 0) {
+            let index = computing_room::get_mint_index(&mut maze, remaining, 0, MINTER);
+            assert!(index < max, 0);
+            let slot = vector::borrow_mut(&mut seen, index);
+            assert!(!*slot, 1);
+            *slot = true;
+            remaining = remaining - 1;
+            assert!(computing_room::free_slots(&maze) == remaining, 2);
+        };
+    }
+
+    #[test]
+    fun test_sequential_mints_follow_index() {
+        let maze = computing_room::create_maze(true, 10);
+        assert!(computing_room::get_mint_index(&mut maze, 10, 3, MINTER) == 3, 0);
+    }
+}